@@ -0,0 +1,70 @@
+"""Benchmark - Data queries on NumPy columns vs. the Python record loops.
+
+"loop" is the DataOperations call (a pass over the record dicts). "first" is
+the same query on a new ColumnarTable, so it includes building the columns it
+needs; "loaded" repeats it once they exist, as for the DataAgent's dataset.
+Results are checked to be identical.
+
+Usage: python benchmarks/columnar.py [--sizes 10000,100000,500000] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_servers.data_server import DataOperations
+from src.columnar import ColumnarTable, available
+
+def make_records(size: int):
+    return [{'id': i, 'name': f"employee-{i}", 'department': f"dept-{i % 7}",
+             'salary': (i * 7919) % 100000, 'rating': round((i % 50) / 10, 1)}
+            for i in range(size)]
+
+# name: (Python loop, columnar query)
+CASES = {
+    'filter department ==': (lambda records: list(DataOperations.filter_records(records, 'department', '==', 'dept-3')),
+                             lambda table: table.filter('department', '==', 'dept-3')),
+    'filter salary >': (lambda records: list(DataOperations.filter_records(records, 'salary', '>', 90000)),
+                        lambda table: table.filter('salary', '>', 90000)),
+    'sort salary desc': (lambda records: list(DataOperations.sort_records(records, 'salary', True)),
+                         lambda table: table.sort('salary', True)),
+    'average salary': (lambda records: DataOperations.aggregate(records, 'salary', 'average'),
+                       lambda table: table.aggregate('salary', 'average')),
+    'unique department': (lambda records: DataOperations.unique_values(records, 'department'),
+                          lambda table: table.unique_values('department')),
+}
+
+def best_time(func, repeat: int):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='10000,100000,500000')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    if not available():
+        sys.exit("NumPy is not installed: pip install numpy")
+
+    print(f"{'records':>8}  {'query':<21}{'loop ms':>9}{'first ms':>10}{'loaded ms':>11}{'speedup':>9}")
+    for size in [int(s) for s in args.sizes.split(',')]:
+        records = make_records(size)
+        table = ColumnarTable(records)
+        for name, (loop, query) in CASES.items():
+            loop_ms, expected = best_time(lambda: loop(records), args.repeat)
+            first_ms, first = best_time(lambda: query(ColumnarTable(records)), args.repeat)
+            loaded_ms, loaded = best_time(lambda: query(table), args.repeat)
+            assert first == expected and loaded == expected, name
+            print(f"{size:>8}  {name:<21}{loop_ms:>9.1f}{first_ms:>10.1f}{loaded_ms:>11.2f}"
+                  f"{loop_ms / loaded_ms:>8.0f}x")
+        print()
+
+if __name__ == '__main__':
+    main()
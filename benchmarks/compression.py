@@ -0,0 +1,58 @@
+"""Benchmark - Bytes on the wire and CPU cost per Content-Encoding for MCP result payloads.
+
+Encodes sort_records-style results (the whole record list) with each format
+from src/serialization.py, then compresses them with every available encoding.
+`--mbps` estimates transfer time on a link of that speed; compression pays off
+when CPU time + transfer time beats the uncompressed transfer.
+
+Usage: python benchmarks/compression.py [--sizes 100,10000,100000] [--mbps 100]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.compression import ENCODINGS
+from src.serialization import CODECS
+
+def make_result(size: int):
+    records = [{'id': i, 'name': f"employee-{i}", 'department': f"dept-{i % 7}",
+                'salary': (i * 7919) % 100000, 'active': i % 3 != 0}
+               for i in range(size)]
+    return {'operation': 'sort_records', 'result': records, 'status': 'success'}
+
+def best_ms(func, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.thread_time()
+        func()
+        best = min(best, time.thread_time() - start)
+    return best * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='100,10000,100000')
+    parser.add_argument('--mbps', type=float, default=100.0, help="link speed for the transfer estimate")
+    args = parser.parse_args()
+
+    bytes_per_ms = args.mbps * 1e6 / 8 / 1000
+    print(f"{'records':>8}  {'format':<8}{'encoding':<10}{'wire KB':>10}{'ratio':>7}"
+          f"{'compress ms':>13}{'decompress ms':>15}{'total ms':>10}")
+    for size in [int(s) for s in args.sizes.split(',')]:
+        result = make_result(size)
+        for format_name, codec in CODECS.items():
+            body = codec.dumps(result)
+            print(f"{size:>8}  {format_name:<8}{'identity':<10}{len(body) / 1024:>10.1f}{1:>7.2f}"
+                  f"{0:>13.2f}{0:>15.2f}{len(body) / bytes_per_ms:>10.2f}")
+            for encoding, (compress, decompress) in ENCODINGS.items():
+                compressed = compress(body)
+                compress_ms = best_ms(lambda: compress(body))
+                decompress_ms = best_ms(lambda: decompress(compressed))
+                total = compress_ms + decompress_ms + len(compressed) / bytes_per_ms
+                print(f"{size:>8}  {format_name:<8}{encoding:<10}{len(compressed) / 1024:>10.1f}"
+                      f"{len(compressed) / len(body):>7.2f}{compress_ms:>13.2f}{decompress_ms:>15.2f}{total:>10.2f}")
+
+if __name__ == '__main__':
+    main()
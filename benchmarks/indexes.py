@@ -0,0 +1,65 @@
+"""Benchmark - filter_records with secondary indexes vs. a full scan.
+
+"scan" is DataOperations.filter_records (a pass over the record dicts).
+"build" is building the index the query needs, a one-off cost per dataset
+(load or reload); "index" is the query once it exists, as for the DataAgent's
+dataset. Results are checked to be identical.
+
+Usage: python benchmarks/indexes.py [--sizes 1000,100000,500000] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_servers.data_server import DataOperations
+from src.indexes import INDEX_TYPES, IndexSet
+from src.log import configure as configure_logging
+
+def make_records(size: int):
+    return [{'id': i, 'name': f"employee-{i}", 'department': f"dept-{i % 50}",
+             'salary': (i * 7919) % 100000, 'hire_date': f"20{10 + i % 15}-{1 + i % 12:02d}-{1 + i % 28:02d}"}
+            for i in range(size)]
+
+# name: (index kind, field, operator, value)
+CASES = {
+    'department ==': ('hash', 'department', '==', 'dept-3'),
+    'department in': ('hash', 'department', 'in', ['dept-3', 'dept-17', 'dept-42']),
+    'salary > 99000': ('sorted', 'salary', '>', 99000),
+    'salary <= 5000': ('sorted', 'salary', '<=', 5000),
+    'hire_date >= 2024': ('sorted', 'hire_date', '>=', '2024'),
+}
+
+def best_time(func, repeat: int):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1000,100000,500000')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    configure_logging(level='WARNING')
+
+    print(f"{'records':>8}  {'filter':<19}{'matches':>8}{'scan ms':>9}{'build ms':>10}{'index ms':>10}{'speedup':>9}")
+    for size in [int(s) for s in args.sizes.split(',')]:
+        records = make_records(size)
+        indexes = IndexSet.from_config(records, {'hash': ['department'], 'sorted': ['salary', 'hire_date']})
+        for name, (kind, field, operator, value) in CASES.items():
+            scan_ms, expected = best_time(
+                lambda: list(DataOperations.filter_records(records, field, operator, value)), args.repeat)
+            build_ms, _ = best_time(lambda: INDEX_TYPES[kind](records, field), args.repeat)
+            index_ms, found = best_time(lambda: indexes.filter(field, operator, value), args.repeat)
+            assert found == expected, name
+            print(f"{size:>8}  {name:<19}{len(found):>8}{scan_ms:>9.2f}{build_ms:>10.1f}{index_ms:>10.3f}"
+                  f"{scan_ms / index_ms:>8.0f}x")
+        print()
+
+if __name__ == '__main__':
+    main()
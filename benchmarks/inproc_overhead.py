@@ -0,0 +1,97 @@
+"""Benchmark - Per-call overhead removed by the in-process transport.
+
+Calls the same operation through MathAgent/DataAgent over loopback TCP, a
+Unix domain socket and `inproc://`, one call at a time on warm connections.
+The difference between a network transport and inproc is what encoding, HTTP
+and the socket round trip cost per call. `--records N` switches to the data
+server's select_fields over N records to show how it grows with payload size.
+
+Usage: python benchmarks/inproc_overhead.py [--calls 2000] [--records 0]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_servers.data_server import DataMCPServer
+from mcp_servers.math_server import MathMCPServer
+from sub_agents.data_agent import DataAgent
+from sub_agents.math_agent import MathAgent
+from src.log import configure as configure_logging
+
+PORT = 8161
+
+def timed_calls(call, calls: int):
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        result = call()
+        samples.append(time.perf_counter() - start)
+        assert 'error' not in result, result
+    return samples
+
+async def atimed_calls(acall, calls: int):
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        result = await acall()
+        samples.append(time.perf_counter() - start)
+        assert 'error' not in result, result
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=2000)
+    parser.add_argument('--records', type=int, default=0, help="use select_fields over N records")
+    args = parser.parse_args()
+    configure_logging(level='WARNING')  # no per-call tool logging in the measurements
+
+    path = os.path.join(tempfile.mkdtemp(), 'mcp.sock')
+    if args.records:
+        server_class, agent_class, service = DataMCPServer, DataAgent, 'data'
+        records = [{'id': i, 'name': f"employee-{i}", 'salary': (i * 7919) % 100000}
+                   for i in range(args.records)]
+        operation, op_args = 'select_fields', (records, ['id', 'salary'])
+    else:
+        server_class, agent_class, service = MathMCPServer, MathAgent, 'math'
+        operation, op_args = 'add', ([1, 2, 3, 4, 5],)
+
+    server = server_class(port=PORT, workers=2, unix_socket=path, compression={'enabled': False})
+    server.start()
+    agents = {
+        'tcp': agent_class(f"http://localhost:{PORT}", timeout=60),
+        'unix': agent_class(f"unix://{path}", timeout=60),
+        'inproc': agent_class(f"inproc://{service}")
+    }
+
+    label = f"{operation} over {args.records} records" if args.records else operation
+    print(f"{label} x {args.calls}: mean latency per call in microseconds\n")
+    print(f"{'client':<7}{'tcp':>10}{'unix':>10}{'inproc':>10}{'removed vs tcp':>17}")
+    try:
+        for client in ['sync', 'async']:
+            means = {}
+            for transport, agent in agents.items():
+                if client == 'sync':
+                    timed_calls(lambda: agent.call_mcp(operation, *op_args), 20)  # warm up
+                    samples = timed_calls(lambda: agent.call_mcp(operation, *op_args), args.calls)
+                else:
+                    async def run():
+                        await atimed_calls(lambda: agent.acall_mcp(operation, *op_args), 20)
+                        samples = await atimed_calls(lambda: agent.acall_mcp(operation, *op_args), args.calls)
+                        await agent.aclose()
+                        return samples
+                    samples = asyncio.run(run())
+                means[transport] = statistics.mean(samples) * 1e6
+            removed = means['tcp'] - means['inproc']
+            print(f"{client:<7}{means['tcp']:>10.0f}{means['unix']:>10.0f}{means['inproc']:>10.0f}"
+                  f"{removed:>10.0f} ({removed / means['tcp']:.0%})")
+    finally:
+        server.stop()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Benchmark - CPU-bound MCP throughput vs. number of server processes sharing one port.
+
+Client load comes from separate processes so the load generator is not the
+bottleneck. Throughput should grow roughly linearly with processes up to the
+number of free cores (leave some for the clients).
+
+Usage: python benchmarks/mcp_scaling.py [--processes 1,2,4] [--clients 8] [--duration 5]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_servers.data_server import DataMCPServer
+from mcp_servers.text_server import TextMCPServer
+from mcp_servers.workers import HEARTBEAT_INTERVAL, MultiProcessMCPServer
+
+PORT = 8111
+
+def payloads(records: int):
+    rows = [{'id': i, 'department': f"dept-{i % 7}", 'salary': (i * 7919) % 100000}
+            for i in range(records)]
+    text = "The release is excellent and the team did a great job. " * 200
+    return {
+        'filter_records': (DataMCPServer, {'operation': 'filter_records',
+                                           'args': [rows, 'salary', '>', 50000], 'kwargs': {}}),
+        'classify': (TextMCPServer, {'operation': 'classify_text', 'args': [text], 'kwargs': {}})
+    }
+
+def client(url: str, payload, duration: float, counts, index: int):
+    """Load-generator process: send requests over one keep-alive session until time runs out."""
+    session = requests.Session()
+    done = 0
+    deadline = time.time() + duration
+    while time.time() < deadline:
+        if session.post(f"{url}/operate", json=payload, timeout=30).status_code == 200:
+            done += 1
+    counts[index] = done
+
+def wait_ready(url: str, timeout: float = 10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(f"{url}/health", timeout=0.5).status_code == 200:
+                return
+        except requests.RequestException:
+            time.sleep(0.05)
+    raise RuntimeError(f"Server at {url} did not start")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--processes', default='1,2,4')
+    parser.add_argument('--clients', type=int, default=8, help="load-generator processes")
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--records', type=int, default=2000, help="records per filter_records payload")
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPU cores, {args.clients} client processes, {args.duration:.0f}s per run\n")
+    print(f"{'operation':<16}{'processes':>10}{'req/s':>10}{'speedup':>9}  requests per worker")
+    for name, (server_class, payload) in payloads(args.records).items():
+        baseline = None
+        for processes in [int(p) for p in args.processes.split(',')]:
+            devnull = open(os.devnull, 'w')
+            stdout, sys.stdout = sys.stdout, devnull  # silence per-call tool logging in the workers
+            server = MultiProcessMCPServer(server_class, processes, port=PORT, workers=4)
+            server.start()
+            sys.stdout = stdout
+            url = f"http://localhost:{PORT}"
+            try:
+                wait_ready(url)
+                counts = multiprocessing.Array('q', args.clients)
+                clients = [multiprocessing.Process(target=client, args=(url, payload, args.duration, counts, i))
+                           for i in range(args.clients)]
+                for process in clients:
+                    process.start()
+                for process in clients:
+                    process.join()
+                rps = sum(counts) / args.duration
+                time.sleep(HEARTBEAT_INTERVAL)  # per-worker counters arrive with the heartbeat
+                baseline = baseline or rps
+                spread = [worker['requests'] for worker in server.stats()]
+                print(f"{name:<16}{processes:>10}{rps:>10.0f}{rps / baseline:>8.2f}x  {spread}")
+            finally:
+                sys.stdout = devnull
+                server.stop()
+                sys.stdout = stdout
+                devnull.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""Benchmark - MCP server throughput, single-threaded vs worker pool, under concurrent clients.
+
+Slow clients (`--slow-clients`) trickle their request body over a second, like a
+large payload on a slow link; a single-threaded server stalls behind them.
+Pure-CPU operations only scale with cores, see benchmarks/mcp_scaling.py for that.
+
+Usage: python benchmarks/mcp_throughput.py [--requests 400] [--clients 1,4,16] [--workers 8]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_servers.data_server import DataMCPServer
+
+PORT = 8101
+
+def run_server(port: int, workers: int, queue_size: int):
+    """Server process entry point (tool-call logging is silenced)."""
+    sys.stdout = open(os.devnull, 'w')
+    server = DataMCPServer(port=port, workers=workers, queue_size=queue_size)
+    server.start()
+    while True:
+        time.sleep(1)
+
+def wait_ready(url: str, timeout: float = 10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(f"{url}/health", timeout=0.5).status_code == 200:
+                return
+        except requests.RequestException:
+            time.sleep(0.05)
+    raise RuntimeError(f"Server at {url} did not start")
+
+def make_payload(size: int):
+    records = [{'id': i, 'department': f"dept-{i % 7}", 'salary': (i * 7919) % 100000}
+               for i in range(size)]
+    return {'operation': 'sort_records', 'args': [records, 'salary'], 'kwargs': {'descending': True}}
+
+def slow_client(port: int, payload, stop: threading.Event, duration: float = 1.0):
+    """Repeatedly send a request whose body arrives in small pieces over `duration` seconds."""
+    body = json.dumps(payload).encode('utf-8')
+    pieces = 20
+    chunk = max(1, len(body) // pieces)
+    while not stop.is_set():
+        try:
+            with socket.create_connection(('localhost', port), timeout=30) as sock:
+                sock.sendall((f"POST /operate HTTP/1.1\r\nHost: localhost\r\n"
+                              f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                              f"Connection: close\r\n\r\n").encode('ascii'))
+                for i in range(0, len(body), chunk):
+                    sock.sendall(body[i:i + chunk])
+                    time.sleep(duration / pieces)
+                while sock.recv(65536):
+                    pass
+        except OSError:
+            time.sleep(0.05)
+
+def run_load(url: str, payload, total: int, clients: int):
+    """Send `total` requests from `clients` threads; returns (req/s, p50 ms, p95 ms, shed, failed)."""
+    def one(_):
+        start = time.perf_counter()
+        try:
+            status = requests.post(f"{url}/operate", json=payload, timeout=30).status_code
+        except requests.RequestException:
+            status = None  # connection reset / refused
+        return (time.perf_counter() - start) * 1000, status
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(clients) as pool:
+        samples = list(pool.map(one, range(total)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(ms for ms, status in samples if status == 200)
+    shed = sum(1 for _, status in samples if status in (429, 503))
+    failed = sum(1 for _, status in samples if status is None)
+    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)] if latencies else 0.0
+    p50 = statistics.median(latencies) if latencies else 0.0
+    return len(latencies) / elapsed, p50, p95, shed, failed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--clients', default='1,4,16')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--queue-size', type=int, default=64)
+    parser.add_argument('--records', type=int, default=200, help="records per sort_records payload")
+    parser.add_argument('--slow-clients', type=int, default=2, help="clients trickling their request body")
+    args = parser.parse_args()
+
+    payload = make_payload(args.records)
+    client_counts = [int(c) for c in args.clients.split(',')]
+
+    print(f"{args.slow_clients} slow clients in the background, {args.records} records per request\n")
+    print(f"{'mode':<16}{'clients':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'503s':>7}{'resets':>8}")
+    for label, workers in [('single-thread', 0), (f"pool x{args.workers}", args.workers)]:
+        server = multiprocessing.Process(target=run_server, args=(PORT, workers, args.queue_size), daemon=True)
+        server.start()
+        url = f"http://localhost:{PORT}"
+        try:
+            wait_ready(url)
+            run_load(url, payload, 20, 2)  # warm up
+            for clients in client_counts:
+                stop = threading.Event()
+                slow = [threading.Thread(target=slow_client, args=(PORT, payload, stop), daemon=True)
+                        for _ in range(args.slow_clients)]
+                for thread in slow:
+                    thread.start()
+                rps, p50, p95, shed, failed = run_load(url, payload, args.requests, clients)
+                stop.set()
+                print(f"{label:<16}{clients:>8}{rps:>10.0f}{p50:>10.1f}{p95:>10.1f}{shed:>7}{failed:>8}")
+        finally:
+            server.terminate()
+            server.join()
+
+if __name__ == '__main__':
+    main()
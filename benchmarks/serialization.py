@@ -0,0 +1,60 @@
+"""Benchmark - Encode/decode time and size of MCP record payloads per wire format.
+
+Compares stdlib json, orjson and msgpack on /operate-style payloads
+({operation, args: [records, ...]}); formats that are not installed are skipped.
+
+Usage: python benchmarks/serialization.py [--sizes 10000,100000,1000000] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.serialization import CODECS, JSONCodec, msgpack, orjson
+
+def make_payload(size: int):
+    records = [{'id': i, 'name': f"employee-{i}", 'department': f"dept-{i % 7}",
+                'salary': (i * 7919) % 100000, 'rating': round((i % 50) / 10, 1), 'active': i % 3 != 0}
+               for i in range(size)]
+    return {'operation': 'filter_records', 'args': [records, 'salary', '>', 50000], 'kwargs': {}}
+
+def best_time(func, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='10000,100000,1000000')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    codecs = {'json (stdlib)': JSONCodec(use_orjson=False)}
+    if orjson is not None:
+        codecs['json (orjson)'] = JSONCodec()
+    if msgpack is not None:
+        codecs['msgpack'] = CODECS['msgpack']
+    missing = [name for name, module in [('orjson', orjson), ('msgpack', msgpack)] if module is None]
+    if missing:
+        print(f"Not installed, skipped: {', '.join(missing)} (pip install {' '.join(missing)})")
+
+    print(f"{'records':>9}  {'format':<15}{'encode ms':>11}{'decode ms':>11}{'size MB':>9}{'vs stdlib':>11}")
+    for size in [int(s) for s in args.sizes.split(',')]:
+        payload = make_payload(size)
+        baseline = None
+        for name, codec in codecs.items():
+            body = codec.dumps(payload)
+            encode_ms = best_time(lambda: codec.dumps(payload), args.repeat)
+            decode_ms = best_time(lambda: codec.loads(body), args.repeat)
+            total = encode_ms + decode_ms
+            baseline = baseline or total
+            print(f"{size:>9}  {name:<15}{encode_ms:>11.1f}{decode_ms:>11.1f}"
+                  f"{len(body) / 1e6:>9.2f}{baseline / total:>10.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Benchmark - Buffered /operate vs. streamed /operate_stream for record-returning operations.
+
+The server runs in this process so tracemalloc sees server and client
+allocations together: the buffered call holds the full result list, its
+encoded body and the decoded copy; the streamed call holds about one chunk.
+Both include the request (records sent to the server). Timings come from a
+separate pass without tracemalloc, which slows allocation-heavy code severalfold.
+
+Usage: python benchmarks/streaming.py [--sizes 10000,100000] [--operation select_fields]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_servers.data_server import DataMCPServer
+from sub_agents.data_agent import DataAgent
+from src.log import configure as configure_logging
+
+PORT = 8131
+
+ARGS = {
+    'filter_records': lambda: ['salary', '>', 10000],
+    'sort_records': lambda: ['salary'],
+    'select_fields': lambda: [['id', 'name', 'salary']]
+}
+
+def measure(consume) -> tuple:
+    """(seconds to first record, total seconds, peak MB above the baseline)."""
+    start = time.perf_counter()
+    first = consume()
+    total = time.perf_counter() - start
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    consume()
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    return first - start, total, peak / 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='10000,100000')
+    parser.add_argument('--operation', default='select_fields', choices=sorted(ARGS))
+    args = parser.parse_args()
+    configure_logging(level='WARNING')  # no per-call tool logging in the measurements
+
+    server = DataMCPServer(port=PORT, workers=2)
+    server.start()
+    # Compression is measured separately (benchmarks/compression.py)
+    agent = DataAgent(f"http://localhost:{PORT}", timeout=120, compression={'enabled': False})
+
+    print(f"{args.operation}: time to first record, total time, peak memory (server + client)\n")
+    print(f"{'records':>9}  {'mode':<10}{'first ms':>10}{'total ms':>10}{'peak MB':>9}")
+    try:
+        for size in [int(s) for s in args.sizes.split(',')]:
+            records = [{'id': i, 'name': f"employee-{i}", 'department': f"dept-{i % 7}",
+                        'salary': (i * 7919) % 100000} for i in range(size)]
+            op_args = [records, *ARGS[args.operation]()]
+
+            def buffered():
+                result = agent.call_mcp(args.operation, *op_args)['result']
+                first = time.perf_counter()  # nothing is usable before the whole body arrived
+                for _ in result:
+                    pass
+                return first
+
+            def streamed():
+                first = None
+                for _ in agent.stream_mcp(args.operation, *op_args):
+                    first = first or time.perf_counter()
+                return first
+
+            for mode, consume in [('buffered', buffered), ('streamed', streamed)]:
+                first, total, peak = measure(consume)
+                print(f"{size:>9}  {mode:<10}{first * 1000:>10.1f}{total * 1000:>10.1f}{peak:>9.1f}")
+    finally:
+        server.stop()
+
+if __name__ == '__main__':
+    main()
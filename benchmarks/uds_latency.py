@@ -0,0 +1,97 @@
+"""Benchmark - Per-call latency of MCP calls over loopback TCP vs. a Unix domain socket.
+
+One MathMCPServer listens on both; the same MathAgent call is made over
+each transport on a warm keep-alive connection, one call at a time, so the
+numbers are round-trip latency rather than throughput. A `--fresh` run opens
+a new connection per call to include the connect cost as well (sync client
+only: rebuilding the async client per call would dominate the timing).
+
+Usage: python benchmarks/uds_latency.py [--calls 2000] [--operation add] [--fresh]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_servers.math_server import MathMCPServer
+from sub_agents.math_agent import MathAgent
+from src.log import configure as configure_logging
+
+PORT = 8141
+
+ARGS = {
+    'add': [[1, 2, 3, 4, 5]],
+    'power': [2, 10],
+    'convert_seconds': [98765]
+}
+
+def summarize(samples) -> str:
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return (f"{statistics.mean(samples) * 1e6:>10.0f}{samples[len(samples) // 2] * 1e6:>10.0f}"
+            f"{p99 * 1e6:>10.0f}")
+
+def run_sync(agent: MathAgent, operation: str, calls: int, fresh: bool):
+    samples = []
+    for _ in range(calls):
+        if fresh:
+            agent.session.close()
+            agent._session = None
+        start = time.perf_counter()
+        result = agent.call_mcp(operation, *ARGS[operation])
+        samples.append(time.perf_counter() - start)
+        assert 'error' not in result, result
+    return samples
+
+async def run_async(agent: MathAgent, operation: str, calls: int):
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        result = await agent.acall_mcp(operation, *ARGS[operation])
+        samples.append(time.perf_counter() - start)
+        assert 'error' not in result, result
+    await agent.aclose()
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=2000)
+    parser.add_argument('--operation', default='add', choices=sorted(ARGS))
+    parser.add_argument('--fresh', action='store_true', help="new connection for every call")
+    args = parser.parse_args()
+    configure_logging(level='WARNING')  # no per-call tool logging in the measurements
+
+    path = os.path.join(tempfile.mkdtemp(), 'mcp-math.sock')
+    server = MathMCPServer(port=PORT, workers=2, unix_socket=path, compression={'enabled': False})
+    server.start()
+    agents = {
+        'tcp': MathAgent(f"http://localhost:{PORT}", timeout=10),
+        'unix': MathAgent(f"unix://{path}", timeout=10)
+    }
+
+    mode = "new connection per call" if args.fresh else "keep-alive"
+    print(f"{args.operation} x {args.calls}, {mode}: latency in microseconds\n")
+    print(f"{'client':<7}{'transport':<11}{'mean':>10}{'p50':>10}{'p99':>10}")
+    try:
+        for agent in agents.values():  # warm up both paths
+            run_sync(agent, args.operation, 50, False)
+        for client in (['sync'] if args.fresh else ['sync', 'async']):
+            results = {}
+            for transport, agent in agents.items():
+                if client == 'sync':
+                    results[transport] = run_sync(agent, args.operation, args.calls, args.fresh)
+                else:
+                    results[transport] = asyncio.run(run_async(agent, args.operation, args.calls))
+                print(f"{client:<7}{transport:<11}{summarize(results[transport])}")
+            speedup = statistics.mean(results['tcp']) / statistics.mean(results['unix'])
+            print(f"{'':<7}{'unix/tcp':<11}{speedup:>9.2f}x faster\n")
+    finally:
+        server.stop()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+"""Batch execution - Runs the items of an /operate_batch request with per-item results."""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+MAX_BATCH_ITEMS = 100
+
+# Shared by all batch requests of a server process; bounded so one batch cannot
+# spawn a thread per item
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="batch-item")
+
+def run_item(execute: Callable[[str, List[Any], Dict[str, Any]], Any], item: Any) -> Dict[str, Any]:
+    """Execute one {operation, args, kwargs} item; errors are captured, not raised."""
+    if not isinstance(item, dict) or not item.get('operation'):
+        return {'error': "Each batch item needs an 'operation'", 'status': 'error'}
+
+    operation = item['operation']
+    try:
+        result = execute(operation, item.get('args', []), item.get('kwargs', {}))
+        return {'operation': operation, 'result': result, 'status': 'success'}
+    except Exception as e:
+        return {'operation': operation, 'error': str(e), 'status': 'error'}
+
+def run_batch(execute: Callable[[str, List[Any], Dict[str, Any]], Any], items: List[Any],
+              parallel: bool = False) -> List[Dict[str, Any]]:
+    """Run items in order (or concurrently when `parallel`); results keep the input order."""
+    if not isinstance(items, list):
+        raise ValueError("'items' must be a list")
+    if len(items) > MAX_BATCH_ITEMS:
+        raise ValueError(f"Batch exceeds {MAX_BATCH_ITEMS} items")
+
+    if parallel and len(items) > 1:
+        return list(_executor.map(lambda item: run_item(execute, item), items))
+    return [run_item(execute, item) for item in items]
@@ -0,0 +1,429 @@
+"""MCP server core - Operation registry, request handler and server shared by all MCP servers."""
+import functools
+import importlib
+import inspect
+import json
+import os
+import socket
+import threading
+import typing
+from http.server import HTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from src.http_pool import JSONRequestHandler, PooledHTTPServer, UnixPooledHTTPServer
+from src.compression import Compressor, UnsupportedEncoding, available_encodings
+from src.log import fields, get_logger, short
+from src.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsRegistry, OperationMetrics
+from src.serialization import UnsupportedMediaType, available_formats, dumps, ndjson_stream
+from mcp_servers.batch import run_batch
+from mcp_servers.result_cache import ResultCache
+
+log = get_logger('mcp')
+
+class InvalidArguments(ValueError):
+    """Arguments do not match the operation's schema."""
+
+def _schema_for(annotation: Any) -> Tuple[str, Callable[[Any], bool]]:
+    """Compile a type hint into (schema type name, validator) once, at registration."""
+    if annotation in (inspect.Parameter.empty, Any):
+        return 'any', lambda value: True
+
+    origin = typing.get_origin(annotation)
+    if origin is typing.Union:
+        options = [_schema_for(arg) for arg in typing.get_args(annotation)]
+        name = '|'.join(dict.fromkeys(name for name, _ in options))  # Union[int, float] -> number
+        checks = [check for _, check in options]
+        return name, lambda value: any(check(value) for check in checks)
+
+    if origin in (list, List):
+        (item,) = typing.get_args(annotation) or (Any,)
+        item_name, item_check = _schema_for(item)
+        return f"list[{item_name}]", lambda value: isinstance(value, list) and all(map(item_check, value))
+
+    if origin in (dict, Dict) or annotation in (dict, Dict):
+        return 'object', lambda value: isinstance(value, dict)
+    if annotation is list:
+        return 'list', lambda value: isinstance(value, list)
+    if annotation is type(None):
+        return 'null', lambda value: value is None
+    if annotation is bool:
+        return 'boolean', lambda value: isinstance(value, bool)
+    if annotation in (int, float):
+        # JSON does not distinguish 3 from 3.0; accept any number, but not booleans
+        return 'number', lambda value: isinstance(value, (int, float)) and not isinstance(value, bool)
+    if annotation is str:
+        return 'string', lambda value: isinstance(value, str)
+    return 'any', lambda value: True
+
+class Operation:
+    """A registered operation: callable, argument schema and compiled validators."""
+
+    def __init__(self, name: str, func: Callable, description: str, aliases: Sequence[str],
+                 stream: Optional[Callable] = None, cacheable: bool = False):
+        self.name = name
+        self.func = func
+        self.stream = stream  # generator variant served by /operate_stream
+        self.cacheable = cacheable  # pure: same arguments, same result
+        self.description = description
+        self.aliases = list(aliases)
+        self.signature = inspect.signature(func)
+        hints = typing.get_type_hints(func)
+
+        self.parameters = []
+        self._checks: Dict[str, Tuple[str, Callable[[Any], bool]]] = {}
+        for param in self.signature.parameters.values():
+            type_name, check = _schema_for(hints.get(param.name, inspect.Parameter.empty))
+            self._checks[param.name] = (type_name, check)
+            entry = {'name': param.name, 'type': type_name,
+                     'required': param.default is inspect.Parameter.empty}
+            if param.default is not inspect.Parameter.empty:
+                entry['default'] = param.default
+            self.parameters.append(entry)
+
+    def validate(self, args: List[Any], kwargs: Dict[str, Any]):
+        """Reject wrong arity, unknown keywords or mistyped values before running anything."""
+        if not isinstance(args, list) or not isinstance(kwargs, dict):
+            raise InvalidArguments(f"{self.name}: 'args' must be a list and 'kwargs' an object")
+        try:
+            bound = self.signature.bind(*args, **kwargs)
+        except TypeError as e:
+            raise InvalidArguments(f"{self.name}: {e}")
+        for param_name, value in bound.arguments.items():
+            type_name, check = self._checks[param_name]
+            if not check(value):
+                raise InvalidArguments(f"{self.name}: '{param_name}' must be {type_name}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        tool = {'name': self.name, 'description': self.description, 'parameters': self.parameters}
+        if self.aliases:
+            tool['aliases'] = self.aliases
+        if self.stream is not None:
+            tool['streaming'] = True
+        return tool
+
+# service name -> registry, filled as the server modules are imported
+REGISTRIES: Dict[str, 'OperationRegistry'] = {}
+
+def get_registry(service: str) -> 'OperationRegistry':
+    """Registry of a service, importing mcp_servers.<service>_server on first use."""
+    if service not in REGISTRIES:
+        try:
+            importlib.import_module(f"mcp_servers.{service}_server")
+        except ImportError:
+            pass
+    if service not in REGISTRIES:
+        raise ValueError(f"Unknown MCP service: {service}")
+    return REGISTRIES[service]
+
+class OperationRegistry:
+    """Operations of one MCP service, registered by decorator and dispatched by dict lookup.
+
+    `cacheable` is the default for operations that do not say otherwise: set it
+    for services made of pure functions so the result cache may serve them.
+    """
+
+    def __init__(self, service: str, cacheable: bool = False):
+        REGISTRIES[service] = self
+        self.service = service
+        self.cacheable = cacheable
+        self.operations: Dict[str, Operation] = {}
+        self._lookup: Dict[str, Operation] = {}
+        self._tools_body: Optional[bytes] = None
+        self.set_health()
+
+    def set_health(self, **details: Any):
+        """Pre-serialize the /health payload (worker processes add their index and pid)."""
+        health = {'status': 'healthy', 'service': self.service, 'formats': available_formats(), **details}
+        self.health_body = json.dumps(health).encode('utf-8')
+
+    def operation(self, description: str = "", aliases: Sequence[str] = (), streaming: bool = False,
+                  cacheable: Optional[bool] = None):
+        """Decorator registering a function under its own name (and any aliases).
+
+        With `streaming`, the function is a generator: /operate_stream sends its
+        items as they are produced, while /operate (and direct calls) get a list.
+        """
+        def register(func: Callable) -> Callable:
+            stream = None
+            if streaming:
+                stream = func
+
+                @functools.wraps(stream)
+                def func(*args, **kwargs):
+                    return list(stream(*args, **kwargs))
+
+            op = Operation(func.__name__, func, description or (func.__doc__ or '').strip(), aliases, stream,
+                           self.cacheable if cacheable is None else cacheable)
+            for name in [op.name, *op.aliases]:
+                if name in self._lookup:
+                    raise ValueError(f"Operation {name} registered twice for {self.service}")
+                self._lookup[name] = op
+            self.operations[op.name] = op
+            self._tools_body = None
+            return func
+        return register
+
+    def resolve(self, name: str) -> Operation:
+        op = self._lookup.get(name) if isinstance(name, str) else None
+        if op is None:
+            raise ValueError(f"Unknown operation: {name}")
+        return op
+
+    def execute(self, name: str, args: List[Any], kwargs: Dict[str, Any]) -> Any:
+        """Validate, then run the operation."""
+        op = self.resolve(name)
+        op.validate(args, kwargs)
+        return op.func(*args, **kwargs)
+
+    def stream(self, name: str, args: List[Any], kwargs: Dict[str, Any]) -> Iterator[Any]:
+        """Validate, then return the operation's item generator."""
+        op = self.resolve(name)
+        if op.stream is None:
+            raise ValueError(f"Operation {op.name} does not support streaming")
+        op.validate(args, kwargs)
+        return op.stream(*args, **kwargs)
+
+    @property
+    def names(self) -> List[str]:
+        """Every name the registry answers to, including aliases."""
+        return list(self._lookup)
+
+    @property
+    def tools_body(self) -> bytes:
+        """Serialized /tools response, built once."""
+        if self._tools_body is None:
+            tools = {'tools': [op.to_dict() for op in self.operations.values()]}
+            self._tools_body = json.dumps(tools).encode('utf-8')
+        return self._tools_body
+
+POST_ENDPOINTS = ('/operate', '/operate_batch', '/operate_stream')
+
+def server_metrics() -> OperationMetrics:
+    """Per-endpoint and per-operation request metrics of one server process (`mcp_*`)."""
+    return OperationMetrics(MetricsRegistry(), "mcp", ('endpoint', 'operation'), ('endpoint',),
+                            what="MCP requests")
+
+class MCPHandler(JSONRequestHandler):
+    """HTTP handler serving one OperationRegistry: /operate, /operate_batch, /operate_stream,
+    /tools, /health, /stats, /metrics."""
+
+    registry: OperationRegistry = None
+    label = "MCP"
+    call = None  # metrics of the request being handled
+
+    def _report_result(self, operation: str, result: Any):
+        log.debug("  [✅ RESULT] %s executed", operation)
+
+    def _execute(self, operation: str, args: List[Any], kwargs: Dict[str, Any]) -> Any:
+        """Run a single operation."""
+        log.debug("  [⚙️ %s TOOL] %s(%s, %s)", self.label, operation, short(args), short(kwargs),
+                  extra=fields(service=self.registry.service, operation=operation))
+        result = self.registry.execute(operation, args, kwargs)
+        self._report_result(operation, result)
+        return result
+
+    def do_POST(self):
+        """Handle POST requests, recorded in the server's metrics when it has them."""
+        metrics = getattr(self.server, 'metrics', None)
+        if metrics is None:
+            self._handle_post()
+            return
+
+        endpoint = self.path if self.path in POST_ENDPOINTS else 'other'
+        self.response_status = self.response_bytes = 0
+        with metrics.track(endpoint=endpoint) as call:
+            self.call = call
+            try:
+                self._handle_post()
+            finally:
+                self.call = None
+                call.request_bytes = int(self.headers.get('Content-Length') or 0)
+                call.response_bytes = self.response_bytes
+                call.error = call.error or self.response_status >= 400
+
+    def _label_operation(self, name: Any):
+        """Label the request's metrics with the canonical operation name."""
+        if self.call is not None:
+            op = self.registry._lookup.get(name) if isinstance(name, str) else None
+            self.call.labels['operation'] = op.name if op is not None else 'unknown'
+
+    def _handle_post(self):
+        try:
+            if self.path == '/operate_stream':
+                # Items as NDJSON lines while they are produced, then a status line
+                request = self.read_json()
+                operation = request.get('operation')
+                args = request.get('args', [])
+                kwargs = request.get('kwargs', {})
+                self._label_operation(operation)
+                log.debug("  [⚙️ %s TOOL] %s(%s, %s) [stream]", self.label, operation, short(args), short(kwargs),
+                          extra=fields(service=self.registry.service, operation=operation, stream=True))
+                items = self.registry.stream(operation, args, kwargs)
+                self.send_chunked(200, ndjson_stream(items))
+                return
+
+            if self.path == '/operate_batch':
+                # Ordered list of {operation, args, kwargs}; each item succeeds or fails on its own
+                request = self.read_json()
+                if self.call is not None:
+                    self.call.labels['operation'] = 'batch'
+                results = run_batch(self._execute, request.get('items'), bool(request.get('parallel')))
+                self.send_json(200, {'results': results, 'status': 'success'})
+                return
+
+            if self.path != '/operate':
+                self.send_error(404)
+                return
+
+            request = self.read_json()
+
+            operation = request.get('operation')
+            args = request.get('args', [])
+            kwargs = request.get('kwargs', {})
+            self._label_operation(operation)
+
+            # Pure operations: identical arguments are answered from stored response bytes
+            cache = getattr(self.server, 'result_cache', None)
+            ttl = None
+            if cache is not None:
+                op = self.registry.resolve(operation)
+                ttl = cache.ttl_for(op)
+            if ttl is not None:
+                op.validate(args, kwargs)
+                key = cache.key(op, operation, args, kwargs)
+                codec = self.response_codec()
+                body = cache.get(key, codec.name)
+                if body is not None:
+                    log.debug("  [⚡ %s CACHE] %s hit", self.label, operation,
+                              extra=fields(service=self.registry.service, operation=operation, cache='hit'))
+                    self.send_body(200, body, codec.content_type)
+                    return
+
+            result = self._execute(operation, args, kwargs)
+
+            response = {
+                'operation': operation,
+                'result': result,
+                'status': 'success'
+            }
+
+            if ttl is not None:
+                body, codec = dumps(codec, response)
+                cache.put(key, codec.name, body, op.name, ttl)
+                self.send_body(200, body, codec.content_type)
+            else:
+                self.send_json(200, response)
+
+        except (UnsupportedMediaType, UnsupportedEncoding) as e:
+            self.send_json(415, {'error': str(e), 'formats': available_formats(),
+                                 'encodings': available_encodings()})
+
+        except Exception as e:
+            log.info("  [❌ ERROR] %s", short(str(e)), extra=fields(service=self.registry.service, path=self.path))
+            self.send_json(400, {'error': str(e)})
+
+    def do_GET(self):
+        """Handle GET requests."""
+        if self.path == '/health':
+            self.send_body(200, self.registry.health_body)
+        elif self.path == '/tools':
+            self.send_body(200, self.registry.tools_body)
+        elif self.path == '/stats':
+            stats = {'service': self.registry.service, 'pid': os.getpid(),
+                     'transport': 'unix' if self.server.address_family == socket.AF_UNIX else 'tcp'}
+            if isinstance(self.server, PooledHTTPServer):
+                stats['server'] = self.server.stats()
+            if getattr(self.server, 'compression', None) is not None:
+                stats['compression'] = self.server.compression.stats()
+            if getattr(self.server, 'result_cache', None) is not None:
+                stats['result_cache'] = self.server.result_cache.stats()
+            self.send_json(200, stats)
+        elif self.path == '/metrics' and getattr(self.server, 'metrics', None) is not None:
+            self.send_body(200, self.server.metrics.registry.render(), METRICS_CONTENT_TYPE)
+        else:
+            self.send_error(404)
+
+class MCPServer:
+    """Threaded MCP server around an MCPHandler subclass.
+
+    With `unix_socket` set, the server also listens on that Unix domain socket
+    path (its own worker pool; result cache and compression stats are shared)
+    for clients on the same host.
+    """
+
+    handler_class = MCPHandler
+    label = "MCP"
+
+    def __init__(self, host: str = 'localhost', port: int = 8000, workers: int = 8,
+                 queue_size: int = 64, drain_timeout: float = 10, keepalive_timeout: float = 5,
+                 reuse_port: bool = False, compression: Optional[Dict[str, Any]] = None,
+                 result_cache: Optional[Dict[str, Any]] = None, unix_socket: Optional[str] = None,
+                 unix_listener: Optional[socket.socket] = None):
+        self.host = host
+        self.port = port
+        self.workers = workers          # 0 = single-threaded HTTPServer
+        self.queue_size = queue_size
+        self.drain_timeout = drain_timeout
+        self.keepalive_timeout = keepalive_timeout
+        self.reuse_port = reuse_port    # set for each process of a multi-process server
+        compression = compression or {}
+        self.compression = Compressor(min_size=compression.get('min_size', 1024),
+                                      encodings=compression.get('encodings'),
+                                      enabled=compression.get('enabled', True))
+        result_cache = result_cache or {}
+        self.result_cache = None  # opt-in
+        if result_cache.get('enabled', False):
+            self.result_cache = ResultCache(max_bytes=result_cache.get('max_bytes', 32 * 1024 * 1024),
+                                            ttl_seconds=result_cache.get('ttl_seconds', 300),
+                                            operations=result_cache.get('operations'))
+        self.metrics = server_metrics()  # shared by the TCP and Unix socket listeners
+        self.unix_socket = unix_socket
+        self.unix_listener = unix_listener  # pre-bound by a multi-process parent
+        self.server = None
+        self.thread = None
+        self.unix_server = None
+        self.unix_thread = None
+
+    def start(self):
+        """Start the server."""
+        if self.workers > 0 or self.reuse_port:
+            self.server = PooledHTTPServer((self.host, self.port), self.handler_class,
+                                           workers=max(1, self.workers), queue_size=self.queue_size,
+                                           keepalive_timeout=self.keepalive_timeout,
+                                           reuse_port=self.reuse_port)
+        else:
+            self.server = HTTPServer((self.host, self.port), self.handler_class)
+        self.server.compression = self.compression
+        self.server.result_cache = self.result_cache
+        self.server.metrics = self.metrics
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        log.info("[%s MCP] Started on http://%s:%s (%s workers)", self.label, self.host, self.port, self.workers or 1)
+
+        if self.unix_socket:
+            self.unix_server = UnixPooledHTTPServer(self.unix_socket, self.handler_class,
+                                                    listener=self.unix_listener,
+                                                    workers=max(1, self.workers), queue_size=self.queue_size,
+                                                    keepalive_timeout=self.keepalive_timeout)
+            self.unix_server.compression = self.compression
+            self.unix_server.result_cache = self.result_cache
+            self.unix_server.metrics = self.metrics
+            self.unix_thread = threading.Thread(target=self.unix_server.serve_forever, daemon=True)
+            self.unix_thread.start()
+            log.info("[%s MCP] Listening on unix://%s", self.label, self.unix_socket)
+
+    @property
+    def requests(self) -> int:
+        """Responses sent by the pooled listeners (TCP and Unix socket)."""
+        return sum(server.requests for server in (self.server, self.unix_server)
+                   if isinstance(server, PooledHTTPServer))
+
+    def stop(self):
+        """Stop the server."""
+        if self.unix_server:
+            self.unix_server.drain(self.drain_timeout)
+        if self.server:
+            if isinstance(self.server, PooledHTTPServer):
+                self.server.drain(self.drain_timeout)
+            else:
+                self.server.shutdown()
+            log.info("[%s MCP] Stopped", self.label)
@@ -1,16 +1,25 @@
 """Data MCP Server - Provides data analysis operations (Port 8001)."""
-import json
-from typing import List, Dict, Any
-from http.server import HTTPServer, BaseHTTPRequestHandler
-import threading
+from typing import List, Dict, Any, Iterator, Optional
+import os
+import sys
+
+# Allow running directly: python mcp_servers/<name>_server.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_servers.core import MCPHandler, MCPServer, OperationRegistry
+
+registry = OperationRegistry('data')
+
+# aggregate_records `type` -> aggregate() operation
+AGGREGATE_TYPES = {'count': 'count', 'sum': 'sum', 'avg': 'average', 'average': 'average', 'max': 'max', 'min': 'min'}
 
 class DataOperations:
     """Data operation handlers."""
     
     @staticmethod
-    def filter_records(records: List[Dict], field: str, operator: str, value: Any) -> List[Dict]:
+    @registry.operation("Filter records", streaming=True)
+    def filter_records(records: List[Dict], field: str, operator: str, value: Any) -> Iterator[Dict]:
         """Filter records based on condition."""
-        result = []
         for record in records:
             if field not in record:
                 continue
@@ -19,26 +28,25 @@ class DataOperations:
             
             if operator == "==":
                 if record_value == value:
-                    result.append(record)
+                    yield record
             elif operator == ">":
                 if record_value > value:
-                    result.append(record)
+                    yield record
             elif operator == "<":
                 if record_value < value:
-                    result.append(record)
+                    yield record
             elif operator == ">=":
                 if record_value >= value:
-                    result.append(record)
+                    yield record
             elif operator == "<=":
                 if record_value <= value:
-                    result.append(record)
+                    yield record
             elif operator == "in":
                 if record_value in value:
-                    result.append(record)
-        
-        return result
+                    yield record
     
     @staticmethod
+    @registry.operation("Group records", aliases=['group_records'])
     def group_by(records: List[Dict], field: str) -> Dict[str, List[Dict]]:
         """Group records by field."""
         groups = {}
@@ -51,11 +59,13 @@ class DataOperations:
         return groups
     
     @staticmethod
-    def sort_records(records: List[Dict], field: str, descending: bool = False) -> List[Dict]:
+    @registry.operation("Sort records", streaming=True)
+    def sort_records(records: List[Dict], field: str, descending: bool = False) -> Iterator[Dict]:
         """Sort records by field."""
-        return sorted(records, key=lambda x: x.get(field, 0), reverse=descending)
+        yield from sorted(records, key=lambda x: x.get(field, 0), reverse=descending)
     
     @staticmethod
+    @registry.operation("Aggregate data")
     def aggregate(records: List[Dict], field: str, operation: str) -> Any:
         """Aggregate field values."""
         values = [r.get(field, 0) for r in records if field in r]
@@ -77,20 +87,31 @@ class DataOperations:
         return None
     
     @staticmethod
-    def select_fields(records: List[Dict], fields: List[str]) -> List[Dict]:
+    @registry.operation("Aggregate records as DataAgent asks: type count, sum or avg of a field")
+    def aggregate_records(records: List[Dict], type: str = 'count', field: Optional[str] = None) -> Any:
+        """DataAgent's aggregate_records call (`type`, `field`) mapped onto aggregate()."""
+        if type == 'count' and field is None:
+            return len(records)
+        operation = AGGREGATE_TYPES.get(type)
+        if operation is None or not isinstance(field, str):
+            raise ValueError(f"aggregate_records: unsupported aggregate {type!r} of field {field!r}")
+        return DataOperations.aggregate(records, field, operation)
+    
+    @staticmethod
+    @registry.operation("Select fields", streaming=True)
+    def select_fields(records: List[Dict], fields: List[str]) -> Iterator[Dict]:
         """Select specific fields from records."""
-        result = []
         for record in records:
-            selected = {f: record.get(f) for f in fields if f in record}
-            result.append(selected)
-        return result
+            yield {f: record.get(f) for f in fields if f in record}
     
     @staticmethod
+    @registry.operation("Count records")
     def count_records(records: List[Dict]) -> int:
         """Count records."""
         return len(records)
     
     @staticmethod
+    @registry.operation("Get unique values")
     def unique_values(records: List[Dict], field: str) -> List[Any]:
         """Get unique values for a field."""
         values = set()
@@ -99,103 +120,20 @@ class DataOperations:
                 values.add(str(record[field]))
         return sorted(list(values))
 
-class DataHandler(BaseHTTPRequestHandler):
+class DataHandler(MCPHandler):
     """HTTP handler for data operations."""
     
-    def do_POST(self):
-        """Handle POST requests."""
-        try:
-            if self.path != '/operate':
-                self.send_error(404)
-                return
-            
-            content_length = int(self.headers.get('Content-Length', 0))
-            body = self.rfile.read(content_length)
-            request = json.loads(body.decode('utf-8'))
-            
-            operation = request.get('operation')
-            args = request.get('args', [])
-            kwargs = request.get('kwargs', {})
-            
-            # Log tool call
-            print(f"  [⚙️ DATA TOOL] {operation}({args}, {kwargs})")
-            
-            data_ops = DataOperations()
-            if not hasattr(data_ops, operation):
-                raise ValueError(f"Unknown operation: {operation}")
-            
-            func = getattr(data_ops, operation)
-            result = func(*args, **kwargs)
-            print(f"  [✅ RESULT] {operation} executed")
-            
-            response = {
-                'operation': operation,
-                'result': result,
-                'status': 'success'
-            }
-            
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(response).encode('utf-8'))
-        
-        except Exception as e:
-            self.send_response(400)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
-    
-    def do_GET(self):
-        """Handle GET requests."""
-        if self.path == '/health':
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps({'status': 'healthy', 'service': 'data'}).encode('utf-8'))
-        
-        elif self.path == '/tools':
-            tools = {
-                'tools': [
-                    {'name': 'filter_records', 'description': 'Filter records'},
-                    {'name': 'group_by', 'description': 'Group records'},
-                    {'name': 'sort_records', 'description': 'Sort records'},
-                    {'name': 'aggregate', 'description': 'Aggregate data'},
-                    {'name': 'select_fields', 'description': 'Select fields'},
-                    {'name': 'count_records', 'description': 'Count records'},
-                    {'name': 'unique_values', 'description': 'Get unique values'},
-                ]
-            }
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(tools).encode('utf-8'))
-        else:
-            self.send_error(404)
-    
-    def log_message(self, format, *args):
-        pass
+    registry = registry
+    label = "DATA"
 
-class DataMCPServer:
+class DataMCPServer(MCPServer):
     """Data MCP Server."""
     
-    def __init__(self, host: str = 'localhost', port: int = 8001):
-        self.host = host
-        self.port = port
-        self.server = None
-        self.thread = None
-    
-    def start(self):
-        """Start the server."""
-        self.server = HTTPServer((self.host, self.port), DataHandler)
-        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
-        self.thread.start()
-        print(f"[DATA MCP] Started on http://{self.host}:{self.port}")
+    handler_class = DataHandler
+    label = "DATA"
     
-    def stop(self):
-        """Stop the server."""
-        if self.server:
-            self.server.shutdown()
-            print("[DATA MCP] Stopped")
+    def __init__(self, host: str = 'localhost', port: int = 8001, **options):
+        super().__init__(host, port, **options)
 
 if __name__ == '__main__':
     server = DataMCPServer()
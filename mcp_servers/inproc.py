@@ -0,0 +1,100 @@
+"""In-process MCP - Calls a service's OperationRegistry directly, without HTTP or sockets.
+
+For co-located agents (tests, single-box deployments, embedded use). Agents
+pick it with an `inproc://<service>` URL, e.g. `inproc://math`.
+"""
+import asyncio
+import functools
+import threading
+from typing import Any, AsyncIterator, Dict, Iterator, List
+
+from mcp_servers.batch import run_batch
+from mcp_servers.core import get_registry
+from src.serialization import JSON, StreamError
+
+class InProcessServer:
+    """Answers /operate, /operate_batch and /operate_stream calls like the HTTP server would.
+
+    Arguments are passed as-is. Responses are copied through JSON: HTTP callers
+    never share objects with the server, and JSON turns tuples into lists and
+    non-string keys into strings. So the results are identical to the HTTP
+    path, including the "MCP Error: 400" a rejected call gets. Async calls run in
+    the default executor so long operations do not block the event loop.
+    """
+
+    def __init__(self, service: str):
+        self.registry = get_registry(service)
+        self.service = service
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+
+    def _count(self, calls: int = 0, errors: int = 0):
+        with self._lock:
+            self.calls += calls
+            self.errors += errors
+
+    def operate(self, operation: str, args: List[Any], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        self._count(calls=1)
+        try:
+            result = self.registry.execute(operation, args, kwargs)
+        except Exception:
+            self._count(errors=1)
+            return {'error': "MCP Error: 400"}
+        return JSON.loads(JSON.dumps({'operation': operation, 'result': result, 'status': 'success'}))
+
+    def operate_batch(self, items: List[Dict[str, Any]], parallel: bool = False) -> List[Dict[str, Any]]:
+        self._count(calls=1)
+        try:
+            results = run_batch(self.registry.execute, items, parallel)
+        except Exception:
+            self._count(errors=1)
+            return [{'error': "MCP Error: 400"} for _ in items]
+        return JSON.loads(JSON.dumps(results))
+
+    def stream(self, operation: str, args: List[Any], kwargs: Dict[str, Any]) -> Iterator[Any]:
+        """Items of a streaming operation; failures raise StreamError as on the HTTP path."""
+        self._count(calls=1)
+        try:
+            items = self.registry.stream(operation, args, kwargs)
+        except Exception as e:
+            self._count(errors=1)
+            raise StreamError(f"MCP Error: 400 {JSON.dumps({'error': str(e)}).decode('utf-8')}")
+        try:
+            for item in items:
+                yield JSON.loads(JSON.dumps(item))
+        except Exception as e:
+            self._count(errors=1)
+            raise StreamError(str(e) or "stream failed")
+
+    async def aoperate(self, operation: str, args: List[Any], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        return await _in_executor(self.operate, operation, args, kwargs)
+
+    async def aoperate_batch(self, items: List[Dict[str, Any]], parallel: bool = False) -> List[Dict[str, Any]]:
+        return await _in_executor(self.operate_batch, items, parallel)
+
+    async def astream(self, operation: str, args: List[Any], kwargs: Dict[str, Any]) -> AsyncIterator[Any]:
+        """Async variant of stream(); items are produced in the executor in batches."""
+        items = self.stream(operation, args, kwargs)
+        while True:
+            batch = await _in_executor(_take, items, 1024)
+            for item in batch:
+                yield item
+            if len(batch) < 1024:
+                return
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'calls': self.calls, 'errors': self.errors}
+
+async def _in_executor(func, *args) -> Any:
+    """Run a blocking call in the loop's default executor (asyncio.to_thread needs Python 3.9)."""
+    return await asyncio.get_running_loop().run_in_executor(None, functools.partial(func, *args))
+
+def _take(items: Iterator[Any], count: int) -> List[Any]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == count:
+            break
+    return batch
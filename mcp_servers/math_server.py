@@ -1,22 +1,34 @@
 """Math MCP Server - Provides mathematical operations (Port 8000)."""
-import json
 import statistics
 from typing import List, Union, Dict, Any
-from http.server import HTTPServer, BaseHTTPRequestHandler
-import threading
+import os
+import sys
+
+# Allow running directly: python mcp_servers/<name>_server.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_servers.core import MCPHandler, MCPServer, OperationRegistry
+from src.log import get_logger, short
+
+log = get_logger('mcp.math')
+
+registry = OperationRegistry('math', cacheable=True)  # pure functions of their arguments
 
 class MathOperations:
     """Math operation handlers."""
     
     @staticmethod
+    @registry.operation("Add numbers")
     def add(numbers: List[Union[int, float]]) -> float:
         return sum(numbers)
     
     @staticmethod
+    @registry.operation("Subtract")
     def subtract(a: Union[int, float], b: Union[int, float]) -> float:
         return a - b
     
     @staticmethod
+    @registry.operation("Multiply numbers")
     def multiply(numbers: List[Union[int, float]]) -> float:
         result = 1
         for n in numbers:
@@ -24,50 +36,59 @@ class MathOperations:
         return result
     
     @staticmethod
+    @registry.operation("Divide")
     def divide(a: Union[int, float], b: Union[int, float]) -> float:
         if b == 0:
             raise ValueError("Division by zero")
         return a / b
     
     @staticmethod
+    @registry.operation("Calculate average")
     def average(numbers: List[Union[int, float]]) -> float:
         if not numbers:
             raise ValueError("Cannot average empty list")
         return statistics.mean(numbers)
     
     @staticmethod
+    @registry.operation("Calculate median")
     def median(numbers: List[Union[int, float]]) -> float:
         if not numbers:
             raise ValueError("Cannot find median of empty list")
         return statistics.median(numbers)
     
     @staticmethod
+    @registry.operation("Sum numbers")
     def sum_numbers(numbers: List[Union[int, float]]) -> float:
         return sum(numbers)
     
     @staticmethod
+    @registry.operation("Find maximum")
     def max_value(numbers: List[Union[int, float]]) -> Union[int, float]:
         if not numbers:
             raise ValueError("Cannot find max of empty list")
         return max(numbers)
     
     @staticmethod
+    @registry.operation("Find minimum")
     def min_value(numbers: List[Union[int, float]]) -> Union[int, float]:
         if not numbers:
             raise ValueError("Cannot find min of empty list")
         return min(numbers)
     
     @staticmethod
+    @registry.operation("Power operation")
     def power(base: Union[int, float], exponent: Union[int, float]) -> float:
         return base ** exponent
     
     @staticmethod
+    @registry.operation("Square root")
     def square_root(number: Union[int, float]) -> float:
         if number < 0:
             raise ValueError("Cannot take square root of negative number")
         return number ** 0.5
     
     @staticmethod
+    @registry.operation("Convert seconds to hours, minutes, seconds")
     def convert_seconds(total_seconds: int) -> Dict[str, Any]:
         """Convert seconds to hours, minutes, seconds (step-by-step)."""
         
@@ -101,110 +122,23 @@ class MathOperations:
             }
         }
 
-class MathHandler(BaseHTTPRequestHandler):
+class MathHandler(MCPHandler):
     """HTTP handler for math operations."""
     
-    def do_POST(self):
-        """Handle POST requests."""
-        try:
-            if self.path != '/operate':
-                self.send_error(404)
-                return
-            
-            content_length = int(self.headers.get('Content-Length', 0))
-            body = self.rfile.read(content_length)
-            request = json.loads(body.decode('utf-8'))
-            
-            operation = request.get('operation')
-            args = request.get('args', [])
-            kwargs = request.get('kwargs', {})
-            
-            # Log tool call
-            print(f"  [⚙️ MATH TOOL] {operation}({args}, {kwargs})")
-            
-            math_ops = MathOperations()
-            if not hasattr(math_ops, operation):
-                raise ValueError(f"Unknown operation: {operation}")
-            
-            func = getattr(math_ops, operation)
-            result = func(*args, **kwargs)
-            print(f"  [✅ RESULT] {operation} = {result}")
-            
-            response = {
-                'operation': operation,
-                'result': result,
-                'status': 'success'
-            }
-            
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(response).encode('utf-8'))
-        
-        except Exception as e:
-            import traceback
-            print(f"  [❌ ERROR] {str(e)}")
-            print(f"  [TRACEBACK] {traceback.format_exc()}")
-            self.send_response(400)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
-    
-    def do_GET(self):
-        """Handle GET requests."""
-        if self.path == '/health':
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps({'status': 'healthy', 'service': 'math'}).encode('utf-8'))
-        
-        elif self.path == '/tools':
-            tools = {
-                'tools': [
-                    {'name': 'add', 'description': 'Add numbers'},
-                    {'name': 'subtract', 'description': 'Subtract'},
-                    {'name': 'multiply', 'description': 'Multiply numbers'},
-                    {'name': 'divide', 'description': 'Divide'},
-                    {'name': 'average', 'description': 'Calculate average'},
-                    {'name': 'median', 'description': 'Calculate median'},
-                    {'name': 'max_value', 'description': 'Find maximum'},
-                    {'name': 'min_value', 'description': 'Find minimum'},
-                    {'name': 'power', 'description': 'Power operation'},
-                    {'name': 'square_root', 'description': 'Square root'},
-                    {'name': 'convert_seconds', 'description': 'Convert seconds to hours, minutes, seconds'},
-                ]
-            }
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(tools).encode('utf-8'))
-        else:
-            self.send_error(404)
-    
-    def log_message(self, format, *args):
-        pass
+    registry = registry
+    label = "MATH"
+    
+    def _report_result(self, operation: str, result: Any):
+        log.debug("  [✅ RESULT] %s = %s", operation, short(result))
 
-class MathMCPServer:
+class MathMCPServer(MCPServer):
     """Math MCP Server."""
     
-    def __init__(self, host: str = 'localhost', port: int = 8000):
-        self.host = host
-        self.port = port
-        self.server = None
-        self.thread = None
-    
-    def start(self):
-        """Start the server."""
-        self.server = HTTPServer((self.host, self.port), MathHandler)
-        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
-        self.thread.start()
-        print(f"[MATH MCP] Started on http://{self.host}:{self.port}")
-    
-    def stop(self):
-        """Stop the server."""
-        if self.server:
-            self.server.shutdown()
-            print("[MATH MCP] Stopped")
+    handler_class = MathHandler
+    label = "MATH"
+    
+    def __init__(self, host: str = 'localhost', port: int = 8000, **options):
+        super().__init__(host, port, **options)
 
 if __name__ == '__main__':
     server = MathMCPServer()
@@ -0,0 +1,112 @@
+"""Result cache - Serialized /operate responses of pure operations, keyed by their arguments."""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+class ResultCache:
+    """Byte-bounded LRU of encoded response bodies with per-operation TTLs.
+
+    Keys hash the requested operation name and its bound arguments (defaults
+    applied), so `add([1, 2])` and `add(numbers=[1, 2])` share an entry. The
+    name stays as requested because the stored response echoes it.
+    Entries store the response bytes per wire format, so a hit skips both
+    the computation and the encoding.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, ttl_seconds: float = 300,
+                 operations: Optional[Dict[str, Any]] = None):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max(1, max_bytes // 16)  # one big result may not flush the cache
+        self.ttl_seconds = ttl_seconds
+        self.overrides = operations or {}
+
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[bytes, float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.by_operation: Dict[str, Dict[str, int]] = {}
+
+    def ttl_for(self, operation) -> Optional[float]:
+        """TTL in seconds if results of this operation are cached, else None.
+
+        Operations marked cacheable in their registry are cached unless the
+        `operations` config turns them off; the config can also opt others in.
+        """
+        override = self.overrides.get(operation.name)
+        if isinstance(override, bool):
+            override = {'enabled': override}
+        override = override or {}
+        if not override.get('enabled', operation.cacheable):
+            return None
+        return override.get('ttl_seconds', self.ttl_seconds)
+
+    @staticmethod
+    def key(operation, requested_name: str, args, kwargs) -> str:
+        """Canonical hash of (operation, bound arguments); call after validation."""
+        bound = operation.signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        canonical = json.dumps([requested_name, bound.arguments], sort_keys=True,
+                               separators=(',', ':'), default=str)
+        return hashlib.blake2b(canonical.encode('utf-8'), digest_size=16).hexdigest()
+
+    def get(self, key: str, fmt: str) -> Optional[bytes]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get((key, fmt))
+            if entry is not None and entry[1] <= now:
+                self._drop((key, fmt))
+                self.expirations += 1
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((key, fmt))
+            self.hits += 1
+            self.by_operation.setdefault(entry[2], {'hits': 0, 'stores': 0})['hits'] += 1
+            return entry[0]
+
+    def put(self, key: str, fmt: str, body: bytes, operation: str, ttl: float):
+        if len(body) > self.max_entry_bytes:
+            return
+        with self._lock:
+            if (key, fmt) in self._entries:
+                self._drop((key, fmt))
+            self._entries[(key, fmt)] = (body, time.time() + ttl, operation)
+            self.bytes += len(body)
+            self.by_operation.setdefault(operation, {'hits': 0, 'stores': 0})['stores'] += 1
+            while self.bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _drop(self, entry_key: Tuple[str, str]):
+        body, _, _ = self._entries.pop(entry_key)
+        self.bytes -= len(body)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit ratio, memory use and per-operation counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'by_operation': {name: dict(counts) for name, counts in self.by_operation.items()}
+            }
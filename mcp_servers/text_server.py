@@ -1,13 +1,20 @@
 """Text MCP Server - Provides text processing operations (Port 8002)."""
-import json
 from typing import List, Dict, Any
-from http.server import HTTPServer, BaseHTTPRequestHandler
-import threading
+import os
+import sys
+
+# Allow running directly: python mcp_servers/<name>_server.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_servers.core import MCPHandler, MCPServer, OperationRegistry
+
+registry = OperationRegistry('text', cacheable=True)  # pure functions of their arguments
 
 class TextOperations:
     """Text operation handlers."""
     
     @staticmethod
+    @registry.operation("Summarize text", aliases=['summarize_text'])
     def summarize(text: str, max_length: int = 100) -> str:
         """Summarize text."""
         words = text.split()
@@ -20,6 +27,7 @@ class TextOperations:
         return summary
     
     @staticmethod
+    @registry.operation("Extract entities")
     def extract_entities(text: str, entity_type: str) -> List[str]:
         """Extract entities from text."""
         entities = []
@@ -35,6 +43,7 @@ class TextOperations:
         return entities
     
     @staticmethod
+    @registry.operation("Classify text sentiment", aliases=['classify_text'])
     def classify(text: str) -> Dict[str, Any]:
         """Classify text."""
         words = text.lower().split()
@@ -60,6 +69,7 @@ class TextOperations:
         }
     
     @staticmethod
+    @registry.operation("Count words", aliases=['count_words'])
     def word_count(text: str) -> Dict[str, Any]:
         """Count words and characters."""
         words = text.split()
@@ -71,6 +81,7 @@ class TextOperations:
         }
     
     @staticmethod
+    @registry.operation("Format text")
     def format_text(text: str, format_type: str) -> str:
         """Format text."""
         if format_type == "uppercase":
@@ -85,118 +96,37 @@ class TextOperations:
         return text
     
     @staticmethod
+    @registry.operation("Split text")
     def split_text(text: str, delimiter: str = " ") -> List[str]:
         """Split text."""
         return text.split(delimiter)
     
     @staticmethod
+    @registry.operation("Join text")
     def join_text(texts: List[str], delimiter: str = " ") -> str:
         """Join texts."""
         return delimiter.join(texts)
     
     @staticmethod
+    @registry.operation("Remove duplicates")
     def remove_duplicates(texts: List[str]) -> List[str]:
         """Remove duplicate strings."""
         return list(dict.fromkeys(texts))
 
-class TextHandler(BaseHTTPRequestHandler):
+class TextHandler(MCPHandler):
     """HTTP handler for text operations."""
     
-    def do_POST(self):
-        """Handle POST requests."""
-        try:
-            if self.path != '/operate':
-                self.send_error(404)
-                return
-            
-            content_length = int(self.headers.get('Content-Length', 0))
-            body = self.rfile.read(content_length)
-            request = json.loads(body.decode('utf-8'))
-            
-            operation = request.get('operation')
-            args = request.get('args', [])
-            kwargs = request.get('kwargs', {})
-            
-            # Log tool call
-            print(f"  [⚙️ TEXT TOOL] {operation}({args}, {kwargs})")
-            
-            text_ops = TextOperations()
-            if not hasattr(text_ops, operation):
-                raise ValueError(f"Unknown operation: {operation}")
-            
-            func = getattr(text_ops, operation)
-            result = func(*args, **kwargs)
-            print(f"  [✅ RESULT] {operation} executed")
-            
-            response = {
-                'operation': operation,
-                'result': result,
-                'status': 'success'
-            }
-            
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(response).encode('utf-8'))
-        
-        except Exception as e:
-            self.send_response(400)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
-    
-    def do_GET(self):
-        """Handle GET requests."""
-        if self.path == '/health':
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps({'status': 'healthy', 'service': 'text'}).encode('utf-8'))
-        
-        elif self.path == '/tools':
-            tools = {
-                'tools': [
-                    {'name': 'summarize', 'description': 'Summarize text'},
-                    {'name': 'extract_entities', 'description': 'Extract entities'},
-                    {'name': 'classify', 'description': 'Classify text sentiment'},
-                    {'name': 'word_count', 'description': 'Count words'},
-                    {'name': 'format_text', 'description': 'Format text'},
-                    {'name': 'split_text', 'description': 'Split text'},
-                    {'name': 'join_text', 'description': 'Join text'},
-                    {'name': 'remove_duplicates', 'description': 'Remove duplicates'},
-                ]
-            }
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(tools).encode('utf-8'))
-        else:
-            self.send_error(404)
-    
-    def log_message(self, format, *args):
-        pass
+    registry = registry
+    label = "TEXT"
 
-class TextMCPServer:
+class TextMCPServer(MCPServer):
     """Text MCP Server."""
     
-    def __init__(self, host: str = 'localhost', port: int = 8002):
-        self.host = host
-        self.port = port
-        self.server = None
-        self.thread = None
-    
-    def start(self):
-        """Start the server."""
-        self.server = HTTPServer((self.host, self.port), TextHandler)
-        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
-        self.thread.start()
-        print(f"[TEXT MCP] Started on http://{self.host}:{self.port}")
+    handler_class = TextHandler
+    label = "TEXT"
     
-    def stop(self):
-        """Stop the server."""
-        if self.server:
-            self.server.shutdown()
-            print("[TEXT MCP] Stopped")
+    def __init__(self, host: str = 'localhost', port: int = 8002, **options):
+        super().__init__(host, port, **options)
 
 if __name__ == '__main__':
     server = TextMCPServer()
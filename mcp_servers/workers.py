@@ -0,0 +1,188 @@
+"""Multi-process MCP servers - Worker processes sharing one port, supervised and restarted on crash.
+
+Operations are pure Python, so one process never uses more than one core.
+Each worker process runs its own threaded MCPServer bound with SO_REUSEPORT;
+the kernel spreads incoming connections across them. Unix sockets have no
+SO_REUSEPORT balancing, so the parent binds the socket path once and every
+worker accepts on the inherited listener.
+"""
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+from typing import Any, Dict, List, Optional, Type
+
+from mcp_servers.core import MCPServer
+from src.http_pool import bind_unix_socket
+from src.log import configure as configure_logging, get_logger, settings as logging_settings
+
+log = get_logger('mcp.workers')
+
+HEARTBEAT_INTERVAL = 1.0
+
+def _worker_main(server_class: Type[MCPServer], options: Dict[str, Any], index: int,
+                 heartbeats, requests, log_settings: Dict[str, Any]):
+    """Worker process: serve on the shared port and publish a heartbeat until SIGTERM."""
+    configure_logging(**log_settings)  # the parent's level and format, with this process's own writer
+    # Ctrl+C goes to the whole process group; only the parent decides when workers stop.
+    # Stop is signalled rather than shared: a worker killed while waiting on a
+    # multiprocessing.Event would leave it unusable for the others.
+    stop_event = threading.Event()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+
+    server = server_class(reuse_port=True, **options)
+    server.handler_class.registry.set_health(worker=index, pid=os.getpid())
+    server.start()
+    parent = os.getppid()
+    while not stop_event.is_set() and os.getppid() == parent:  # exit if orphaned
+        heartbeats[index] = time.time()
+        requests[index] = server.requests
+        stop_event.wait(HEARTBEAT_INTERVAL)
+    server.stop()
+
+class _Worker:
+    """Parent-side record of one worker slot."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.process: Optional[multiprocessing.Process] = None
+        self.started_at = 0.0
+        self.restarts = 0
+        self.crashes_in_a_row = 0
+        self.restart_at = 0.0
+        self.last_exitcode: Optional[int] = None
+
+class MultiProcessMCPServer:
+    """Runs `processes` copies of an MCPServer on one port and keeps them alive.
+
+    A worker that exits, or stops sending heartbeats for `heartbeat_timeout`
+    seconds, is replaced. Workers that crash right after starting are restarted
+    with exponential backoff so a broken worker cannot spin the CPU.
+    """
+
+    def __init__(self, server_class: Type[MCPServer], processes: int = 2,
+                 heartbeat_timeout: float = 10, **options):
+        self.server_class = server_class
+        self.processes = processes if processes > 0 else (os.cpu_count() or 1)
+        self.heartbeat_timeout = heartbeat_timeout
+        self.options = options
+        self.label = server_class.label
+        self.port = options.get('port')
+        self.drain_timeout = options.get('drain_timeout', 10)
+
+        self._heartbeats = multiprocessing.Array('d', self.processes, lock=False)
+        self._requests = multiprocessing.Array('q', self.processes, lock=False)
+        self._workers = [_Worker(i) for i in range(self.processes)]
+        self._lock = threading.Lock()
+        self._thread = None
+        self._running = False
+        self._unix_listener = None
+
+    def _spawn(self, worker: _Worker):
+        self._heartbeats[worker.index] = time.time()  # grace period while the process boots
+        worker.process = multiprocessing.Process(
+            target=_worker_main,
+            args=(self.server_class, {**self.options, 'unix_listener': self._unix_listener}, worker.index,
+                  self._heartbeats, self._requests, logging_settings()),
+            name=f"{self.label.lower()}-mcp-{worker.index}", daemon=True)
+        worker.process.start()
+        worker.started_at = time.time()
+
+    def start(self):
+        """Start the worker processes and the supervision thread."""
+        self._running = True
+        if self.options.get('unix_socket'):
+            self._unix_listener = bind_unix_socket(self.options['unix_socket'])
+        for worker in self._workers:
+            self._spawn(worker)
+        self._thread = threading.Thread(target=self._supervise, name=f"{self.label.lower()}-supervisor",
+                                        daemon=True)
+        self._thread.start()
+        log.info("[%s MCP] Started on port %s (%s processes x %s workers)", self.label, self.port,
+                 self.processes, self.options.get('workers', 8) or 1)
+
+    def _supervise(self):
+        """Replace dead or hung workers until stop()."""
+        while self._running:
+            now = time.time()
+            with self._lock:
+                for worker in self._workers:
+                    if not self._running:
+                        break
+                    process = worker.process
+                    if process is not None and process.is_alive():
+                        if now - self._heartbeats[worker.index] <= self.heartbeat_timeout:
+                            continue
+                        log.warning("[%s MCP] ⚠️ Worker %s (pid %s) missed heartbeats; killing it",
+                                    self.label, worker.index, process.pid)
+                        process.kill()
+                        process.join()
+
+                    if process is not None:
+                        # Died (or was killed just above): schedule a restart with backoff
+                        worker.last_exitcode = process.exitcode
+                        worker.process = None
+                        quick_crash = now - worker.started_at < 10
+                        worker.crashes_in_a_row = worker.crashes_in_a_row + 1 if quick_crash else 1
+                        delay = min(30.0, 0.5 * 2 ** (worker.crashes_in_a_row - 1))
+                        worker.restart_at = now + delay
+                        log.error("[%s MCP] ❌ Worker %s exited (code %s); restarting in %.1fs",
+                                  self.label, worker.index, worker.last_exitcode, delay)
+
+                    if worker.process is None and now >= worker.restart_at:
+                        worker.restarts += 1
+                        self._spawn(worker)
+            time.sleep(HEARTBEAT_INTERVAL / 2)
+
+    def stop(self):
+        """Ask every worker to drain and exit; kill any that outlive the drain timeout."""
+        self._running = False
+        if self._thread:
+            self._thread.join()
+        deadline = time.time() + self.drain_timeout + HEARTBEAT_INTERVAL
+        with self._lock:
+            for worker in self._workers:
+                if worker.process is not None:
+                    worker.process.terminate()
+            for worker in self._workers:
+                if worker.process is None:
+                    continue
+                worker.process.join(max(0.0, deadline - time.time()))
+                if worker.process.is_alive():
+                    worker.process.kill()
+                    worker.process.join()
+        if self._unix_listener is not None:
+            self._unix_listener.close()
+            self._unix_listener = None
+            try:
+                os.unlink(self.options['unix_socket'])
+            except OSError:
+                pass
+        log.info("[%s MCP] Stopped", self.label)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-worker liveness, heartbeat age, restarts and requests served."""
+        now = time.time()
+        with self._lock:
+            return [{
+                'worker': worker.index,
+                'pid': worker.process.pid if worker.process else None,
+                'alive': bool(worker.process and worker.process.is_alive()),
+                'heartbeat_age': round(now - self._heartbeats[worker.index], 2),
+                'restarts': worker.restarts,
+                'last_exitcode': worker.last_exitcode,
+                'requests': self._requests[worker.index]
+            } for worker in self._workers]
+
+def create_server(server_class: Type[MCPServer], processes: int = 1, **options):
+    """One in-process server, or a supervised multi-process server when `processes` != 1."""
+    if processes == 1:
+        return server_class(**options)
+    if not hasattr(socket, 'SO_REUSEPORT'):
+        log.warning("[%s MCP] ⚠️ SO_REUSEPORT unavailable on this platform; running a single process",
+                    server_class.label)
+        return server_class(**options)
+    return MultiProcessMCPServer(server_class, processes, **options)
@@ -4,6 +4,9 @@ import time
 from mcp_servers.math_server import MathMCPServer
 from mcp_servers.data_server import DataMCPServer
 from mcp_servers.text_server import TextMCPServer
+from mcp_servers.workers import create_server
+from src.config import Config
+from src.log import configure as configure_logging, flush as flush_logs
 
 def main():
     """Start all MCP servers."""
@@ -11,10 +14,22 @@ def main():
     print("🚀 STARTING MCP SERVERS")
     print("="*70 + "\n")
     
-    # Create servers
-    math_server = MathMCPServer(port=8000)
-    data_server = DataMCPServer(port=8001)
-    text_server = TextMCPServer(port=8002)
+    # Create servers (concurrency limits from the mcp_servers config section)
+    config = Config()
+    configure_logging(**(config.get('logging', {}) or {}))
+    processes = config.get('mcp_servers.processes', 1)
+    pool = {
+        'workers': config.get('mcp_servers.workers', 8),
+        'queue_size': config.get('mcp_servers.queue_size', 64),
+        'drain_timeout': config.get('mcp_servers.drain_timeout', 10),
+        'keepalive_timeout': config.get('mcp_servers.keepalive_timeout', 5),
+        'compression': config.get('compression', {}) or {},
+        'result_cache': config.get('mcp_servers.result_cache', {}) or {}
+    }
+    sockets = config.get('mcp_servers.unix_sockets', {}) or {}
+    math_server = create_server(MathMCPServer, processes, port=8000, unix_socket=sockets.get('math'), **pool)
+    data_server = create_server(DataMCPServer, processes, port=8001, unix_socket=sockets.get('data'), **pool)
+    text_server = create_server(TextMCPServer, processes, port=8002, unix_socket=sockets.get('text'), **pool)
     
     # Start servers
     try:
@@ -27,12 +42,15 @@ def main():
         text_server.start()
         time.sleep(0.5)
         
+        flush_logs()
         print("\n" + "="*70)
         print("✅ ALL MCP SERVERS RUNNING")
         print("="*70)
         print("  Math Server:  http://localhost:8000")
         print("  Data Server:  http://localhost:8001")
         print("  Text Server:  http://localhost:8002")
+        for name, path in sockets.items():
+            print(f"  {name.capitalize() + ' Server:':<14}unix://{path}")
         print("\n⏳ Keep this terminal open and run supervisor in another terminal:")
         print("   python run_supervisor.py")
         print("\n  Press Ctrl+C to stop all servers")
@@ -49,6 +67,7 @@ def main():
         math_server.stop()
         data_server.stop()
         text_server.stop()
+        flush_logs()
         print("✅ All servers stopped\n")
         sys.exit(0)
     
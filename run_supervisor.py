@@ -1,6 +1,8 @@
 """Entry point to run the supervisor agent."""
 import sys
 import os
+import signal
+import threading
 
 # Add current directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -9,14 +11,54 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from dotenv import load_dotenv
 load_dotenv()
 
-# Check if GROQ_API_KEY is set
-if not os.environ.get('GROQ_API_KEY'):
+from src.config import Config
+from src.log import configure as configure_logging, flush as flush_logs
+
+config = Config()
+configure_logging(**(config.get('logging', {}) or {}))
+
+# Check if GROQ_API_KEY is set (not needed for the offline stub LLM)
+if config.get('llm.provider', 'groq') == 'groq' and not os.environ.get('GROQ_API_KEY'):
     print("❌ Error: GROQ_API_KEY environment variable not set!")
     print("   Set it in .env file or run: $env:GROQ_API_KEY='your-key'")
     sys.exit(1)
 
 from supervisor.supervisor_agent import SupervisorAgent
 
+def stream_answer(supervisor: SupervisorAgent, query: str):
+    """Print the final answer incrementally as tokens arrive."""
+    print("\n" + "="*70)
+    print("✅ FINAL ANSWER:")
+    stream = supervisor.process_query_stream(query)
+    while True:
+        try:
+            token = next(stream)
+        except StopIteration as done:
+            result = done.value
+            break
+        flush_logs()  # planning and tool-call logs come before the answer
+        print(token, end='', flush=True)
+    print("\n" + "="*70 + "\n")
+    return result
+
+def serve():
+    """Run the supervisor as an HTTP service until SIGINT/SIGTERM, then drain."""
+    from supervisor.server import SupervisorServer
+    
+    server = SupervisorServer()
+    stop = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    
+    server.start()
+    print("  POST /query        {\"query\": \"...\"}")
+    print("  POST /query_batch  {\"queries\": [\"...\", \"...\"]}")
+    print("  Press Ctrl+C to stop")
+    
+    while not stop.is_set():
+        stop.wait(1)
+    server.stop()
+
 def main():
     """Start the supervisor agent."""
     try:
@@ -28,6 +70,7 @@ def main():
         
         # Health check
         status = supervisor.health_check()
+        flush_logs()
         
         if not all([status['math_agent'], status['data_agent'], status['text_agent']]):
             print("\n❌ ERROR: Some MCP servers are not running!")
@@ -47,8 +90,10 @@ def main():
         
         # Interactive loop
         supervisor.verbose = True
+        streaming = config.get('supervisor.streaming', False)
         while True:
             try:
+                flush_logs()
                 query = input("Query> ").strip()
                 
                 if not query:
@@ -58,17 +103,25 @@ def main():
                     print("\n👋 Goodbye!\n")
                     break
                 
-                supervisor.process_query(query)
+                if streaming:
+                    stream_answer(supervisor, query)
+                else:
+                    supervisor.process_query(query)
             
             except KeyboardInterrupt:
                 print("\n\n👋 Goodbye!\n")
                 break
             except Exception as e:
                 print(f"\n❌ Error: {e}\n")
+        
+        supervisor.close()
     
     except Exception as e:
         print(f"\n❌ Failed to start supervisor: {e}")
         sys.exit(1)
 
 if __name__ == '__main__':
-    main()
+    if '--serve' in sys.argv[1:]:
+        serve()
+    else:
+        main()
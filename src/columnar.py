@@ -0,0 +1,283 @@
+"""Columnar tables - Vectorized filter, sort and aggregate over lists of records.
+
+A ColumnarTable wraps a list of record dicts and turns a field into a typed
+column the first time an operation needs it: ints and floats as NumPy
+arrays, strings dictionary-encoded (sorted categories plus an int32 code per
+row), with a mask for records that lack the field. Operations work on row
+indices; only the rows they return are taken from the record list.
+
+Building a column is itself a pass over the records, slower than one plain
+filter loop, so a table pays off when it is queried repeatedly: the DataAgent
+keeps one for its loaded dataset. Records that arrive with a single request
+are cheaper to scan.
+
+NumPy is optional. Without it, for small inputs, and for values the columns
+cannot represent faithfully (mixed types, bools, huge ints, NaN where order
+matters, float sums that must add up bit for bit), the methods
+raise Unvectorizable and callers run their plain Python loop instead, so
+results are the same either way.
+"""
+import bisect
+import operator as op
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # optional speed-up
+    np = None
+
+# Below this many records the plain Python loop is faster than building columns
+MIN_ROWS = 256
+
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+EXACT_FLOAT_INT = 2 ** 53  # ints up to this share a float64 column without rounding
+
+COMPARISONS: Dict[str, Callable[[Any, Any], bool]] = {
+    '==': op.eq, '>': op.gt, '<': op.lt, '>=': op.ge, '<=': op.le,
+    'in': lambda record_value, value: record_value in value
+}
+
+_MISSING = object()
+
+class Unvectorizable(Exception):
+    """This operation cannot be evaluated on columns; use the Python loop."""
+
+def available() -> bool:
+    return np is not None
+
+def _is_number(value: Any) -> bool:
+    return type(value) in (int, float)
+
+def _fits_int64(value: Any) -> bool:
+    return type(value) is not int or INT64_MIN <= value <= INT64_MAX
+
+def _exact_against(column: 'Column', value: Any) -> bool:
+    """Whether NumPy compares `value` with the column's values exactly, as Python does.
+
+    Mixed int/float comparisons go through float64: an int64 column against
+    a float, or a float column against an int beyond EXACT_FLOAT_INT, rounds.
+    """
+    if type(value) is float:
+        return column.kind != 'int'
+    if type(value) is int:
+        return INT64_MIN <= value <= INT64_MAX if column.kind == 'int' else abs(value) <= EXACT_FLOAT_INT
+    return True
+
+class Column:
+    """One field of a table: `kind` is int, float, number (ints and floats), string or object."""
+
+    __slots__ = ('kind', 'values', 'present', 'categories', 'missing', 'nan')
+
+    def __init__(self, kind: str, values: Any, present: Any, categories: Optional[List[str]] = None):
+        self.kind = kind
+        self.values = values          # ndarray: numbers, or category codes for strings (-1 = missing)
+        self.present = present        # bool ndarray: the record has the field
+        self.categories = categories  # sorted distinct strings of a string column
+        self.missing = not present.all()
+        # NaN orders differently in NumPy than in sorted()/max()/min(), which such columns must not use
+        self.nan = kind in ('float', 'number') and bool(np.isnan(values[present]).any())
+
+    @property
+    def numeric(self) -> bool:
+        return self.kind in ('int', 'float', 'number')
+
+    @classmethod
+    def build(cls, raw: List[Any]) -> 'Column':
+        """Column from per-record values (_MISSING where a record lacks the field)."""
+        count = len(raw)
+        types = set(map(type, raw))
+        if object in types:  # _MISSING
+            types.discard(object)
+            present = np.fromiter((value is not _MISSING for value in raw), dtype=bool, count=count)
+        else:
+            present = np.ones(count, dtype=bool)
+        complete = bool(present.all())
+
+        if types <= {int}:
+            try:
+                return cls('int', np.array(raw if complete else _filled(raw, 0), dtype=np.int64), present)
+            except OverflowError:
+                pass  # beyond int64
+        elif types <= {int, float}:
+            if int in types:
+                ints = [value for value in raw if type(value) is int]
+                if min(ints) < -EXACT_FLOAT_INT or max(ints) > EXACT_FLOAT_INT:
+                    return cls('object', None, present)
+            values = np.array(raw if complete else _filled(raw, 0.0), dtype=np.float64)
+            return cls('number' if int in types else 'float', values, present)
+        elif types <= {str}:
+            categories = sorted(set(raw) if complete else set(_present(raw)))
+            codes = {category: i for i, category in enumerate(categories)}
+            lookup = map(codes.__getitem__, raw) if complete else (codes.get(value, -1) for value in raw)
+            return cls('string', np.fromiter(lookup, dtype=np.int32, count=count), present, categories)
+        return cls('object', None, present)
+
+def _present(raw: Iterable[Any]) -> List[Any]:
+    return [value for value in raw if value is not _MISSING]
+
+def _filled(raw: Iterable[Any], fill: Any) -> List[Any]:
+    return [fill if value is _MISSING else value for value in raw]
+
+class ColumnarTable:
+    """Records plus the columns built from them so far (one per field, on first use)."""
+
+    def __init__(self, records: Sequence[Dict[str, Any]], min_rows: int = MIN_ROWS):
+        self.records = records
+        self.min_rows = min_rows
+        self._columns: Dict[str, Column] = {}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def column(self, field: str) -> Column:
+        """The typed column of `field`; raises Unvectorizable without NumPy or for small tables."""
+        if np is None or len(self.records) < self.min_rows:
+            raise Unvectorizable(field)
+        column = self._columns.get(field)
+        if column is None:
+            if not all(isinstance(record, dict) for record in self.records):
+                raise Unvectorizable(field)
+            column = self._columns[field] = Column.build([record.get(field, _MISSING) for record in self.records])
+        return column
+
+    def take(self, rows: Any) -> List[Dict[str, Any]]:
+        """The records at these row indices, in order."""
+        records = self.records
+        return [records[i] for i in rows.tolist()]
+
+    def filter_rows(self, field: str, operator: str, value: Any) -> Any:
+        """Indices of records that have `field` and satisfy `record[field] <operator> value`.
+
+        Same result as comparing record by record: a record lacking the field
+        never matches, an unknown operator matches nothing, and an ordering
+        comparison between incompatible types raises TypeError.
+        """
+        column = self.column(field)
+        compare = COMPARISONS.get(operator)
+        if compare is None:
+            return np.empty(0, dtype=np.intp)
+
+        if column.kind == 'string':
+            return np.flatnonzero(self._string_mask(column, operator, value))
+
+        if not column.numeric:
+            raise Unvectorizable(field)
+        if operator == 'in':
+            if not isinstance(value, (list, tuple, set, frozenset)):
+                raise Unvectorizable(field)
+            members = [member for member in value if _is_number(member) or type(member) is bool]
+            if not all(_exact_against(column, member) for member in members):
+                raise Unvectorizable(field)
+            if column.nan and any(member != member for member in members):
+                raise Unvectorizable(field)  # `in` matches a NaN by identity
+            mask = np.isin(column.values, np.array(members) if members else column.values[:0])
+        elif _is_number(value) or type(value) is bool:
+            if not _exact_against(column, value):
+                raise Unvectorizable(field)
+            mask = compare(column.values, value)
+        elif operator == '==':
+            return np.empty(0, dtype=np.intp)  # a number never equals a non-number
+        else:
+            raise Unvectorizable(field)  # Python raises TypeError for e.g. 5 > "a"
+        if column.missing:
+            mask &= column.present
+        return np.flatnonzero(mask)
+
+    @staticmethod
+    def _string_mask(column: Column, operator: str, value: Any) -> Any:
+        """Rows of a string column that satisfy the comparison; each distinct string is compared once."""
+        categories, codes = column.categories, column.values
+        if operator == '==':
+            i = bisect.bisect_left(categories, value) if isinstance(value, str) else len(categories)
+            if i < len(categories) and categories[i] == value:
+                return codes == i
+            return np.zeros(len(codes), dtype=bool)
+        if operator in ('>', '>=', '<', '<=') and isinstance(value, str):
+            # Categories are sorted, so an ordering comparison selects a range of codes
+            if operator in ('>', '<='):
+                boundary = bisect.bisect_right(categories, value)
+            else:
+                boundary = bisect.bisect_left(categories, value)
+            if operator in ('>', '>='):
+                return codes >= boundary
+            return (codes < boundary) & column.present
+        compare = COMPARISONS[operator]
+        matching = [i for i, category in enumerate(categories) if compare(category, value)]
+        return np.isin(codes, np.array(matching, dtype=codes.dtype))
+
+    def filter(self, field: str, operator: str, value: Any) -> List[Dict[str, Any]]:
+        return self.take(self.filter_rows(field, operator, value))
+
+    def sort_rows(self, field: str, descending: bool = False, default: Any = 0) -> Any:
+        """Row order of a stable sort on `record.get(field, default)`, like sorted(..., reverse=descending)."""
+        column = self.column(field)
+        if column.numeric:
+            if column.nan:
+                raise Unvectorizable(field)
+            if column.missing and not (_is_number(default) and _fits_int64(default)):
+                raise Unvectorizable(field)
+            keys = np.where(column.present, column.values, default) if column.missing else column.values
+        elif column.kind == 'string':
+            keys = column.values
+            if column.missing:
+                if not isinstance(default, str):
+                    raise Unvectorizable(field)
+                # Place the default among the sorted categories (between two codes if it is new)
+                position = bisect.bisect_left(column.categories, default)
+                exists = position < len(column.categories) and column.categories[position] == default
+                keys = np.where(column.present, keys, position if exists else position - 0.5)
+        else:
+            raise Unvectorizable(field)
+
+        if not descending:
+            return np.argsort(keys, kind='stable')
+        # Descending but stable (equal keys keep their order), as sorted(reverse=True) does
+        count = len(keys)
+        return (count - 1) - np.argsort(keys[::-1], kind='stable')[::-1]
+
+    def sort(self, field: str, descending: bool = False, default: Any = 0) -> List[Dict[str, Any]]:
+        return self.take(self.sort_rows(field, descending, default))
+
+    def aggregate(self, field: str, operation: str) -> Any:
+        """sum, count, average, max or min of the values of records that have `field`; None if there are none."""
+        column = self.column(field)
+        count = int(column.present.sum())
+        if count == 0:
+            return None
+        if operation == 'count':
+            return count
+        if operation not in ('sum', 'average', 'max', 'min'):
+            return None
+        if not column.numeric:
+            raise Unvectorizable(field)
+
+        values = column.values[column.present] if column.missing else column.values
+        if operation in ('max', 'min'):
+            if column.nan:
+                raise Unvectorizable(field)  # max()/min() over NaN depend on where it sits
+            # The record's own value: an int stays an int in a mixed int/float column
+            position = int(values.argmax() if operation == 'max' else values.argmin())
+            row = int(np.flatnonzero(column.present)[position]) if column.missing else position
+            return self.records[row][field]
+
+        if column.kind == 'int':
+            largest = max(abs(int(values.min())), abs(int(values.max())))
+            if largest * count > INT64_MAX:
+                raise Unvectorizable(field)  # the int64 sum could overflow
+            total = int(values.sum())
+        elif column.kind == 'float':
+            # NumPy's pairwise summation can differ from sum() in the last bits; add in record order
+            total = sum(values.tolist())
+        else:
+            raise Unvectorizable(field)  # sum() adds a run of ints exactly before meeting a float
+        return total if operation == 'sum' else total / count
+
+    def unique_values(self, field: str) -> List[str]:
+        """Sorted distinct values of `field` as strings."""
+        column = self.column(field)
+        if column.kind == 'string':
+            return list(column.categories)
+        if column.kind not in ('int', 'float'):
+            raise Unvectorizable(field)  # str() of 5 and 5.0 differ, a float column cannot tell
+        values = column.values[column.present] if column.missing else column.values
+        return sorted({str(value) for value in np.unique(values).tolist()})
@@ -0,0 +1,232 @@
+"""Compression - Negotiated gzip/deflate/zstd for large MCP request and response bodies.
+
+gzip and deflate come from the stdlib; zstd is used when `zstandard` is
+installed. Bodies below `min_size` bytes are sent as-is: compressing a small
+payload costs more CPU than the bytes it saves.
+"""
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import zstandard
+except ImportError:  # optional, faster and smaller than gzip
+    zstandard = None
+
+DEFAULT_MIN_SIZE = 1024
+
+class UnsupportedEncoding(ValueError):
+    """Body uses a Content-Encoding this side cannot decode."""
+
+def _zlib_compress(wbits: int):
+    def compress(body: bytes) -> bytes:
+        compressor = zlib.compressobj(6, zlib.DEFLATED, wbits)
+        return compressor.compress(body) + compressor.flush()
+    return compress
+
+def _zlib_decompress(body: bytes) -> bytes:
+    # 32 + MAX_WBITS auto-detects gzip and zlib headers; some clients send raw deflate
+    try:
+        return zlib.decompress(body, 32 + zlib.MAX_WBITS)
+    except zlib.error:
+        return zlib.decompress(body, -zlib.MAX_WBITS)
+
+# name -> (compress, decompress), best first
+ENCODINGS: Dict[str, Tuple[Any, Any]] = {}
+if zstandard is not None:
+    ENCODINGS['zstd'] = (lambda body: zstandard.ZstdCompressor(level=3).compress(body),
+                         lambda body: zstandard.ZstdDecompressor().decompressobj().decompress(body))
+ENCODINGS['gzip'] = (_zlib_compress(16 + zlib.MAX_WBITS), _zlib_decompress)
+ENCODINGS['deflate'] = (_zlib_compress(zlib.MAX_WBITS), _zlib_decompress)
+
+# name -> (incremental compressor factory, flush mode that emits everything so far)
+STREAM_ENCODERS: Dict[str, Tuple[Any, Any]] = {
+    'gzip': (lambda: zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS), zlib.Z_SYNC_FLUSH),
+    'deflate': (lambda: zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS), zlib.Z_SYNC_FLUSH),
+}
+if zstandard is not None:
+    STREAM_ENCODERS['zstd'] = (lambda: zstandard.ZstdCompressor(level=3).compressobj(),
+                               zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+def available_encodings() -> List[str]:
+    return list(ENCODINGS)
+
+def decompress(body: bytes, content_encoding: Optional[str]) -> bytes:
+    """Undo a request's Content-Encoding (identity when absent)."""
+    encoding = (content_encoding or 'identity').strip().lower()
+    if encoding == 'identity':
+        return body
+    if encoding not in ENCODINGS:
+        raise UnsupportedEncoding(f"Unsupported Content-Encoding: {encoding}")
+    return ENCODINGS[encoding][1](body)
+
+def parse_accept_encoding(header: Optional[str]) -> List[str]:
+    """Encodings from an Accept-Encoding header, highest q first (q=0 excluded)."""
+    weighted = []
+    for position, entry in enumerate((header or "").split(',')):
+        name, *params = [part.strip() for part in entry.split(';')]
+        q = 1.0
+        for param in params:
+            if param.startswith('q='):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if name and q > 0:
+            weighted.append((-q, position, name.lower()))
+    return [name for _, _, name in sorted(weighted)]
+
+class Compressor:
+    """Compresses bodies above `min_size` and counts bytes and CPU time per encoding."""
+
+    def __init__(self, min_size: int = DEFAULT_MIN_SIZE, encodings: Optional[Sequence[str]] = None,
+                 enabled: bool = True):
+        self.min_size = min_size
+        self.enabled = enabled
+        self.encodings = [name for name in (encodings or ENCODINGS) if name in ENCODINGS]
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._decoded = {'bodies': 0, 'raw_bytes': 0, 'wire_bytes': 0, 'cpu_s': 0.0}
+
+    def choose(self, accept_encoding: Optional[str]) -> Optional[str]:
+        """Our most preferred encoding among those the peer accepts (server side)."""
+        accepted = parse_accept_encoding(accept_encoding)
+        if '*' in accepted:
+            return self.encodings[0] if self.encodings else None
+        for name in self.encodings:
+            if name in accepted:
+                return name
+        return None
+
+    def compress(self, body: bytes, encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+        """(body, Content-Encoding or None); small bodies and unknown encodings pass through."""
+        if not self.enabled or encoding is None or len(body) < self.min_size:
+            self._count('identity', len(body), len(body), 0.0)
+            return body, None
+        start = time.thread_time()
+        compressed = ENCODINGS[encoding][0](body)
+        self._count(encoding, len(body), len(compressed), time.thread_time() - start)
+        return compressed, encoding
+
+    def compress_stream(self, chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+        """Compress a chunk stream incrementally; every chunk is flushed so the peer
+        can decode it on arrival."""
+        factory, flush_mode = STREAM_ENCODERS[encoding]
+        compressor = factory()
+        raw = wire = 0
+        cpu = 0.0
+        try:
+            for chunk in chunks:
+                start = time.thread_time()
+                out = compressor.compress(chunk) + compressor.flush(flush_mode)
+                cpu += time.thread_time() - start
+                raw += len(chunk)
+                wire += len(out)
+                yield out
+            out = compressor.flush()
+            wire += len(out)
+            yield out
+        finally:
+            self._count(encoding, raw, wire, cpu)
+
+    def decompress(self, body: bytes, content_encoding: Optional[str]) -> bytes:
+        """Decode a compressed body, counting bytes and CPU time."""
+        if not content_encoding or content_encoding.strip().lower() == 'identity':
+            return body
+        start = time.thread_time()
+        raw = decompress(body, content_encoding)
+        with self._lock:
+            self._decoded['bodies'] += 1
+            self._decoded['raw_bytes'] += len(raw)
+            self._decoded['wire_bytes'] += len(body)
+            self._decoded['cpu_s'] += time.thread_time() - start
+        return raw
+
+    def _count(self, encoding: str, raw: int, wire: int, cpu: float):
+        with self._lock:
+            entry = self._stats.setdefault(encoding, {'bodies': 0, 'raw_bytes': 0, 'wire_bytes': 0, 'cpu_s': 0.0})
+            entry['bodies'] += 1
+            entry['raw_bytes'] += raw
+            entry['wire_bytes'] += wire
+            entry['cpu_s'] += cpu
+
+    def stats(self) -> Dict[str, Any]:
+        """Bytes before/after compression and CPU spent, per encoding and in total."""
+        with self._lock:
+            per_encoding = {
+                name: {
+                    'bodies': int(entry['bodies']),
+                    'raw_bytes': int(entry['raw_bytes']),
+                    'wire_bytes': int(entry['wire_bytes']),
+                    'ratio': round(entry['wire_bytes'] / entry['raw_bytes'], 3) if entry['raw_bytes'] else 1.0,
+                    'cpu_ms': round(entry['cpu_s'] * 1000, 2)
+                } for name, entry in self._stats.items()
+            }
+            decompressed = {
+                'bodies': self._decoded['bodies'],
+                'raw_bytes': self._decoded['raw_bytes'],
+                'wire_bytes': self._decoded['wire_bytes'],
+                'cpu_ms': round(self._decoded['cpu_s'] * 1000, 2)
+            }
+        raw = sum(entry['raw_bytes'] for entry in per_encoding.values())
+        wire = sum(entry['wire_bytes'] for entry in per_encoding.values())
+        return {
+            'min_size': self.min_size,
+            'encodings': self.encodings,
+            'raw_bytes': raw,
+            'wire_bytes': wire,
+            'saved_bytes': raw - wire,
+            'cpu_ms': round(sum(entry['cpu_ms'] for entry in per_encoding.values()), 2),
+            'by_encoding': per_encoding,
+            'decompressed': decompressed
+        }
+
+class RequestCompressor(Compressor):
+    """Client side: compresses request bodies for one MCP server and tracks response bytes.
+
+    Request bodies use gzip, which every server decodes, until the server has
+    answered with another encoding it prefers (e.g. zstd). Responses are
+    decoded by requests/httpx; `accept_encoding` only lists what they can decode.
+    """
+
+    def __init__(self, decodable: Sequence[str], min_size: int = DEFAULT_MIN_SIZE,
+                 encodings: Optional[Sequence[str]] = None, enabled: bool = True):
+        super().__init__(min_size, encodings, enabled)
+        accepted = [name for name in self.encodings if name in decodable]
+        self.accept_encoding = ", ".join(accepted) if (enabled and accepted) else "identity"
+        self.request_encoding = 'gzip' if 'gzip' in self.encodings else None
+        self.response_raw_bytes = 0
+        self.response_wire_bytes = 0
+
+    def compress_request(self, body: bytes) -> Tuple[bytes, Dict[str, str]]:
+        compressed, encoding = self.compress(body, self.request_encoding)
+        headers = {'Accept-Encoding': self.accept_encoding}
+        if encoding:
+            headers['Content-Encoding'] = encoding
+        return compressed, headers
+
+    @staticmethod
+    def _wire_bytes(response) -> int:
+        if hasattr(response, 'num_bytes_downloaded'):  # httpx
+            return response.num_bytes_downloaded
+        raw = getattr(response, 'raw', None)  # requests: urllib3 counts bytes read off the socket
+        if raw is not None and hasattr(raw, 'tell'):
+            return raw.tell()
+        return len(response.content)
+
+    def observe(self, response):
+        """Learn the server's preferred encoding and count response bytes."""
+        encoding = (response.headers.get('Content-Encoding') or '').lower()
+        if encoding in self.encodings:
+            self.request_encoding = encoding
+        wire_bytes = self._wire_bytes(response)
+        with self._lock:
+            self.response_raw_bytes += len(response.content)
+            self.response_wire_bytes += wire_bytes
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        with self._lock:
+            stats['responses'] = {'raw_bytes': self.response_raw_bytes, 'wire_bytes': self.response_wire_bytes}
+        return stats
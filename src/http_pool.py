@@ -0,0 +1,341 @@
+"""Pooled HTTP server - Fixed worker pool with a bounded accept queue and graceful draining."""
+import json
+import os
+import queue
+import socket
+import stat
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Dict, Iterable, Iterator, Optional
+from src.compression import decompress
+from src.serialization import Codec, codec_for_accept, codec_for_content_type, dumps
+
+class JSONRequestHandler(BaseHTTPRequestHandler):
+    """HTTP/1.1 handler base: persistent connections and length-delimited JSON responses.
+
+    An idle keep-alive connection holds a worker thread, so it is closed after
+    `server.keepalive_timeout` seconds of silence, and straight after the current
+    response whenever other connections are waiting for a worker.
+    """
+
+    protocol_version = "HTTP/1.1"
+    timeout = 5
+    # Headers and body go out as separate writes; without TCP_NODELAY a reused
+    # connection stalls on delayed ACKs (~40 ms per request)
+    disable_nagle_algorithm = True
+    # Status and body bytes of the last response, for request metrics
+    response_status = 0
+    response_bytes = 0
+
+    def setup(self):
+        if not isinstance(self.server, PooledHTTPServer):
+            # A single-threaded server cannot afford to park its only thread on an idle client
+            self.protocol_version = "HTTP/1.0"
+        self.timeout = getattr(self.server, 'keepalive_timeout', self.timeout)
+        if self.server.address_family == socket.AF_UNIX:
+            self.disable_nagle_algorithm = False  # TCP_NODELAY does not apply to Unix sockets
+        super().setup()
+
+    def send_response(self, code, message=None):
+        self.response_status = code
+        super().send_response(code, message)
+
+    def send_json(self, status: int, payload: Any):
+        """Write a response in the best format the client Accepts (JSON by default),
+        with Content-Length so the connection can be reused."""
+        body, codec = dumps(self.response_codec(), payload)
+        self.send_body(status, body, codec.content_type)
+
+    def response_codec(self) -> Codec:
+        """Codec negotiated from the request's Accept header."""
+        return codec_for_accept(self.headers.get('Accept'))
+
+    def send_body(self, status: int, body: bytes, content_type: str = 'application/json'):
+        pending = getattr(self.server, 'pending', None)
+        if pending is not None and pending.qsize() > 0:
+            self.close_connection = True
+
+        # Large bodies are compressed with the best encoding the client accepts
+        encoding = None
+        compression = getattr(self.server, 'compression', None)
+        if compression is not None:
+            body, encoding = compression.compress(body, compression.choose(self.headers.get('Accept-Encoding')))
+
+        if hasattr(self.server, 'count_request'):
+            self.server.count_request()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        if compression is not None:
+            self.send_header('Vary', 'Accept-Encoding')
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(body)
+        self.response_bytes = len(body)
+
+    def send_chunked(self, status: int, chunks: Iterable[bytes], content_type: str = 'application/x-ndjson'):
+        """Stream a response with chunked transfer encoding as `chunks` are produced.
+
+        Small pieces are batched into CHUNK_SIZE writes. A stream that fits in
+        one batch is sent as a normal body with Content-Length.
+        """
+        batches = _batched(chunks, CHUNK_SIZE)
+        first = next(batches, b'')
+        if len(first) < CHUNK_SIZE:
+            self.send_body(status, first, content_type)
+            return
+
+        pending = getattr(self.server, 'pending', None)
+        if pending is not None and pending.qsize() > 0:
+            self.close_connection = True
+        if hasattr(self.server, 'count_request'):
+            self.server.count_request()
+
+        body = _prepend(first, batches)
+        compression = getattr(self.server, 'compression', None)
+        encoding = None
+        if compression is not None and compression.enabled:
+            encoding = compression.choose(self.headers.get('Accept-Encoding'))
+            if encoding:
+                body = compression.compress_stream(body, encoding)
+
+        # HTTP/1.0 has no chunked encoding: the body ends when the connection closes
+        chunked = self.request_version == 'HTTP/1.1' and self.protocol_version == 'HTTP/1.1'
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        if compression is not None:
+            self.send_header('Vary', 'Accept-Encoding')
+        if chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+        else:
+            self.close_connection = True
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+
+        try:
+            for data in body:
+                if not data:
+                    continue
+                self.response_bytes += len(data)
+                if chunked:
+                    data = b'%x\r\n%s\r\n' % (len(data), data)
+                self.wfile.write(data)
+            if chunked:
+                self.wfile.write(b'0\r\n\r\n')
+        except OSError:
+            self.close_connection = True  # client went away mid-stream
+        finally:
+            close = getattr(body, 'close', None)
+            if close:
+                close()  # stop the producing generator
+
+    def read_json(self) -> Any:
+        """Read and decode the request body per its Content-Type (always consumed,
+        keeping the connection in sync). Raises UnsupportedMediaType/UnsupportedEncoding
+        for unknown formats."""
+        content_length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(content_length)
+        content_encoding = self.headers.get('Content-Encoding')
+        if content_encoding:
+            compression = getattr(self.server, 'compression', None)
+            body = (compression.decompress if compression is not None else decompress)(body, content_encoding)
+        return codec_for_content_type(self.headers.get('Content-Type')).loads(body)
+
+    def log_message(self, format, *args):
+        pass
+
+CHUNK_SIZE = 16 * 1024
+
+def _batched(chunks: Iterable[bytes], size: int) -> Iterator[bytes]:
+    """Join small pieces into blocks of at least `size` bytes (the last may be smaller)."""
+    buffer, length = [], 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield b''.join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield b''.join(buffer)
+
+def _prepend(first: bytes, rest: Iterator[bytes]) -> Iterator[bytes]:
+    yield first
+    yield from rest
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer that hands accepted connections to a fixed pool of worker threads.
+
+    Connections wait in a bounded queue; once it is full (or the server is
+    draining) new connections get an immediate 503 instead of piling up.
+    """
+
+    def __init__(self, server_address, handler_class, workers: int = 8, queue_size: int = 64,
+                 keepalive_timeout: float = 5, reuse_port: bool = False):
+        self.keepalive_timeout = keepalive_timeout
+        self.reuse_port = reuse_port
+        # Deep listen backlog: overload is answered with 503 here instead of kernel resets
+        self.request_queue_size = max(128, queue_size)
+        super().__init__(server_address, handler_class)
+        self.workers = max(1, workers)
+        self.pending: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=max(1, queue_size))
+        self.draining = False
+
+        self._lock = threading.Lock()
+        self.active = 0
+        self.handled = 0
+        self.requests = 0
+        self.rejected = 0
+
+        self._threads = [
+            threading.Thread(target=self._work, name=f"http-worker-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def server_bind(self):
+        if self.reuse_port:
+            # Several worker processes bind the same port; the kernel spreads connections
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+
+    def process_request(self, request, client_address):
+        """Queue the connection for a worker, or shed it when the pool is saturated."""
+        if self.draining:
+            self._reject(request, "Server is shutting down")
+            return
+        try:
+            self.pending.put_nowait((request, client_address))
+        except queue.Full:
+            self._reject(request, "Server is busy, retry later")
+
+    def _reject(self, request, message: str):
+        """Answer 503 without parsing the request and close the connection."""
+        with self._lock:
+            self.rejected += 1
+        body = json.dumps({'error': message}).encode('utf-8')
+        head = (
+            "HTTP/1.1 503 Service Unavailable\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Retry-After: 1\r\n"
+            "Connection: close\r\n\r\n"
+        ).encode('ascii')
+        try:
+            request.sendall(head + body)
+        except OSError:
+            pass
+        self.shutdown_request(request)
+
+    def _work(self):
+        """Worker loop: handle queued connections until a None sentinel arrives."""
+        while True:
+            item = self.pending.get()
+            if item is None:
+                return
+            request, client_address = item
+            with self._lock:
+                self.active += 1
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+                with self._lock:
+                    self.active -= 1
+                    self.handled += 1
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Stop accepting, let queued and in-flight requests finish, then close.
+
+        Must be called from a thread other than the one running serve_forever().
+        Returns False if workers were still busy when the timeout expired.
+        """
+        self.draining = True
+        self.shutdown()
+        for _ in self._threads:
+            self.pending.put(None)
+
+        # One deadline for the whole pool, not `timeout` per worker
+        deadline = None if timeout is None else time.monotonic() + timeout
+        finished = True
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0, deadline - time.monotonic()))
+            finished = finished and not thread.is_alive()
+        self.server_close()
+        return finished
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool utilisation and load-shedding counters."""
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'active': self.active,
+                'queued': self.pending.qsize(),
+                'queue_size': self.pending.maxsize,
+                'connections': self.handled,
+                'requests': self.requests,
+                'requests_per_connection': round(self.requests / self.handled, 2) if self.handled else 0.0,
+                'rejected': self.rejected,
+                'draining': self.draining
+            }
+
+def bind_unix_socket(path: str, backlog: int = 128) -> socket.socket:
+    """Listening Unix socket at `path`, replacing a stale socket file left by a crash."""
+    try:
+        if stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)
+    except FileNotFoundError:
+        pass
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.bind(path)
+        sock.listen(backlog)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+class UnixPooledHTTPServer(PooledHTTPServer):
+    """PooledHTTPServer listening on a Unix domain socket path instead of a TCP port.
+
+    Same-host clients skip the loopback TCP stack. `listener` is an already
+    bound socket (e.g. shared by several worker processes); the server then
+    leaves the socket file to whoever created it.
+    """
+
+    address_family = socket.AF_UNIX
+
+    def __init__(self, path: str, handler_class, listener: Optional[socket.socket] = None, **options):
+        self.listener = listener
+        options.pop('reuse_port', None)  # no meaning for Unix sockets
+        super().__init__(path, handler_class, **options)
+
+    def server_bind(self):
+        self.socket.close()
+        self.socket = self.listener or bind_unix_socket(self.server_address, self.request_queue_size)
+        # HTTPServer.server_bind expects (host, port)
+        self.server_name, self.server_port = 'localhost', 0
+
+    def server_activate(self):
+        pass  # bind_unix_socket() already listens
+
+    def server_close(self):
+        super().server_close()
+        if self.listener is None:
+            try:
+                os.unlink(self.server_address)
+            except OSError:
+                pass
@@ -0,0 +1,209 @@
+"""Indexes - Hash and sorted secondary indexes for filtering a list of records.
+
+A HashIndex maps each value of a field to the rows that hold it and answers
+`==` and `in`; a SortedIndex keeps the field's values in order and answers
+`>`, `<`, `>=`, `<=` (and `==`) by bisection. Both return the matching
+records in their original order, the same list a scan over the records gives.
+
+Building an index is a pass over the records, so it pays off for a dataset
+that is filtered repeatedly (the DataAgent's), not for records sent with a
+single request. An IndexSet builds the indexes configured in the `indexes`
+section of data.yaml up front and, with `build_on_first_use`, any other the
+first time a field is filtered; `rebuild()` indexes a reloaded dataset.
+
+A lookup returns None when an index cannot reproduce the scan - unhashable
+or mutually unordered values, NaN, a value of another type than the field's
+- and the caller scans instead.
+"""
+import bisect
+import math
+import threading
+import time
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.log import get_logger
+
+log = get_logger('indexes')
+
+RANGE_OPERATORS = ('>', '<', '>=', '<=')
+CONTAINERS = (list, tuple, set, frozenset)
+
+class Unindexable(Exception):
+    """The field's values cannot be indexed this way; scan instead."""
+
+def _is_nan(value: Any) -> bool:
+    return type(value) is float and math.isnan(value)
+
+def _check_records(records: Sequence[Any], field: str):
+    if not all(isinstance(record, dict) for record in records):
+        raise Unindexable(field)
+
+class HashIndex:
+    """Rows per distinct value of a field, for `==` and `in`."""
+
+    kind = 'hash'
+    operators = ('==', 'in')
+
+    def __init__(self, records: Sequence[Dict[str, Any]], field: str):
+        _check_records(records, field)
+        self.field = field
+        self.rows: Dict[Any, List[int]] = {}
+        try:
+            for i, record in enumerate(records):
+                if field in record:
+                    self.rows.setdefault(record[field], []).append(i)
+        except TypeError:  # unhashable value, e.g. a list
+            raise Unindexable(field)
+        # NaN != NaN, but a dict would find a NaN key by identity
+        if any(map(_is_nan, self.rows)):
+            raise Unindexable(field)
+
+    def lookup(self, operator: str, value: Any) -> Optional[List[int]]:
+        """Ascending row indices matching `record[field] <operator> value`, or None to scan."""
+        try:
+            if operator == '==':
+                return list(self.rows.get(value, ()))
+            if operator == 'in' and isinstance(value, CONTAINERS):
+                # A set merges equal members (1 and 1.0), so no row is listed twice
+                buckets = [self.rows[member] for member in set(value) if member in self.rows]
+                if len(buckets) == 1:
+                    return list(buckets[0])
+                return sorted(row for bucket in buckets for row in bucket)
+        except TypeError:  # unhashable lookup value
+            return None
+        return None
+
+class SortedIndex:
+    """Values of a field in sorted order with their rows, for range comparisons."""
+
+    kind = 'sorted'
+    operators = RANGE_OPERATORS + ('==',)
+
+    def __init__(self, records: Sequence[Dict[str, Any]], field: str):
+        _check_records(records, field)
+        self.field = field
+        pairs = [(record[field], i) for i, record in enumerate(records) if field in record]
+        types = set(type(value) for value, _ in pairs)
+        # Only values that all compare with each other (and with a query value) as the scan does
+        if types <= {int, float, bool}:
+            if float in types and any(_is_nan(value) for value, _ in pairs):
+                raise Unindexable(field)
+            self.domain = 'number'
+        elif types <= {str}:
+            self.domain = 'string'
+        else:
+            raise Unindexable(field)
+        pairs.sort(key=itemgetter(0))  # stable: equal values keep their row order
+        self.keys = [value for value, _ in pairs]
+        self.rows = [row for _, row in pairs]
+
+    def _comparable(self, value: Any) -> bool:
+        if self.domain == 'number':
+            return type(value) in (int, float, bool) and not _is_nan(value)
+        return isinstance(value, str)
+
+    def lookup(self, operator: str, value: Any) -> Optional[List[int]]:
+        """Ascending row indices matching `record[field] <operator> value`, or None to scan."""
+        if operator not in self.operators or not self._comparable(value):
+            return None
+        keys = self.keys
+        if operator == '>':
+            start, stop = bisect.bisect_right(keys, value), len(keys)
+        elif operator == '>=':
+            start, stop = bisect.bisect_left(keys, value), len(keys)
+        elif operator == '<':
+            start, stop = 0, bisect.bisect_left(keys, value)
+        elif operator == '<=':
+            start, stop = 0, bisect.bisect_right(keys, value)
+        else:
+            start, stop = bisect.bisect_left(keys, value), bisect.bisect_right(keys, value)
+        return sorted(self.rows[start:stop])
+
+INDEX_TYPES = {'hash': HashIndex, 'sorted': SortedIndex}
+
+# Index kinds that can answer an operator, preferred first
+KINDS_FOR = {'==': ('hash', 'sorted'), 'in': ('hash',),
+             '>': ('sorted',), '<': ('sorted',), '>=': ('sorted',), '<=': ('sorted',)}
+
+class IndexSet:
+    """Indexes over one record list: configured ones built up front, others on first use."""
+
+    def __init__(self, records: Sequence[Dict[str, Any]], hash_fields: Iterable[str] = (),
+                 sorted_fields: Iterable[str] = (), build_on_first_use: bool = True):
+        self.records = records
+        self.hash_fields = list(hash_fields)
+        self.sorted_fields = list(sorted_fields)
+        self.build_on_first_use = build_on_first_use
+        self._indexes: Dict[Tuple[str, str], Any] = {}
+        self._unindexable = set()
+        self._lock = threading.Lock()
+        for field in self.hash_fields:
+            self.build('hash', field)
+        for field in self.sorted_fields:
+            self.build('sorted', field)
+
+    @classmethod
+    def from_config(cls, records: Sequence[Dict[str, Any]], config: Optional[Dict[str, Any]]) -> 'IndexSet':
+        """IndexSet from the `indexes` section of data.yaml (hash, sorted, build_on_first_use)."""
+        config = config or {}
+        return cls(records, config.get('hash') or (), config.get('sorted') or (),
+                   config.get('build_on_first_use', True))
+
+    def build(self, kind: str, field: str) -> Optional[Any]:
+        """The `kind` index on `field`, built now if needed; None if the field cannot have one."""
+        key = (kind, field)
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is not None or key in self._unindexable:
+                return index
+            start = time.perf_counter()
+            try:
+                index = self._indexes[key] = INDEX_TYPES[kind](self.records, field)
+            except Unindexable:
+                self._unindexable.add(key)
+                log.debug("[INDEX] ⚠️ %s cannot have a %s index; filters on it scan", field, kind)
+                return None
+        log.debug("[INDEX] 🗂️ Built %s index on %s (%d records, %.1f ms)", kind, field, len(self.records),
+                  (time.perf_counter() - start) * 1000)
+        return index
+
+    def lookup(self, field: str, operator: str, value: Any) -> Optional[List[int]]:
+        """Ascending row indices of the records matching the filter, or None if no index can answer."""
+        kinds = KINDS_FOR.get(operator, ())
+        for kind in kinds:
+            index = self._indexes.get((kind, field))
+            if index is not None:
+                rows = index.lookup(operator, value)
+                if rows is not None:
+                    return rows
+        if self.build_on_first_use and kinds and not any((kind, field) in self._indexes for kind in kinds):
+            index = self.build(kinds[0], field)
+            if index is not None:
+                return index.lookup(operator, value)
+        return None
+
+    def filter(self, field: str, operator: str, value: Any) -> Optional[List[Dict[str, Any]]]:
+        """Records where `record[field] <operator> value`, in order; None means scan instead."""
+        rows = self.lookup(field, operator, value)
+        if rows is None:
+            return None
+        records = self.records
+        return [records[i] for i in rows]
+
+    def fields(self) -> Dict[str, List[str]]:
+        """Indexed fields by kind."""
+        built = {kind: [] for kind in INDEX_TYPES}
+        for kind, field in list(self._indexes):
+            built[kind].append(field)
+        return built
+
+    def rebuild(self, records: Sequence[Dict[str, Any]]) -> 'IndexSet':
+        """A new IndexSet over `records` with the configured indexes and those built on first use so far."""
+        indexes = IndexSet(records, self.hash_fields, self.sorted_fields, self.build_on_first_use)
+        configured = ({('hash', field) for field in self.hash_fields} |
+                      {('sorted', field) for field in self.sorted_fields})
+        for kind, field in list(self._indexes):
+            if (kind, field) not in configured:
+                indexes.build(kind, field)
+        return indexes
@@ -0,0 +1,220 @@
+"""Logging - Leveled, structured logging written to stdout by a background thread.
+
+Modules log through `get_logger(name)` with %-style arguments, so nothing is
+formatted for a disabled level. Records go onto a bounded queue and a
+listener thread does the writing: a request never waits on the terminal, and
+when the queue is full records are dropped (and counted) rather than
+blocking. Wrap payloads in `short()` so a large record list costs a bounded
+repr, not a full one.
+
+Configured from the `logging` section of supervisor_config.yaml:
+`verbose: true` logs at DEBUG (every tool call), `verbose: false` at INFO;
+`level` overrides both, `format: json` writes one JSON object per line.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import reprlib
+import sys
+import threading
+import time
+from typing import Any, Dict, Optional, TextIO
+
+ROOT = "mas"
+
+# Defaults, also used until configure() is called (e.g. servers started from a script)
+DEFAULTS = {'verbose': True, 'level': None, 'format': 'text', 'max_chars': 200, 'queue_size': 10000}
+
+class _Repr(reprlib.Repr):
+    """Size-limited repr: a few items per container, a few levels deep."""
+
+    def __init__(self, max_chars: int):
+        super().__init__()
+        self.maxlevel = 3
+        self.maxlist = self.maxtuple = self.maxset = self.maxfrozenset = self.maxdeque = 8
+        self.maxdict = 8
+        self.maxstring = self.maxother = max_chars
+        self.maxlong = 40
+
+_repr = _Repr(DEFAULTS['max_chars'])
+
+def truncate(value: Any, max_chars: Optional[int] = None) -> str:
+    """Text of `value` cut to about `max_chars`; strings as-is, other values as a bounded repr."""
+    limit = max_chars or _repr.maxstring
+    text = value if isinstance(value, str) else _repr.repr(value)
+    if len(text) > limit:
+        return f"{text[:limit]}... ({len(text)} chars)" if isinstance(value, str) else text[:limit] + "..."
+    return text
+
+class short:
+    """Log argument rendered with truncate() only if the record is actually emitted."""
+
+    __slots__ = ('value', 'max_chars')
+
+    def __init__(self, value: Any, max_chars: Optional[int] = None):
+        self.value = value
+        self.max_chars = max_chars
+
+    def __str__(self) -> str:
+        return truncate(self.value, self.max_chars)
+
+    __repr__ = __str__
+
+def fields(**values) -> Dict[str, Any]:
+    """`extra=` for structured fields, e.g. `log.debug("...", extra=fields(operation=op))`.
+
+    The text format shows only the message; the JSON format adds the fields.
+    """
+    return {'fields': values}
+
+class TextFormatter(logging.Formatter):
+    """The console style used so far: just the message (which carries its own [TAG])."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            message = f"{message}\n{record.exc_text}"
+        return message
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and structured fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage().strip()
+        }
+        entry.update(getattr(record, 'fields', None) or {})
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking (or raising) when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class _StdoutHandler(logging.StreamHandler):
+    """Writes to whatever sys.stdout is at the time, so redirecting stdout still works."""
+
+    def __init__(self):
+        super().__init__(sys.stdout)
+
+    @property
+    def stream(self) -> TextIO:
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value: TextIO):
+        pass
+
+class _State:
+    """The process's queue handler and writer thread; replaced by every configure()."""
+
+    handler: Optional[_DroppingQueueHandler] = None
+    listener: Optional[logging.handlers.QueueListener] = None
+    settings: Dict[str, Any] = {}
+    lock = threading.RLock()
+    atexit_registered = False
+
+class _DefaultsHandler(logging.Handler):
+    """Stands in until configure(): the first record starts logging with the defaults.
+
+    So importing a module that logs starts no thread, and a server started
+    from a script (without the config) still logs as before.
+    """
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        with _State.lock:
+            if _State.handler is None:
+                configure(**DEFAULTS)
+        return _State.handler.handle(record)
+
+_defaults_handler = _DefaultsHandler()
+logging.getLogger(ROOT).addHandler(_defaults_handler)
+logging.getLogger(ROOT).setLevel(logging.DEBUG)
+logging.getLogger(ROOT).propagate = False
+
+def configure(verbose: bool = True, level: Optional[str] = None, format: str = 'text',
+              max_chars: int = 200, queue_size: int = 10000, stream: Optional[TextIO] = None, **_):
+    """(Re)configure logging for this process; unknown keys (other `logging` options) are ignored."""
+    with _State.lock:
+        _stop()
+        root = logging.getLogger(ROOT)
+        root.removeHandler(_defaults_handler)
+        root.setLevel(level.upper() if level else (logging.DEBUG if verbose else logging.INFO))
+
+        output = logging.StreamHandler(stream) if stream is not None else _StdoutHandler()
+        output.setFormatter(JSONFormatter() if format == 'json' else TextFormatter())
+        _State.handler = _DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+        _State.listener = logging.handlers.QueueListener(_State.handler.queue, output)
+        _State.listener.start()
+        root.addHandler(_State.handler)
+
+        _repr.maxstring = _repr.maxother = max_chars
+        _State.settings = {'verbose': verbose, 'level': level, 'format': format,
+                           'max_chars': max_chars, 'queue_size': queue_size}
+        if not _State.atexit_registered:
+            atexit.register(shutdown)
+            _State.atexit_registered = True
+
+def _stop():
+    if _State.listener is not None:
+        _State.listener.stop()  # writes whatever is still queued
+        logging.getLogger(ROOT).removeHandler(_State.handler)
+        _State.listener = _State.handler = None
+
+def _after_fork():
+    """A forked child has the parent's queue but not its writer thread: start its own."""
+    if _State.handler is None:
+        return
+    logging.getLogger(ROOT).removeHandler(_State.handler)
+    _State.lock = threading.RLock()
+    _State.listener = _State.handler = None
+    configure(**_State.settings)
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork)
+
+def settings() -> Dict[str, Any]:
+    """Current configure() arguments, e.g. to repeat them in a worker process."""
+    return dict(_State.settings or DEFAULTS)
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger `mas.<name>`."""
+    return logging.getLogger(f"{ROOT}.{name}")
+
+def flush(timeout: float = 1.0):
+    """Wait (up to `timeout` seconds) until queued records are written; for interactive output."""
+    handler = _State.handler
+    if handler is None:
+        return
+    deadline = time.monotonic() + timeout
+    while handler.queue.unfinished_tasks and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+def dropped() -> int:
+    """Records dropped because the queue was full."""
+    return _State.handler.dropped if _State.handler is not None else 0
+
+def shutdown():
+    """Write queued records and stop the writer thread."""
+    with _State.lock:
+        _stop()
@@ -0,0 +1,251 @@
+"""Metrics - Counters, gauges and histograms rendered in the Prometheus text format.
+
+Dependency-free: MCP servers serve a MetricsRegistry at GET /metrics, and the
+supervisor keeps one for its LLM and tool calls (shared with its sub-agents).
+"""
+import asyncio
+import bisect
+import functools
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; MCP operations take microseconds to seconds, LLM calls up to tens of seconds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# Bytes on the wire
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[Any], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class _Metric:
+    """One metric family: a value (or histogram state) per label combination."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple, Any] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._samples(key, value))
+        return lines
+
+    def _samples(self, key: Tuple, value: Any) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+INF_BUCKET = 'le="+Inf"'
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0, 0.0]  # per-bucket, count, sum
+            i = bisect.bisect_left(self.buckets, value)  # first bucket with value <= bound
+            if i < len(self.buckets):
+                state[0][i] += 1
+            state[1] += 1
+            state[2] += value
+
+    def _samples(self, key: Tuple, state: Any) -> List[str]:
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets, state[0]):
+            cumulative += count
+            labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, INF_BUCKET)} {state[1]}")
+        lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(state[2])}")
+        lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {state[1]}")
+        return lines
+
+class MetricsRegistry:
+    """Named metric families; asking twice for the same name returns the same metric."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif type(metric) is not cls:
+                raise ValueError(f"Metric {name} already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, documentation, labelnames, buckets)
+
+    def render(self) -> bytes:
+        """All metrics in the Prometheus text exposition format (GET /metrics)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return ("\n".join(lines) + "\n").encode('utf-8')
+
+class Call:
+    """One tracked call; set `labels`, `error` and byte counts before it ends."""
+
+    __slots__ = ('labels', 'error', 'request_bytes', 'response_bytes')
+
+    def __init__(self, labels: Dict[str, Any]):
+        self.labels = labels
+        self.error = False
+        self.request_bytes: Optional[int] = None
+        self.response_bytes: Optional[int] = None
+
+class OperationMetrics:
+    """Requests, errors, in-flight, latency and payload sizes of calls, as `<prefix>_*` metrics.
+
+    `in_flight_labels` is the subset of `labelnames` known when a call starts;
+    the rest may be filled in on the Call while it runs (e.g. the operation,
+    once the request body has been parsed).
+    """
+
+    def __init__(self, registry: MetricsRegistry, prefix: str, labelnames: Sequence[str],
+                 in_flight_labels: Sequence[str] = (), what: str = "calls"):
+        self.registry = registry
+        self.labelnames = tuple(labelnames)
+        self.in_flight_labels = tuple(in_flight_labels)
+        self.requests = registry.counter(f"{prefix}_requests_total", f"Number of {what}", labelnames)
+        self.errors = registry.counter(f"{prefix}_errors_total", f"Number of failed {what}", labelnames)
+        self.in_flight = registry.gauge(f"{prefix}_in_flight", f"Number of {what} in progress",
+                                        in_flight_labels)
+        self.latency = registry.histogram(f"{prefix}_request_duration_seconds", f"Duration of {what}",
+                                          labelnames)
+        self.request_bytes = registry.histogram(f"{prefix}_request_bytes", f"Request body size of {what}",
+                                                labelnames, SIZE_BUCKETS)
+        self.response_bytes = registry.histogram(f"{prefix}_response_bytes", f"Response body size of {what}",
+                                                 labelnames, SIZE_BUCKETS)
+
+    @contextmanager
+    def track(self, **labels) -> Iterator[Call]:
+        """Time the enclosed call; an exception counts as an error."""
+        call = Call({name: labels.get(name, "") for name in self.labelnames})
+        gauge_labels = {name: call.labels[name] for name in self.in_flight_labels}
+        self.in_flight.inc(**gauge_labels)
+        start = time.perf_counter()
+        try:
+            yield call
+        except BaseException:
+            call.error = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.in_flight.dec(**gauge_labels)
+            self.requests.inc(**call.labels)
+            if call.error:
+                self.errors.inc(**call.labels)
+            self.latency.observe(elapsed, **call.labels)
+            if call.request_bytes is not None:
+                self.request_bytes.observe(call.request_bytes, **call.labels)
+            if call.response_bytes is not None:
+                self.response_bytes.observe(call.response_bytes, **call.labels)
+
+def tool_metrics(registry: Optional[MetricsRegistry] = None) -> OperationMetrics:
+    """Client-side MCP call metrics of the sub-agents (`agent_tool_*`)."""
+    return OperationMetrics(registry or MetricsRegistry(), "agent_tool",
+                            ('agent', 'operation', 'transport'), ('agent',), what="MCP tool calls")
+
+def _failed(result: Any) -> bool:
+    if isinstance(result, dict):
+        return 'error' in result
+    if isinstance(result, list):
+        return any(isinstance(item, dict) and 'error' in item for item in result)
+    return False
+
+def metered(method):
+    """Record an agent's call_mcp/acall_mcp (or batch) in `self.metrics`.
+
+    The operation label is the first argument, or "batch" for a list of calls;
+    a returned {'error': ...} (or any failed batch item) counts as an error.
+    """
+    def labels(self, first: Any) -> Dict[str, Any]:
+        return {'agent': self.metrics_name, 'operation': first if isinstance(first, str) else 'batch',
+                'transport': self.transport}
+
+    if asyncio.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def async_wrapper(self, first, *args, **kwargs):
+            with self.metrics.track(**labels(self, first)) as call:
+                result = await method(self, first, *args, **kwargs)
+                call.error = _failed(result)
+                return result
+        return async_wrapper
+
+    @functools.wraps(method)
+    def wrapper(self, first, *args, **kwargs):
+        with self.metrics.track(**labels(self, first)) as call:
+            result = method(self, first, *args, **kwargs)
+            call.error = _failed(result)
+            return result
+    return wrapper
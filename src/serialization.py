@@ -0,0 +1,253 @@
+"""Serialization - Pluggable wire formats for MCP payloads and HTTP content negotiation.
+
+application/json is always available and is the default. When installed,
+orjson transparently speeds up JSON, and msgpack adds application/msgpack,
+a compact binary format.
+
+Integers beyond 64 bits stay exact: msgpack cannot hold them, so such a
+payload is sent as JSON instead (see dumps()), and orjson would parse them as
+floats, so such a JSON body is parsed by stdlib json.
+"""
+import abc
+import json
+import re
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional binary format
+    msgpack = None
+
+class UnsupportedMediaType(ValueError):
+    """Request body uses a format this side cannot decode."""
+
+class StreamError(RuntimeError):
+    """A streamed result ended with an error or without its status line."""
+
+class Codec(abc.ABC):
+    """A wire format: content type plus encode/decode."""
+
+    name = ""
+    content_type = ""
+
+    @abc.abstractmethod
+    def dumps(self, payload: Any) -> bytes:
+        """Encode a payload as this format's bytes."""
+
+    @abc.abstractmethod
+    def loads(self, body: bytes) -> Any:
+        """Decode a body in this format."""
+
+# A run of 19+ digits may be an integer outside int64, which orjson would turn into a float
+_LONG_DIGITS = re.compile(rb"\d{19}")
+
+class JSONCodec(Codec):
+    """JSON via orjson when installed, stdlib json otherwise (same wire format)."""
+
+    name = "json"
+    content_type = "application/json"
+
+    def __init__(self, use_orjson: bool = True):
+        self.engine = "orjson" if (use_orjson and orjson is not None) else "json"
+
+    def dumps(self, payload: Any) -> bytes:
+        if self.engine == "orjson":
+            try:
+                return orjson.dumps(payload, default=str, option=orjson.OPT_NON_STR_KEYS)
+            except (TypeError, orjson.JSONEncodeError):
+                pass  # e.g. integers beyond 64 bits; stdlib handles them
+        return json.dumps(payload, default=str).encode('utf-8')
+
+    def loads(self, body: bytes) -> Any:
+        if not body:
+            return None
+        if self.engine == "orjson" and not _LONG_DIGITS.search(body):
+            return orjson.loads(body)
+        return json.loads(body.decode('utf-8'))
+
+class MsgpackCodec(Codec):
+    """MessagePack: binary, no text escaping, smaller numbers."""
+
+    name = "msgpack"
+    content_type = "application/msgpack"
+
+    def dumps(self, payload: Any) -> bytes:
+        """Raises OverflowError for integers beyond 64 bits; dumps() falls back to JSON."""
+        return msgpack.packb(payload, default=_msgpack_default, use_bin_type=True)
+
+    def loads(self, body: bytes) -> Any:
+        if not body:
+            return None
+        return msgpack.unpackb(body, raw=False, strict_map_key=False)
+
+def _msgpack_default(value: Any) -> Any:
+    if isinstance(value, int):
+        raise OverflowError(f"integer out of msgpack range: {value}")
+    return str(value)
+
+JSON = JSONCodec()
+
+def dumps(codec: Codec, payload: Any) -> Tuple[bytes, Codec]:
+    """Encode with `codec`, or with JSON if the format cannot represent the payload."""
+    try:
+        return codec.dumps(payload), codec
+    except OverflowError:
+        return JSON.dumps(payload), JSON
+
+# Every format available in this process, best first
+CODECS: Dict[str, Codec] = {}
+if msgpack is not None:
+    CODECS[MsgpackCodec.name] = MsgpackCodec()
+CODECS[JSON.name] = JSON
+
+_BY_CONTENT_TYPE = {codec.content_type: codec for codec in CODECS.values()}
+if msgpack is not None:
+    _BY_CONTENT_TYPE['application/x-msgpack'] = CODECS[MsgpackCodec.name]
+
+def available_formats() -> List[str]:
+    return list(CODECS)
+
+def codec_for_content_type(content_type: Optional[str]) -> Codec:
+    """Codec for a Content-Type header; missing means JSON."""
+    media_type = (content_type or JSON.content_type).split(';')[0].strip().lower()
+    codec = _BY_CONTENT_TYPE.get(media_type)
+    if codec is None:
+        raise UnsupportedMediaType(f"Unsupported Content-Type: {media_type}")
+    return codec
+
+def codec_for_accept(accept: Optional[str]) -> Codec:
+    """Best codec for an Accept header (highest q, then listed order); JSON if nothing matches."""
+    best, best_q = None, 0.0
+    for entry in (accept or "").split(','):
+        media_type, *params = [part.strip() for part in entry.split(';')]
+        q = 1.0
+        for param in params:
+            if param.startswith('q='):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        codec = _BY_CONTENT_TYPE.get(media_type.lower())
+        if codec is not None and q > best_q:
+            best, best_q = codec, q
+    return best or JSON
+
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+
+def ndjson_stream(items: Iterable[Any]) -> Iterator[bytes]:
+    """Encode items as NDJSON lines, then a status line: {"status": "success", "count": N}.
+
+    An error while producing items becomes the status line instead, so the
+    reader can tell a complete stream from a failed or truncated one.
+    """
+    count = 0
+    try:
+        for item in items:
+            yield JSON.dumps(item) + b'\n'
+            count += 1
+    except Exception as e:
+        yield JSON.dumps({'status': 'error', 'error': str(e), 'count': count}) + b'\n'
+        return
+    yield JSON.dumps({'status': 'success', 'count': count}) + b'\n'
+
+def _check_status(line: Optional[bytes]):
+    status = JSON.loads(line) if line is not None else None
+    if not isinstance(status, dict) or status.get('status') != 'success':
+        error = status.get('error') if isinstance(status, dict) else "stream ended without a status line"
+        raise StreamError(error or "stream failed")
+
+class _NDJSONReader:
+    """Splits raw body chunks into lines and holds back the last one (the status line)."""
+
+    def __init__(self):
+        self.pending = b''
+        self.previous: Optional[bytes] = None
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        lines = (self.pending + chunk).split(b'\n')
+        self.pending = lines.pop()
+        items = []
+        for line in lines:
+            if not line.strip():
+                continue
+            if self.previous is not None:
+                items.append(JSON.loads(self.previous))
+            self.previous = line
+        return items
+
+    def close(self) -> List[Any]:
+        items = self.feed(b'\n') if self.pending.strip() else []
+        _check_status(self.previous)
+        return items
+
+def read_ndjson_stream(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """Yield items from a body written by ndjson_stream(); raises StreamError on failure.
+
+    Takes raw body chunks (e.g. `iter_content()`). The status line is only
+    known once the stream ends, so each item is yielded one line late.
+    """
+    reader = _NDJSONReader()
+    for chunk in chunks:
+        yield from reader.feed(chunk)
+    yield from reader.close()
+
+async def aread_ndjson_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    """Async variant of read_ndjson_stream() for httpx `aiter_bytes()`."""
+    reader = _NDJSONReader()
+    async for chunk in chunks:
+        for item in reader.feed(chunk):
+            yield item
+    for item in reader.close():
+        yield item
+
+class FormatNegotiator:
+    """Client side of content negotiation, one per MCP server.
+
+    Every request advertises the local formats in Accept. Request bodies start
+    as JSON and switch to whatever format the server answers in, so the best
+    format both sides support is used from the second call on, without an
+    extra round trip. A server that answers in JSON again (e.g. restarted
+    without msgpack) moves the client back to JSON. An optional
+    RequestCompressor negotiates Content-Encoding the same way.
+    """
+
+    def __init__(self, formats: Optional[Sequence[str]] = None, compressor=None):
+        preferred = [name for name in (formats or CODECS) if name in CODECS]
+        if JSON.name not in preferred:
+            preferred.append(JSON.name)  # always understood by every server
+        self.codecs = [CODECS[name] for name in preferred]
+        count = len(self.codecs)
+        self.accept = ", ".join(
+            codec.content_type if i == 0 else f"{codec.content_type};q={round(1 - i / count, 2)}"
+            for i, codec in enumerate(self.codecs))
+        self.codec: Codec = JSON
+        self.compressor = compressor
+
+    def encode(self, payload: Any) -> Tuple[bytes, Dict[str, str]]:
+        """Request body and its Content-Type/Accept headers."""
+        body, codec = dumps(self.codec, payload)
+        headers = {'Content-Type': codec.content_type, 'Accept': self.accept}
+        if self.compressor is not None:
+            body, encoding_headers = self.compressor.compress_request(body)
+            headers.update(encoding_headers)
+        return body, headers
+
+    def observe(self, response):
+        """Learn the server's format from any response (errors included)."""
+        if self.compressor is not None:
+            self.compressor.observe(response)
+        try:
+            codec = codec_for_content_type(response.headers.get('Content-Type'))
+        except UnsupportedMediaType:
+            return
+        if codec in self.codecs:
+            self.codec = codec
+
+    def decode(self, response) -> Any:
+        """Decode a requests/httpx response body according to its Content-Type."""
+        return codec_for_content_type(response.headers.get('Content-Type')).loads(response.content)
@@ -1,17 +1,50 @@
 """Data Agent - Specialized agent for data analysis operations."""
+import httpx
 import requests
 import json
 import os
-from typing import Any, Dict, List
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+from src.columnar import COMPARISONS, ColumnarTable, Unvectorizable
+from src.indexes import IndexSet
+from src.log import fields, get_logger, short
+from src.metrics import MetricsRegistry, metered, tool_metrics
+from src.serialization import FormatNegotiator, StreamError, aread_ndjson_stream, read_ndjson_stream
+from sub_agents.transport import (ConnectionStats, create_async_client, create_compressor, create_inproc_server,
+                                  create_session, split_mcp_url)
+
+log = get_logger('agents.data')
 
 class DataAgent:
     """Data Agent - Handles data analysis and filtering."""
     
-    def __init__(self, mcp_url: str = "http://localhost:8001"):
-        self.mcp_url = mcp_url
+    def __init__(self, mcp_url: str = "http://localhost:8001", timeout: float = 5,
+                 pool_size: int = 10, keepalive_expiry: float = 4,
+                 formats: Optional[List[str]] = None, compression: Optional[Dict[str, Any]] = None,
+                 metrics: Optional[MetricsRegistry] = None, indexes: Optional[Dict[str, Any]] = None):
+        # unix:///path.sock URLs reach the server over a Unix domain socket
+        self.mcp_url, self.unix_socket = split_mcp_url(mcp_url)
+        # inproc://<service> calls the server's registry directly, without HTTP
+        self.inproc = create_inproc_server(mcp_url)
+        self.transport = 'inproc' if self.inproc else 'unix' if self.unix_socket else 'tcp'
+        # Tool call count, errors and latency; the supervisor passes its shared registry
+        self.metrics = tool_metrics(metrics)
+        self.metrics_name = 'data'
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.keepalive_expiry = keepalive_expiry
+        self._session = None
+        self.connections = ConnectionStats()
+        # Best wire format and Content-Encoding shared with the server
+        self.codec = FormatNegotiator(formats, create_compressor(compression))
+        self._async_client = None
+        self.breaker = None  # CircuitBreaker, attached by the supervisor
         self.name = "Data Agent"
         self.capabilities = ["count_records", "filter_records", "group_records", "sort_records", "aggregate_records"]
         self.dataset = self._load_dataset()
+        # Columns of the dataset are built on first use and kept for later queries
+        self.table = ColumnarTable(self.dataset.get('records', []))
+        # Hash and sorted indexes for filter_records (the `indexes` section of data.yaml)
+        self.indexes = IndexSet.from_config(self.dataset.get('records', []), indexes)
     
     def _load_dataset(self) -> Dict[str, Any]:
         """Load sample dataset from file."""
@@ -23,11 +56,38 @@ class DataAgent:
             else:
                 return {'records': [], 'metadata': {'total_records': 0}}
         except Exception as e:
-            print(f"[DATA AGENT] ⚠️ Could not load dataset: {e}")
+            log.warning("[DATA AGENT] ⚠️ Could not load dataset: %s", e)
             return {'records': [], 'metadata': {'total_records': 0}}
     
+    def reload_dataset(self):
+        """Re-read the dataset file; its columns and indexes are rebuilt for the new records."""
+        dataset = self._load_dataset()
+        records = dataset.get('records', [])
+        table, indexes = ColumnarTable(records), self.indexes.rebuild(records)
+        self.dataset, self.table, self.indexes = dataset, table, indexes
+        log.info("[DATA AGENT] 🔄 Reloaded dataset: %d records", len(records))
+    
+    @property
+    def session(self) -> requests.Session:
+        """Pooled keep-alive session for blocking calls."""
+        if self._session is None:
+            self._session = create_session(self.pool_size, self.unix_socket)
+        return self._session
+    
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        """Non-blocking pooled HTTP client, created on first use inside the running event loop."""
+        if self._async_client is None:
+            self._async_client = create_async_client(self.timeout, self.pool_size, self.keepalive_expiry,
+                                                     self.unix_socket)
+        return self._async_client
+    
+    @metered
     def call_mcp(self, operation: str, *args, **kwargs) -> Dict[str, Any]:
         """Call MCP Data Server."""
+        if self.breaker is not None and not self.breaker.allow():
+            return {'error': f"Data MCP server unavailable (circuit {self.breaker.state})"}
+        
         try:
             payload = {
                 'operation': operation,
@@ -35,31 +95,209 @@ class DataAgent:
                 'kwargs': kwargs
             }
             
-            response = requests.post(f"{self.mcp_url}/operate", json=payload, timeout=5)
+            if self.inproc is not None:
+                return self.inproc.operate(payload['operation'], payload['args'], payload['kwargs'])
+            body, headers = self.codec.encode(payload)
+            response = self.session.post(f"{self.mcp_url}/operate", data=body, headers=headers,
+                                         timeout=self.timeout)
+            self._record_status(response.status_code)
+            self.codec.observe(response)
             if response.status_code == 200:
-                return response.json()
+                return self.codec.decode(response)
             else:
                 return {'error': f"MCP Error: {response.status_code}"}
         
         except Exception as e:
+            self._record(False)
             return {'error': str(e)}
+        finally:
+            self._release()
+    
+    @metered
+    async def acall_mcp(self, operation: str, *args, **kwargs) -> Dict[str, Any]:
+        """Call MCP Data Server without blocking the event loop."""
+        if self.breaker is not None and not self.breaker.allow():
+            return {'error': f"Data MCP server unavailable (circuit {self.breaker.state})"}
+        
+        try:
+            payload = {
+                'operation': operation,
+                'args': list(args),
+                'kwargs': kwargs
+            }
+            
+            if self.inproc is not None:
+                return await self.inproc.aoperate(payload['operation'], payload['args'], payload['kwargs'])
+            body, headers = self.codec.encode(payload)
+            response = await self.async_client.post(f"{self.mcp_url}/operate", content=body, headers=headers,
+                                                   extensions=self.connections.extensions)
+            self._record_status(response.status_code)
+            self.codec.observe(response)
+            if response.status_code == 200:
+                return self.codec.decode(response)
+            else:
+                return {'error': f"MCP Error: {response.status_code}"}
+        
+        except Exception as e:
+            self._record(False)
+            return {'error': str(e) or type(e).__name__}
+        finally:
+            self._release()
+    
+    def _batch_payload(self, calls: List[Dict[str, Any]], parallel: bool) -> Dict[str, Any]:
+        """Build the /operate_batch request body from [{operation, args, kwargs}, ...]."""
+        items = [{'operation': call['operation'], 'args': list(call.get('args', [])), 'kwargs': call.get('kwargs', {})}
+                 for call in calls]
+        return {'items': items, 'parallel': parallel}
+    
+    @metered
+    def call_mcp_batch(self, calls: List[Dict[str, Any]], parallel: bool = False) -> List[Dict[str, Any]]:
+        """Run several operations in one round trip; results follow the order of `calls`."""
+        if self.breaker is not None and not self.breaker.allow():
+            return [{'error': f"Data MCP server unavailable (circuit {self.breaker.state})"} for _ in calls]
+        
+        try:
+            if self.inproc is not None:
+                return self.inproc.operate_batch(self._batch_payload(calls, parallel)['items'], parallel)
+            body, headers = self.codec.encode(self._batch_payload(calls, parallel))
+            response = self.session.post(f"{self.mcp_url}/operate_batch", data=body, headers=headers,
+                                         timeout=self.timeout)
+            self._record_status(response.status_code)
+            self.codec.observe(response)
+            if response.status_code == 200:
+                return self.codec.decode(response)['results']
+            error = f"MCP Error: {response.status_code}"
+        
+        except Exception as e:
+            self._record(False)
+            error = str(e)
+        finally:
+            self._release()
+        return [{'error': error} for _ in calls]
+    
+    @metered
+    async def acall_mcp_batch(self, calls: List[Dict[str, Any]], parallel: bool = False) -> List[Dict[str, Any]]:
+        """Run several operations in one round trip without blocking the event loop."""
+        if self.breaker is not None and not self.breaker.allow():
+            return [{'error': f"Data MCP server unavailable (circuit {self.breaker.state})"} for _ in calls]
+        
+        try:
+            if self.inproc is not None:
+                return await self.inproc.aoperate_batch(self._batch_payload(calls, parallel)['items'], parallel)
+            body, headers = self.codec.encode(self._batch_payload(calls, parallel))
+            response = await self.async_client.post(f"{self.mcp_url}/operate_batch", content=body, headers=headers,
+                                                    extensions=self.connections.extensions)
+            self._record_status(response.status_code)
+            self.codec.observe(response)
+            if response.status_code == 200:
+                return self.codec.decode(response)['results']
+            error = f"MCP Error: {response.status_code}"
+        
+        except Exception as e:
+            self._record(False)
+            error = str(e) or type(e).__name__
+        finally:
+            self._release()
+        return [{'error': error} for _ in calls]
+    
+    def stream_mcp(self, operation: str, *args, **kwargs) -> Iterator[Dict[str, Any]]:
+        """Yield the records of filter_records/sort_records/select_fields as they arrive.
+        
+        Memory stays bounded by one chunk instead of the whole result. Raises
+        StreamError if the server rejects the call or the stream fails part-way.
+        """
+        if self.breaker is not None and not self.breaker.allow():
+            raise StreamError(f"Data MCP server unavailable (circuit {self.breaker.state})")
+        
+        try:
+            if self.inproc is not None:
+                yield from self.inproc.stream(operation, list(args), kwargs)
+                return
+            body, headers = self.codec.encode({'operation': operation, 'args': list(args), 'kwargs': kwargs})
+            headers['Accept'] = 'application/x-ndjson'
+            try:
+                with self.session.post(f"{self.mcp_url}/operate_stream", data=body, headers=headers,
+                                       timeout=self.timeout, stream=True) as response:
+                    self._record_status(response.status_code)
+                    if response.status_code != 200:
+                        raise StreamError(f"MCP Error: {response.status_code} {response.text}")
+                    yield from read_ndjson_stream(response.iter_content(chunk_size=64 * 1024))
+            except requests.RequestException:
+                self._record(False)
+                raise
+        finally:
+            self._release()
+    
+    async def astream_mcp(self, operation: str, *args, **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        """Async generator variant of stream_mcp()."""
+        if self.breaker is not None and not self.breaker.allow():
+            raise StreamError(f"Data MCP server unavailable (circuit {self.breaker.state})")
+        
+        try:
+            if self.inproc is not None:
+                async for record in self.inproc.astream(operation, list(args), kwargs):
+                    yield record
+                return
+            body, headers = self.codec.encode({'operation': operation, 'args': list(args), 'kwargs': kwargs})
+            headers['Accept'] = 'application/x-ndjson'
+            try:
+                async with self.async_client.stream('POST', f"{self.mcp_url}/operate_stream", content=body,
+                                                    headers=headers,
+                                                    extensions=self.connections.extensions) as response:
+                    self._record_status(response.status_code)
+                    if response.status_code != 200:
+                        await response.aread()
+                        raise StreamError(f"MCP Error: {response.status_code} {response.text}")
+                    async for record in aread_ndjson_stream(response.aiter_bytes()):
+                        yield record
+            except httpx.HTTPError:
+                self._record(False)
+                raise
+        finally:
+            self._release()
+    
+    def _table(self, records: List[Dict[str, Any]]) -> ColumnarTable:
+        """Columns of the loaded dataset; raises Unvectorizable for other record lists.
+        
+        Records passed with a call are scanned: building columns for a single
+        query costs more than the vectorized query saves (benchmarks/columnar.py).
+        """
+        if records is not self.table.records:
+            raise Unvectorizable('records')
+        return self.table
+    
+    def _filter(self, records: List[Dict[str, Any]], field: str, operator: str, value: Any) -> List[Dict[str, Any]]:
+        """Records with `record[field] <operator> value`, in order: from an index, the columns or a scan."""
+        if records is self.indexes.records:
+            filtered = self.indexes.filter(field, operator, value)
+            if filtered is not None:
+                return filtered
+        try:
+            return self._table(records).filter(field, operator, value)
+        except Unvectorizable:
+            compare = COMPARISONS.get(operator)
+            if compare is None:
+                return []
+            return [r for r in records if field in r and compare(r[field], value)]
     
     def _compute_local(self, operation: str, *args, **kwargs) -> Dict[str, Any]:
-        """Compute data operation locally using dataset."""
+        """Compute data operation locally using dataset (or the `records` kwarg, if given)."""
         try:
-            records = self.dataset.get('records', [])
+            records = kwargs.pop('records', None)
+            if records is None:
+                records = self.dataset.get('records', [])
             
             if operation == 'count_records':
                 return {'operation': operation, 'result': len(records)}
             
             elif operation == 'filter_records':
                 # Filter records by a field matching a value
-                # Usage: filter_records(field='department', value='Engineering')
+                # Usage: filter_records(field='department', value='Engineering'[, operator='=='])
                 field = kwargs.get('field') or (args[0] if len(args) > 0 else None)
                 value = kwargs.get('value') or (args[1] if len(args) > 1 else None)
+                operator = kwargs.get('operator', '==')
                 if field and value:
-                    filtered = [r for r in records if r.get(field) == value]
-                    return {'operation': operation, 'result': filtered}
+                    return {'operation': operation, 'result': self._filter(records, field, operator, value)}
                 return {'operation': operation, 'result': []}
             
             elif operation == 'group_records':
@@ -80,7 +318,11 @@ class DataAgent:
                 field = kwargs.get('field') or (args[0] if len(args) > 0 else None)
                 order = kwargs.get('order', 'asc')
                 if field:
-                    sorted_records = sorted(records, key=lambda x: x.get(field, ''), reverse=(order.lower() == 'desc'))
+                    descending = order.lower() == 'desc'
+                    try:
+                        sorted_records = self._table(records).sort(field, descending, default='')
+                    except Unvectorizable:
+                        sorted_records = sorted(records, key=lambda x: x.get(field, ''), reverse=descending)
                     return {'operation': operation, 'result': sorted_records}
                 return {'operation': operation, 'result': records}
             
@@ -88,25 +330,30 @@ class DataAgent:
                 # Aggregate (count, sum, avg) on a field
                 agg_type = kwargs.get('type', 'count')  # count, sum, avg
                 agg_field = kwargs.get('field')
+                # The aggregate and field go back with the result, so the answer can name them
+                described = {'operation': operation, 'type': agg_type, 'field': agg_field}
                 if agg_type == 'count':
-                    return {'operation': operation, 'result': len(records)}
+                    return {**described, 'result': len(records)}
                 elif agg_field and agg_type in ['sum', 'avg']:
+                    try:
+                        value = self._table(records).aggregate(agg_field, 'sum' if agg_type == 'sum' else 'average')
+                        return {**described, 'result': 0 if value is None else value}
+                    except Unvectorizable:
+                        pass
                     values = [r.get(agg_field, 0) for r in records if isinstance(r.get(agg_field), (int, float))]
                     if agg_type == 'sum':
-                        return {'operation': operation, 'result': sum(values)}
+                        return {**described, 'result': sum(values)}
                     else:  # avg
-                        return {'operation': operation, 'result': sum(values) / len(values) if values else 0}
+                        return {**described, 'result': sum(values) / len(values) if values else 0}
             
             return None
         except Exception as e:
-            print(f"[DATA AGENT] ⚠️ Local computation failed: {e}")
+            log.warning("[DATA AGENT] ⚠️ Local computation failed: %s", e)
             return None
     
     def process(self, operation: str, *args, **kwargs) -> Dict[str, Any]:
         """Process data operation."""
-        print(f"\n[DATA AGENT] 📊 TOOL CALL: {operation}")
-        if kwargs:
-            print(f"[DATA AGENT]    Options: {kwargs}")
+        self._report_call(operation, kwargs)
         
         # Try local computation first
         local_result = self._compute_local(operation, *args, **kwargs)
@@ -116,22 +363,90 @@ class DataAgent:
             # Fallback to MCP
             result = self.call_mcp(operation, *args, **kwargs)
         
+        self._report_result(result)
+        return result
+    
+    async def aprocess(self, operation: str, *args, **kwargs) -> Dict[str, Any]:
+        """Process data operation (async)."""
+        self._report_call(operation, kwargs)
+        
+        # Try local computation first
+        local_result = self._compute_local(operation, *args, **kwargs)
+        if local_result and 'result' in local_result:
+            result = local_result
+        else:
+            # Fallback to MCP
+            result = await self.acall_mcp(operation, *args, **kwargs)
+        
+        self._report_result(result)
+        return result
+    
+    def _report_call(self, operation: str, kwargs: Dict[str, Any]):
+        if kwargs:
+            log.debug("\n[DATA AGENT] 📊 TOOL CALL: %s\n[DATA AGENT]    Options: %s", operation, short(kwargs),
+                      extra=fields(agent='data', operation=operation))
+        else:
+            log.debug("\n[DATA AGENT] 📊 TOOL CALL: %s", operation, extra=fields(agent='data', operation=operation))
+    
+    def _report_result(self, result: Dict[str, Any]):
         if 'result' in result:
-            print(f"[DATA AGENT] ✅ RESULT: Operation succeeded")
-            if isinstance(result['result'], (list, dict)):
-                if isinstance(result['result'], list):
-                    print(f"[DATA AGENT]    Records: {len(result['result'])} items returned")
-                elif isinstance(result['result'], dict):
-                    print(f"[DATA AGENT]    Items: {len(result['result'])} groups/items")
-                else:
-                    print(f"[DATA AGENT]    Value: {result['result']}")
+            value = result['result']
+            if isinstance(value, list):
+                log.debug("[DATA AGENT] ✅ RESULT: Operation succeeded\n[DATA AGENT]    Records: %d items returned",
+                          len(value))
+            elif isinstance(value, dict):
+                log.debug("[DATA AGENT] ✅ RESULT: Operation succeeded\n[DATA AGENT]    Items: %d groups/items",
+                          len(value))
             else:
-                print(f"[DATA AGENT]    Result: {result['result']}")
-        return result
+                log.debug("[DATA AGENT] ✅ RESULT: Operation succeeded\n[DATA AGENT]    Result: %s", short(value))
     
     def is_healthy(self) -> bool:
         """Check if Data Agent is healthy (checks if dataset is loaded)."""
         return len(self.dataset.get('records', [])) > 0
+    
+    async def ais_healthy(self) -> bool:
+        """Async health check; the dataset check is local so this never blocks."""
+        return self.is_healthy()
+    
+    def _record(self, success: bool):
+        """Report a call outcome to the circuit breaker, if one is attached."""
+        if self.breaker is not None:
+            self.breaker.record(success)
+    
+    def _record_status(self, status_code: int):
+        """Report an MCP response to the breaker; a 503 is the server shedding load, neither outcome."""
+        if status_code != 503:
+            self._record(status_code < 500)
+    
+    def _release(self):
+        """End a call the breaker let through; frees its half-open trial if no outcome was recorded."""
+        if self.breaker is not None:
+            self.breaker.release()
+    
+    async def aprobe(self) -> bool:
+        """GET /health on the MCP server (used by the background health monitor)."""
+        if self.inproc is not None:
+            return True
+        response = await self.async_client.get(f"{self.mcp_url}/health",
+                                                  extensions=self.connections.extensions)
+        return response.status_code == 200
+    
+    def connection_stats(self) -> Dict[str, Any]:
+        """Keep-alive reuse, the negotiated wire format and compressed bytes for this server."""
+        if self.inproc is not None:
+            return {'transport': 'inproc', **self.inproc.stats()}
+        return {**self.connections.stats(self._session), 'transport': self.transport,
+                'format': self.codec.codec.name,
+                'compression': self.codec.compressor.stats()}
+    
+    async def aclose(self):
+        """Close the pooled HTTP clients."""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+        if self._session is not None:
+            self._session.close()
+            self._session = None
 
 if __name__ == '__main__':
     agent = DataAgent()
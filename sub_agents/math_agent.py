@@ -1,77 +1,229 @@
 """Math Agent - Specialized agent for mathematical operations."""
+import httpx
+import logging
 import requests
 import json
 import statistics
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
+from src.log import fields, get_logger, short, truncate
+from src.metrics import MetricsRegistry, metered, tool_metrics
+from src.serialization import FormatNegotiator
+from sub_agents.transport import (ConnectionStats, create_async_client, create_compressor, create_inproc_server,
+                                  create_session, split_mcp_url)
+
+log = get_logger('agents.math')
 
 class MathAgent:
     """Math Agent - Handles numerical computations."""
     
-    def __init__(self, mcp_url: str = "http://localhost:8000"):
-        self.mcp_url = mcp_url
+    def __init__(self, mcp_url: str = "http://localhost:8000", timeout: float = 5,
+                 pool_size: int = 10, keepalive_expiry: float = 4,
+                 formats: Optional[List[str]] = None, compression: Optional[Dict[str, Any]] = None,
+                 metrics: Optional[MetricsRegistry] = None):
+        # unix:///path.sock URLs reach the server over a Unix domain socket
+        self.mcp_url, self.unix_socket = split_mcp_url(mcp_url)
+        # inproc://<service> calls the server's registry directly, without HTTP
+        self.inproc = create_inproc_server(mcp_url)
+        self.transport = 'inproc' if self.inproc else 'unix' if self.unix_socket else 'tcp'
+        # Tool call count, errors and latency; the supervisor passes its shared registry
+        self.metrics = tool_metrics(metrics)
+        self.metrics_name = 'math'
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.keepalive_expiry = keepalive_expiry
+        self._session = None
+        self.connections = ConnectionStats()
+        # Best wire format and Content-Encoding shared with the server
+        self.codec = FormatNegotiator(formats, create_compressor(compression))
         self.name = "Math Agent"
-        self.capabilities = ["add", "subtract", "multiply", "divide", "average", "median", "max", "min", "power", "sqrt"]
+        self.capabilities = ["add", "subtract", "multiply", "divide", "average", "median", "sum_numbers",
+                             "max_value", "min_value", "power", "square_root", "convert_seconds"]
+        self._async_client = None
+        self.breaker = None  # CircuitBreaker, attached by the supervisor
+    
+    @property
+    def session(self) -> requests.Session:
+        """Pooled keep-alive session for blocking calls."""
+        if self._session is None:
+            self._session = create_session(self.pool_size, self.unix_socket)
+        return self._session
     
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        """Non-blocking pooled HTTP client, created on first use inside the running event loop."""
+        if self._async_client is None:
+            self._async_client = create_async_client(self.timeout, self.pool_size, self.keepalive_expiry,
+                                                     self.unix_socket)
+        return self._async_client
+    
+    def _payload(self, operation: str, args: tuple, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the /operate request body."""
+        # Some operations expect a list, others expect individual parameters
+        if operation in ['add', 'multiply', 'average', 'median', 'max_value', 'min_value', 'sum_numbers']:
+            # Convert all args to a single list
+            if len(args) == 1 and isinstance(args[0], list):
+                payload_args = list(args)
+            else:
+                payload_args = [list(args)]
+        else:
+            # Operations like subtract, divide, power, sqrt use individual args
+            payload_args = list(args)
+        
+        return {
+            'operation': operation,
+            'args': payload_args,
+            'kwargs': kwargs
+        }
+    
+    @metered
     def call_mcp(self, operation: str, *args, **kwargs) -> Dict[str, Any]:
         """Call MCP Math Server."""
+        if self.breaker is not None and not self.breaker.allow():
+            return {'error': f"Math MCP server unavailable (circuit {self.breaker.state})"}
+        
         try:
-            # Some operations expect a list, others expect individual parameters
-            if operation in ['add', 'multiply', 'average', 'median', 'max_value', 'min_value', 'sum_numbers']:
-                # Convert all args to a single list
-                if len(args) == 1 and isinstance(args[0], list):
-                    payload_args = args
-                else:
-                    payload_args = [list(args)]
-            else:
-                # Operations like subtract, divide, power, sqrt use individual args
-                payload_args = list(args)
-            
-            payload = {
-                'operation': operation,
-                'args': payload_args,
-                'kwargs': kwargs
-            }
-            
-            response = requests.post(f"{self.mcp_url}/operate", json=payload, timeout=5)
+            payload = self._payload(operation, args, kwargs)
+            if self.inproc is not None:
+                return self.inproc.operate(payload['operation'], payload['args'], payload['kwargs'])
+            body, headers = self.codec.encode(payload)
+            response = self.session.post(f"{self.mcp_url}/operate", data=body, headers=headers,
+                                         timeout=self.timeout)
+            self._record_status(response.status_code)
+            self.codec.observe(response)
             if response.status_code == 200:
-                return response.json()
+                return self.codec.decode(response)
             else:
                 return {'error': f"MCP Error: {response.status_code}"}
         
         except Exception as e:
+            self._record(False)
             return {'error': str(e)}
+        finally:
+            self._release()
+    
+    @metered
+    async def acall_mcp(self, operation: str, *args, **kwargs) -> Dict[str, Any]:
+        """Call MCP Math Server without blocking the event loop."""
+        if self.breaker is not None and not self.breaker.allow():
+            return {'error': f"Math MCP server unavailable (circuit {self.breaker.state})"}
+        
+        try:
+            payload = self._payload(operation, args, kwargs)
+            if self.inproc is not None:
+                return await self.inproc.aoperate(payload['operation'], payload['args'], payload['kwargs'])
+            body, headers = self.codec.encode(payload)
+            response = await self.async_client.post(f"{self.mcp_url}/operate", content=body, headers=headers,
+                                                   extensions=self.connections.extensions)
+            self._record_status(response.status_code)
+            self.codec.observe(response)
+            if response.status_code == 200:
+                return self.codec.decode(response)
+            else:
+                return {'error': f"MCP Error: {response.status_code}"}
+        
+        except Exception as e:
+            self._record(False)
+            return {'error': str(e) or type(e).__name__}
+        finally:
+            self._release()
+    
+    def _batch_payload(self, calls: List[Dict[str, Any]], parallel: bool) -> Dict[str, Any]:
+        """Build the /operate_batch request body from [{operation, args, kwargs}, ...]."""
+        items = [self._payload(call['operation'], tuple(call.get('args', [])), call.get('kwargs', {}))
+                 for call in calls]
+        return {'items': items, 'parallel': parallel}
+    
+    @metered
+    def call_mcp_batch(self, calls: List[Dict[str, Any]], parallel: bool = False) -> List[Dict[str, Any]]:
+        """Run several operations in one round trip; results follow the order of `calls`."""
+        if self.breaker is not None and not self.breaker.allow():
+            return [{'error': f"Math MCP server unavailable (circuit {self.breaker.state})"} for _ in calls]
+        
+        try:
+            if self.inproc is not None:
+                return self.inproc.operate_batch(self._batch_payload(calls, parallel)['items'], parallel)
+            body, headers = self.codec.encode(self._batch_payload(calls, parallel))
+            response = self.session.post(f"{self.mcp_url}/operate_batch", data=body, headers=headers,
+                                         timeout=self.timeout)
+            self._record_status(response.status_code)
+            self.codec.observe(response)
+            if response.status_code == 200:
+                return self.codec.decode(response)['results']
+            error = f"MCP Error: {response.status_code}"
+        
+        except Exception as e:
+            self._record(False)
+            error = str(e)
+        finally:
+            self._release()
+        return [{'error': error} for _ in calls]
+    
+    @metered
+    async def acall_mcp_batch(self, calls: List[Dict[str, Any]], parallel: bool = False) -> List[Dict[str, Any]]:
+        """Run several operations in one round trip without blocking the event loop."""
+        if self.breaker is not None and not self.breaker.allow():
+            return [{'error': f"Math MCP server unavailable (circuit {self.breaker.state})"} for _ in calls]
+        
+        try:
+            if self.inproc is not None:
+                return await self.inproc.aoperate_batch(self._batch_payload(calls, parallel)['items'], parallel)
+            body, headers = self.codec.encode(self._batch_payload(calls, parallel))
+            response = await self.async_client.post(f"{self.mcp_url}/operate_batch", content=body, headers=headers,
+                                                    extensions=self.connections.extensions)
+            self._record_status(response.status_code)
+            self.codec.observe(response)
+            if response.status_code == 200:
+                return self.codec.decode(response)['results']
+            error = f"MCP Error: {response.status_code}"
+        
+        except Exception as e:
+            self._record(False)
+            error = str(e) or type(e).__name__
+        finally:
+            self._release()
+        return [{'error': error} for _ in calls]
     
     def process(self, operation: str, *args, **kwargs) -> Dict[str, Any]:
         """Process math operation."""
-        print(f"\n[MATH AGENT] 🧮 TOOL CALL: {operation}")
-        print(f"[MATH AGENT]    Parameters: {args if args else kwargs}")
+        self._report_call(operation, args, kwargs)
         result = self.call_mcp(operation, *args, **kwargs)
+        return self._finish(operation, result, args, kwargs)
+    
+    async def aprocess(self, operation: str, *args, **kwargs) -> Dict[str, Any]:
+        """Process math operation (async)."""
+        self._report_call(operation, args, kwargs)
+        result = await self.acall_mcp(operation, *args, **kwargs)
+        return self._finish(operation, result, args, kwargs)
+    
+    def _report_call(self, operation: str, args: tuple, kwargs: Dict[str, Any]):
+        log.debug("\n[MATH AGENT] 🧮 TOOL CALL: %s\n[MATH AGENT]    Parameters: %s",
+                  operation, short(args if args else kwargs), extra=fields(agent='math', operation=operation))
+    
+    def _report_result(self, result: Dict[str, Any]):
+        if not log.isEnabledFor(logging.DEBUG):
+            return
+        lines = [f"[MATH AGENT] ✅ RESULT: {truncate(result.get('result'))}"]
+        
+        # Show step-by-step if available
+        if 'steps' in result:
+            lines.append("\n[MATH AGENT] 📋 STEP-BY-STEP BREAKDOWN:")
+            lines.extend(f"             {step}" for step in result['steps'] if step.strip())
         
+        # Show breakdown if available
+        if 'breakdown' in result:
+            lines.append(f"\n[MATH AGENT] 📊 FINAL RESULT: {truncate(result['breakdown'])}")
+        log.debug("\n".join(lines))
+    
+    def _finish(self, operation: str, result: Dict[str, Any], args: tuple,
+                kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Report the MCP result, falling back to local computation on failure."""
         if 'result' in result:
-            print(f"[MATH AGENT] ✅ RESULT: {result['result']}")
-            
-            # Show step-by-step if available
-            if 'steps' in result:
-                print(f"\n[MATH AGENT] 📋 STEP-BY-STEP BREAKDOWN:")
-                for step in result['steps']:
-                    if step.strip():  # Only print non-empty steps
-                        print(f"             {step}")
-            
-            # Show breakdown if available
-            if 'breakdown' in result:
-                print(f"\n[MATH AGENT] 📊 FINAL RESULT: {result['breakdown']}")
+            self._report_result(result)
         else:
             # If MCP failed, try local computation as fallback
             local_result = self._compute_local(operation, *args, **kwargs)
             if local_result:
-                print(f"[MATH AGENT] ✅ RESULT: {local_result.get('result')}")
-                if 'steps' in local_result:
-                    print(f"\n[MATH AGENT] 📋 STEP-BY-STEP BREAKDOWN:")
-                    for step in local_result['steps']:
-                        if step.strip():
-                            print(f"             {step}")
-                if 'breakdown' in local_result:
-                    print(f"\n[MATH AGENT] 📊 FINAL RESULT: {local_result['breakdown']}")
+                self._report_result(local_result)
                 return local_result
             
         return result
@@ -156,16 +308,69 @@ class MathAgent:
             
             return None
         except Exception as e:
-            print(f"[MATH AGENT] ⚠️ Local computation failed: {e}")
+            log.warning("[MATH AGENT] ⚠️ Local computation failed: %s", e)
             return None
     
     def is_healthy(self) -> bool:
         """Check if MCP server is healthy."""
+        if self.inproc is not None:
+            return True
         try:
-            response = requests.get(f"{self.mcp_url}/health", timeout=5)
+            response = self.session.get(f"{self.mcp_url}/health", timeout=5)
             return response.status_code == 200
         except:
             return False
+    
+    async def ais_healthy(self) -> bool:
+        """Check if MCP server is healthy (async)."""
+        if self.inproc is not None:
+            return True
+        try:
+            response = await self.async_client.get(f"{self.mcp_url}/health", timeout=5,
+                                                  extensions=self.connections.extensions)
+            return response.status_code == 200
+        except Exception:
+            return False
+    
+    def _record(self, success: bool):
+        """Report a call outcome to the circuit breaker, if one is attached."""
+        if self.breaker is not None:
+            self.breaker.record(success)
+    
+    def _record_status(self, status_code: int):
+        """Report an MCP response to the breaker; a 503 is the server shedding load, neither outcome."""
+        if status_code != 503:
+            self._record(status_code < 500)
+    
+    def _release(self):
+        """End a call the breaker let through; frees its half-open trial if no outcome was recorded."""
+        if self.breaker is not None:
+            self.breaker.release()
+    
+    async def aprobe(self) -> bool:
+        """GET /health on the MCP server (used by the background health monitor)."""
+        if self.inproc is not None:
+            return True
+        response = await self.async_client.get(f"{self.mcp_url}/health",
+                                                  extensions=self.connections.extensions)
+        return response.status_code == 200
+    
+    def connection_stats(self) -> Dict[str, Any]:
+        """Keep-alive reuse, the negotiated wire format and compressed bytes for this server."""
+        if self.inproc is not None:
+            return {'transport': 'inproc', **self.inproc.stats()}
+        return {**self.connections.stats(self._session), 'transport': self.transport,
+                'format': self.codec.codec.name,
+                'compression': self.codec.compressor.stats()}
+    
+    async def aclose(self):
+        """Close the pooled HTTP clients."""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+        if self._session is not None:
+            self._session.close()
+            self._session = None
 
 if __name__ == '__main__':
     agent = MathAgent()
@@ -1,18 +1,64 @@
 """Text Agent - Specialized agent for text processing operations."""
+import httpx
 import requests
 import json
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
+from src.log import fields, get_logger, short
+from src.metrics import MetricsRegistry, metered, tool_metrics
+from src.serialization import FormatNegotiator
+from sub_agents.transport import (ConnectionStats, create_async_client, create_compressor, create_inproc_server,
+                                  create_session, split_mcp_url)
+
+log = get_logger('agents.text')
 
 class TextAgent:
     """Text Agent - Handles text processing and analysis."""
     
-    def __init__(self, mcp_url: str = "http://localhost:8002"):
-        self.mcp_url = mcp_url
+    def __init__(self, mcp_url: str = "http://localhost:8002", timeout: float = 5,
+                 pool_size: int = 10, keepalive_expiry: float = 4,
+                 formats: Optional[List[str]] = None, compression: Optional[Dict[str, Any]] = None,
+                 metrics: Optional[MetricsRegistry] = None):
+        # unix:///path.sock URLs reach the server over a Unix domain socket
+        self.mcp_url, self.unix_socket = split_mcp_url(mcp_url)
+        # inproc://<service> calls the server's registry directly, without HTTP
+        self.inproc = create_inproc_server(mcp_url)
+        self.transport = 'inproc' if self.inproc else 'unix' if self.unix_socket else 'tcp'
+        # Tool call count, errors and latency; the supervisor passes its shared registry
+        self.metrics = tool_metrics(metrics)
+        self.metrics_name = 'text'
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.keepalive_expiry = keepalive_expiry
+        self._session = None
+        self.connections = ConnectionStats()
+        # Best wire format and Content-Encoding shared with the server
+        self.codec = FormatNegotiator(formats, create_compressor(compression))
+        self._async_client = None
+        self.breaker = None  # CircuitBreaker, attached by the supervisor
         self.name = "Text Agent"
         self.capabilities = ["count_words", "summarize_text", "extract_keywords", "classify_text"]
     
+    @property
+    def session(self) -> requests.Session:
+        """Pooled keep-alive session for blocking calls."""
+        if self._session is None:
+            self._session = create_session(self.pool_size, self.unix_socket)
+        return self._session
+    
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        """Non-blocking pooled HTTP client, created on first use inside the running event loop."""
+        if self._async_client is None:
+            self._async_client = create_async_client(self.timeout, self.pool_size, self.keepalive_expiry,
+                                                     self.unix_socket)
+        return self._async_client
+    
+    @metered
     def call_mcp(self, operation: str, *args, **kwargs) -> Dict[str, Any]:
         """Call MCP Text Server."""
+        if self.breaker is not None and not self.breaker.allow():
+            return {'error': f"Text MCP server unavailable (circuit {self.breaker.state})"}
+        
         try:
             payload = {
                 'operation': operation,
@@ -20,14 +66,110 @@ class TextAgent:
                 'kwargs': kwargs
             }
             
-            response = requests.post(f"{self.mcp_url}/operate", json=payload, timeout=5)
+            if self.inproc is not None:
+                return self.inproc.operate(payload['operation'], payload['args'], payload['kwargs'])
+            body, headers = self.codec.encode(payload)
+            response = self.session.post(f"{self.mcp_url}/operate", data=body, headers=headers,
+                                         timeout=self.timeout)
+            self._record_status(response.status_code)
+            self.codec.observe(response)
             if response.status_code == 200:
-                return response.json()
+                return self.codec.decode(response)
             else:
                 return {'error': f"MCP Error: {response.status_code}"}
         
         except Exception as e:
+            self._record(False)
             return {'error': str(e)}
+        finally:
+            self._release()
+    
+    @metered
+    async def acall_mcp(self, operation: str, *args, **kwargs) -> Dict[str, Any]:
+        """Call MCP Text Server without blocking the event loop."""
+        if self.breaker is not None and not self.breaker.allow():
+            return {'error': f"Text MCP server unavailable (circuit {self.breaker.state})"}
+        
+        try:
+            payload = {
+                'operation': operation,
+                'args': list(args),
+                'kwargs': kwargs
+            }
+            
+            if self.inproc is not None:
+                return await self.inproc.aoperate(payload['operation'], payload['args'], payload['kwargs'])
+            body, headers = self.codec.encode(payload)
+            response = await self.async_client.post(f"{self.mcp_url}/operate", content=body, headers=headers,
+                                                   extensions=self.connections.extensions)
+            self._record_status(response.status_code)
+            self.codec.observe(response)
+            if response.status_code == 200:
+                return self.codec.decode(response)
+            else:
+                return {'error': f"MCP Error: {response.status_code}"}
+        
+        except Exception as e:
+            self._record(False)
+            return {'error': str(e) or type(e).__name__}
+        finally:
+            self._release()
+    
+    def _batch_payload(self, calls: List[Dict[str, Any]], parallel: bool) -> Dict[str, Any]:
+        """Build the /operate_batch request body from [{operation, args, kwargs}, ...]."""
+        items = [{'operation': call['operation'], 'args': list(call.get('args', [])), 'kwargs': call.get('kwargs', {})}
+                 for call in calls]
+        return {'items': items, 'parallel': parallel}
+    
+    @metered
+    def call_mcp_batch(self, calls: List[Dict[str, Any]], parallel: bool = False) -> List[Dict[str, Any]]:
+        """Run several operations in one round trip; results follow the order of `calls`."""
+        if self.breaker is not None and not self.breaker.allow():
+            return [{'error': f"Text MCP server unavailable (circuit {self.breaker.state})"} for _ in calls]
+        
+        try:
+            if self.inproc is not None:
+                return self.inproc.operate_batch(self._batch_payload(calls, parallel)['items'], parallel)
+            body, headers = self.codec.encode(self._batch_payload(calls, parallel))
+            response = self.session.post(f"{self.mcp_url}/operate_batch", data=body, headers=headers,
+                                         timeout=self.timeout)
+            self._record_status(response.status_code)
+            self.codec.observe(response)
+            if response.status_code == 200:
+                return self.codec.decode(response)['results']
+            error = f"MCP Error: {response.status_code}"
+        
+        except Exception as e:
+            self._record(False)
+            error = str(e)
+        finally:
+            self._release()
+        return [{'error': error} for _ in calls]
+    
+    @metered
+    async def acall_mcp_batch(self, calls: List[Dict[str, Any]], parallel: bool = False) -> List[Dict[str, Any]]:
+        """Run several operations in one round trip without blocking the event loop."""
+        if self.breaker is not None and not self.breaker.allow():
+            return [{'error': f"Text MCP server unavailable (circuit {self.breaker.state})"} for _ in calls]
+        
+        try:
+            if self.inproc is not None:
+                return await self.inproc.aoperate_batch(self._batch_payload(calls, parallel)['items'], parallel)
+            body, headers = self.codec.encode(self._batch_payload(calls, parallel))
+            response = await self.async_client.post(f"{self.mcp_url}/operate_batch", content=body, headers=headers,
+                                                    extensions=self.connections.extensions)
+            self._record_status(response.status_code)
+            self.codec.observe(response)
+            if response.status_code == 200:
+                return self.codec.decode(response)['results']
+            error = f"MCP Error: {response.status_code}"
+        
+        except Exception as e:
+            self._record(False)
+            error = str(e) or type(e).__name__
+        finally:
+            self._release()
+        return [{'error': error} for _ in calls]
     
     def _compute_local(self, operation: str, *args, **kwargs) -> Dict[str, Any]:
         """Compute text operation locally."""
@@ -68,11 +210,7 @@ class TextAgent:
     
     def process(self, operation: str, *args, **kwargs) -> Dict[str, Any]:
         """Process text operation."""
-        print(f"\n[TEXT AGENT] 📝 TOOL CALL: {operation}")
-        if args:
-            print(f"[TEXT AGENT]    Input: {str(args[0])[:50]}{'...' if len(str(args[0])) > 50 else ''}")
-        if kwargs:
-            print(f"[TEXT AGENT]    Options: {kwargs}")
+        self._report_call(operation, args, kwargs)
         
         # Try local computation first
         local_result = self._compute_local(operation, *args, **kwargs)
@@ -83,12 +221,79 @@ class TextAgent:
             result = self.call_mcp(operation, *args, **kwargs)
         
         if 'result' in result:
-            print(f"[TEXT AGENT] ✅ RESULT: {result['result']}")
+            log.debug("[TEXT AGENT] ✅ RESULT: %s", short(result['result']))
         return result
     
+    async def aprocess(self, operation: str, *args, **kwargs) -> Dict[str, Any]:
+        """Process text operation (async)."""
+        self._report_call(operation, args, kwargs)
+        
+        # Try local computation first
+        local_result = self._compute_local(operation, *args, **kwargs)
+        if local_result and 'result' in local_result:
+            result = local_result
+        else:
+            # Fallback to MCP
+            result = await self.acall_mcp(operation, *args, **kwargs)
+        
+        if 'result' in result:
+            log.debug("[TEXT AGENT] ✅ RESULT: %s", short(result['result']))
+        return result
+    
+    def _report_call(self, operation: str, args: tuple, kwargs: Dict[str, Any]):
+        log.debug("\n[TEXT AGENT] 📝 TOOL CALL: %s", operation, extra=fields(agent='text', operation=operation))
+        if args:
+            log.debug("[TEXT AGENT]    Input: %s", short(args[0], 50))
+        if kwargs:
+            log.debug("[TEXT AGENT]    Options: %s", short(kwargs))
+    
     def is_healthy(self) -> bool:
         """Check if Text Agent is healthy."""
         return True  # Text Agent always healthy (has local fallback)
+    
+    async def ais_healthy(self) -> bool:
+        """Async health check."""
+        return self.is_healthy()
+    
+    def _record(self, success: bool):
+        """Report a call outcome to the circuit breaker, if one is attached."""
+        if self.breaker is not None:
+            self.breaker.record(success)
+    
+    def _record_status(self, status_code: int):
+        """Report an MCP response to the breaker; a 503 is the server shedding load, neither outcome."""
+        if status_code != 503:
+            self._record(status_code < 500)
+    
+    def _release(self):
+        """End a call the breaker let through; frees its half-open trial if no outcome was recorded."""
+        if self.breaker is not None:
+            self.breaker.release()
+    
+    async def aprobe(self) -> bool:
+        """GET /health on the MCP server (used by the background health monitor)."""
+        if self.inproc is not None:
+            return True
+        response = await self.async_client.get(f"{self.mcp_url}/health",
+                                                  extensions=self.connections.extensions)
+        return response.status_code == 200
+    
+    def connection_stats(self) -> Dict[str, Any]:
+        """Keep-alive reuse, the negotiated wire format and compressed bytes for this server."""
+        if self.inproc is not None:
+            return {'transport': 'inproc', **self.inproc.stats()}
+        return {**self.connections.stats(self._session), 'transport': self.transport,
+                'format': self.codec.codec.name,
+                'compression': self.codec.compressor.stats()}
+    
+    async def aclose(self):
+        """Close the pooled HTTP clients."""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+        if self._session is not None:
+            self._session.close()
+            self._session = None
 
 if __name__ == '__main__':
     agent = TextAgent()
@@ -0,0 +1,149 @@
+"""MCP transport - Pooled keep-alive HTTP clients shared by the sub-agents, with reuse statistics.
+
+MCP servers are reached over TCP (`http://host:port`) or, on the same host,
+over a Unix domain socket (`unix:///path/to/server.sock`), which skips the
+loopback TCP stack. `inproc://<service>` skips HTTP altogether and calls the
+service's operation registry in this process.
+"""
+import socket
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.exceptions import NewConnectionError
+from urllib3.util.request import ACCEPT_ENCODING
+from src.compression import RequestCompressor
+
+UNIX_SCHEME = "unix://"
+INPROC_SCHEME = "inproc://"
+# Host used in request URLs and the Host header when the connection is a Unix socket
+UNIX_HOST = "http://localhost"
+
+def split_mcp_url(url: str) -> Tuple[str, Optional[str]]:
+    """(HTTP base URL for request paths, Unix socket path or None).
+
+    `unix:///tmp/mcp-math.sock` -> ("http://localhost", "/tmp/mcp-math.sock").
+    """
+    if url.startswith(UNIX_SCHEME):
+        return UNIX_HOST, url[len(UNIX_SCHEME):]
+    return url.rstrip('/'), None
+
+def create_inproc_server(url: str):
+    """InProcessServer for an `inproc://<service>` URL, None for network URLs."""
+    if not url.startswith(INPROC_SCHEME):
+        return None
+    from mcp_servers.inproc import InProcessServer  # server code is only loaded when asked for
+    return InProcessServer(url[len(INPROC_SCHEME):].strip('/'))
+
+class UnixHTTPConnection(HTTPConnection):
+    """urllib3 connection that dials `socket_path` instead of host:port."""
+
+    socket_path = ""
+
+    def _new_conn(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+        except OSError as e:
+            sock.close()
+            raise NewConnectionError(self, f"Failed to connect to {self.socket_path}: {e}") from e
+        return sock
+
+class UnixAdapter(HTTPAdapter):
+    """requests adapter whose connection pools all talk to one Unix socket."""
+
+    def __init__(self, socket_path: str, pool_maxsize: int = 10):
+        connection_class = type('UnixHTTPConnection', (UnixHTTPConnection,), {'socket_path': socket_path})
+        self.pool_class = type('UnixHTTPConnectionPool', (urllib3.HTTPConnectionPool,),
+                               {'ConnectionCls': connection_class})
+        super().__init__(pool_connections=1, pool_maxsize=pool_maxsize)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http': self.pool_class}
+
+def create_session(pool_size: int = 10, unix_socket: Optional[str] = None) -> requests.Session:
+    """Blocking session that keeps up to `pool_size` connections open per MCP server."""
+    session = requests.Session()
+    if unix_socket:
+        session.mount('http://', UnixAdapter(unix_socket, pool_maxsize=pool_size))
+        return session
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+def create_async_client(timeout: float, pool_size: int = 10, keepalive_expiry: float = 4,
+                        unix_socket: Optional[str] = None) -> httpx.AsyncClient:
+    """Async client with a bounded keep-alive pool.
+
+    keepalive_expiry should stay below the servers' keepalive_timeout so the
+    client drops idle connections before the server closes them.
+    """
+    limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size,
+                          keepalive_expiry=keepalive_expiry)
+    if unix_socket:
+        return httpx.AsyncClient(timeout=timeout, transport=httpx.AsyncHTTPTransport(uds=unix_socket, limits=limits))
+    return httpx.AsyncClient(timeout=timeout, limits=limits)
+
+def decodable_encodings() -> List[str]:
+    """Content-Encodings both requests (urllib3) and httpx decode transparently."""
+    sync = {name.strip() for name in ACCEPT_ENCODING.split(',')}
+    decoders = getattr(httpx._decoders, 'SUPPORTED_DECODERS', {'gzip': None, 'deflate': None})
+    return [name for name in sync if name in decoders]
+
+def create_compressor(options: Optional[Dict[str, Any]] = None) -> RequestCompressor:
+    """Request/response compression for one MCP server, from the `compression` config section."""
+    options = options or {}
+    return RequestCompressor(decodable_encodings(), min_size=options.get('min_size', 1024),
+                             encodings=options.get('encodings'), enabled=options.get('enabled', True))
+
+class ConnectionStats:
+    """Counts requests vs. newly opened connections to show keep-alive reuse."""
+
+    def __init__(self):
+        self.async_requests = 0
+        self.async_connections = 0
+
+    async def _trace(self, event: str, info: Dict[str, Any]):
+        # httpcore trace events, e.g. "connection.connect_tcp.complete"
+        if event.startswith('connection.connect_') and event.endswith('.complete'):
+            self.async_connections += 1
+        elif event.endswith('.send_request_headers.started'):
+            self.async_requests += 1
+
+    @property
+    def extensions(self) -> Dict[str, Any]:
+        """Per-request extensions for the async client that feed the counters."""
+        return {'trace': self._trace}
+
+    @staticmethod
+    def _session_counts(session: Optional[requests.Session]):
+        requests_made = connections = 0
+        if session is None:
+            return requests_made, connections
+        for adapter in set(session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools[key]
+                if pool is not None:
+                    requests_made += pool.num_requests
+                    connections += pool.num_connections
+        return requests_made, connections
+
+    def stats(self, session: Optional[requests.Session] = None) -> Dict[str, Any]:
+        sync_requests, sync_connections = self._session_counts(session)
+        total_requests = sync_requests + self.async_requests
+        total_connections = sync_connections + self.async_connections
+        return {
+            'requests': total_requests,
+            'connections_opened': total_connections,
+            'reused': max(0, total_requests - total_connections),
+            'reuse_ratio': round(1 - total_connections / total_requests, 3) if total_requests else 0.0,
+            'sync': {'requests': sync_requests, 'connections_opened': sync_connections},
+            'async': {'requests': self.async_requests, 'connections_opened': self.async_connections}
+        }
@@ -0,0 +1,918 @@
+"""Async Supervisor Agent - Event-loop native orchestration of the sub-agents."""
+import asyncio
+import logging
+import os
+import time
+import yaml
+import json
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+from sub_agents.math_agent import MathAgent
+from sub_agents.data_agent import DataAgent
+from sub_agents.text_agent import TextAgent
+from supervisor.router import FastPathRouter
+from supervisor.plan_cache import PlanCache
+from supervisor.renderer import ResponseRenderer
+from supervisor.llm import LLMClient, create_llm_client
+from supervisor.dag import DAGExecutor, TaskGraph, TaskNode, text_argument
+from supervisor.health import CircuitBreaker, HealthMonitor
+from src.log import get_logger, short
+from src.metrics import MetricsRegistry, OperationMetrics
+
+log = get_logger('supervisor')
+
+RULE = "=" * 70
+
+class AnswerStream:
+    """Async iterator over final-answer tokens; `result` holds the result dict once exhausted."""
+    
+    def __init__(self, produce: Callable[["AnswerStream"], AsyncIterator[str]]):
+        self.result: Optional[Dict[str, Any]] = None
+        self._tokens = produce(self)
+    
+    def __aiter__(self) -> "AnswerStream":
+        return self
+    
+    async def __anext__(self) -> str:
+        return await self._tokens.__anext__()
+    
+    async def aclose(self):
+        """Stop early: close the pipeline (and its LLM stream) without reading the rest."""
+        await self._tokens.aclose()
+
+class AsyncSupervisorAgent:
+    """Supervisor Agent running on asyncio - many queries can share one event loop."""
+    
+    def __init__(self, config_path: str = "config/supervisor_config.yaml",
+                 llm_client: Optional[LLMClient] = None):
+        self.config = self._load_config(config_path)
+        self.llm = llm_client or create_llm_client(self.config)
+        
+        # Where a query's time goes: LLM calls per stage, tool calls per agent, pipeline stages
+        self.metrics = MetricsRegistry()
+        self.llm_metrics = OperationMetrics(self.metrics, "supervisor_llm", ('stage',), ('stage',),
+                                            what="LLM calls")
+        self.stage_latency = self.metrics.histogram(
+            "supervisor_stage_duration_seconds", "Duration of query pipeline stages", ('stage',))
+        self.query_latency = self.metrics.histogram(
+            "supervisor_query_duration_seconds", "End-to-end duration of queries")
+        
+        # Per-query deadlines (seconds) from the timeouts section
+        timeouts = self.config.get('timeouts', {}) or {}
+        self.query_timeout = self.config.get('supervisor', {}).get('timeout', 30)
+        self.agent_timeout = timeouts.get('agent_response', 30)
+        self.mcp_timeout = timeouts.get('mcp_call', 10)
+        self.aggregation_timeout = timeouts.get('aggregation', 5)
+        # The final LLM answer (up to 800 tokens) gets its own, longer deadline
+        self.response_timeout = timeouts.get('response', self.agent_timeout)
+        
+        # Initialize sub-agents
+        agents = self.config.get('agents', {}) or {}
+        pool = self.config.get('connection_pool', {}) or {}
+        client_options = {
+            'timeout': self.mcp_timeout,
+            'pool_size': pool.get('size', 10),
+            'keepalive_expiry': pool.get('keepalive_expiry', 4),
+            'formats': (self.config.get('serialization', {}) or {}).get('formats'),
+            'compression': self.config.get('compression', {}) or {},
+            'metrics': self.metrics
+        }
+        self.math_agent = MathAgent(
+            agents.get('math_agent', {}).get('url', "http://localhost:8000"), **client_options)
+        data_config = self._load_config(os.path.join(os.path.dirname(config_path), 'data.yaml'))
+        self.data_agent = DataAgent(
+            agents.get('data_agent', {}).get('url', "http://localhost:8001"),
+            indexes=data_config.get('indexes'), **client_options)
+        self.text_agent = TextAgent(
+            agents.get('text_agent', {}).get('url', "http://localhost:8002"), **client_options)
+        
+        # Background MCP health probes; per-agent circuit breakers fail calls fast while a server is down
+        health = self.config.get('health', {}) or {}
+        agents_by_name = {'math': self.math_agent, 'data': self.data_agent, 'text': self.text_agent}
+        self.breakers = {}
+        for name, agent in agents_by_name.items():
+            self.breakers[name] = agent.breaker = CircuitBreaker(
+                f"{name}_agent",
+                failure_threshold=health.get('failure_threshold', 3),
+                reset_timeout=health.get('reset_timeout', 10))
+        self.health_monitor = HealthMonitor(
+            agents_by_name, self.breakers,
+            interval=health.get('interval', 5),
+            probe_timeout=health.get('probe_timeout', 1))
+        
+        self.name = "Supervisor Agent"
+        self.verbose = self.config.get('logging', {}).get('verbose', True)
+        
+        planning = self.config.get('supervisor', {}).get('planning', {}) or {}
+        self.planning_mode = planning.get('mode', 'unified')
+        self.legacy_concurrent = planning.get('legacy_concurrent', True)
+        
+        # Compound queries are planned as a DAG of tool calls
+        dag_config = self.config.get('dag', {}) or {}
+        self.dag_enabled = dag_config.get('enabled', True)
+        self.dag_max_nodes = dag_config.get('max_nodes', 8)
+        self.dag_executor = DAGExecutor(self._call_node)
+        
+        # Bulk processing via process_queries
+        batch = self.config.get('batch', {}) or {}
+        self.batch_concurrency = batch.get('max_concurrency', 8)
+        self.batch_prompt_size = max(1, batch.get('max_prompt_queries', 20))
+        
+        # Deterministic fast path for obvious queries (no LLM planning call)
+        routing = self.config.get('routing', {}) or {}
+        self.router = None
+        if routing.get('fast_path', True):
+            self.router = FastPathRouter(
+                self.config.get('agents', {}),
+                {
+                    'math': self.math_agent.capabilities,
+                    'data': self.data_agent.capabilities,
+                    'text': self.text_agent.capabilities,
+                },
+                confidence_threshold=routing.get('confidence_threshold', 0.75),
+                planning_calls=2 if self.planning_mode == 'legacy' else 1
+            )
+        
+        # Reuse LLM plans for queries that only differ in their numbers
+        cache_config = self.config.get('plan_cache', {}) or {}
+        self.plan_cache = None
+        if cache_config.get('enabled', True):
+            self.plan_cache = PlanCache(
+                max_size=cache_config.get('max_size', 512),
+                ttl_seconds=cache_config.get('ttl_seconds', 3600),
+                persist_path=cache_config.get('persist_path')
+            )
+        
+        # Local answer templates for deterministic single-agent results
+        response_config = self.config.get('response', {}) or {}
+        self.renderer = ResponseRenderer() if response_config.get('templates', True) else None
+    
+    def _load_config(self, config_path: str) -> Dict:
+        """Load configuration from YAML file."""
+        try:
+            with open(config_path, 'r') as f:
+                return yaml.safe_load(f) or {}
+        except FileNotFoundError:
+            log.warning("Warning: Config file not found at %s", config_path)
+            return {}
+    
+    def _log(self, message: str, level: str = "INFO"):
+        """Log message; DEBUG messages only when verbose."""
+        if self.verbose or level != "DEBUG":
+            prefix = f"[{level}]" if level != "INFO" else ""
+            log.log(logging.getLevelName(level), "%s %s", prefix, message)
+    
+    @contextmanager
+    def _timed(self, stage: str, timings: Dict[str, float]):
+        """Record wall-clock duration of a pipeline stage in milliseconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            timings[stage] = round(elapsed * 1000, 2)
+            self.stage_latency.observe(elapsed, stage=stage)
+    
+    async def _llm_complete(self, stage: str, messages: List[Dict[str, str]], **options) -> str:
+        """LLM completion, recorded in the supervisor metrics under `stage`."""
+        with self.llm_metrics.track(stage=stage):
+            return await self.llm.acomplete(messages, **options)
+    
+    async def _llm_stream(self, stage: str, messages: List[Dict[str, str]], **options) -> AsyncIterator[str]:
+        """Streamed LLM completion, recorded like _llm_complete() (until the last token).
+        
+        Callers that may stop early must aclose() it, so the call stops counting as in flight.
+        """
+        with self.llm_metrics.track(stage=stage):
+            tokens = self.llm.astream(messages, **options)
+            try:
+                async for token in tokens:
+                    yield token
+            finally:
+                await tokens.aclose()
+    
+    async def _plan_query(self, query: str) -> Dict[str, Any]:
+        """Plan query in a single LLM call: intent, operation, parameters and agent."""
+        self._log(f"[🧭 PLANNING] From: {query}")
+        
+        planning_prompt = f"""You are an expert at understanding data queries. Plan how to answer the query in ONE step.
+
+User Query: {query}
+
+Determine:
+1. INTENT: which agent type handles it - "math", "data", "text", or "multiple"
+2. OPERATION: the single best operation name
+3. PARAMETERS: numeric parameters only, in the order they appear
+4. AGENT: the agent that runs the operation - "math", "data" or "text"
+
+DATA OPERATIONS:
+- count_records, filter_records, group_records, sort_records, aggregate_records
+
+MATH OPERATIONS:
+- add, subtract, multiply, divide, power, square_root, convert_seconds, average, median, max_value, min_value, sum_numbers
+
+TEXT OPERATIONS:
+- count_words, summarize_text, extract_keywords, classify_text
+
+Respond ONLY with a JSON object (no extra text):
+{{
+  "intent": "math_or_data_or_text_or_multiple",
+  "agents_needed": ["math_or_data_or_text"],
+  "operation": "single_operation_name",
+  "parameters": [numbers_only, not_text],
+  "agent": "math_or_data_or_text",
+  "description": "brief explanation"
+}}
+
+Examples:
+- "How many records?" → {{"intent": "data", "agents_needed": ["data"], "operation": "count_records", "parameters": [], "agent": "data"}}
+- "Add 50 and 75" → {{"intent": "math", "agents_needed": ["math"], "operation": "add", "parameters": [50, 75], "agent": "math"}}
+- "Count words in this text" → {{"intent": "text", "agents_needed": ["text"], "operation": "count_words", "parameters": [], "agent": "text"}}"""
+        
+        try:
+            response_text = await self._llm_complete(
+                'plan',
+                [{"role": "user", "content": planning_prompt}],
+                temperature=0.3,
+                max_tokens=300,
+                json_mode=True
+            )
+            plan = self._normalize_plan(json.loads(response_text))
+            
+            self._log(f"[✅ PLANNED] Operation: {plan.get('operation')} | Agent: {plan['agent']}")
+            return plan
+        
+        except Exception as e:
+            self._log(f"Planning failed: {e}", "ERROR")
+            return {'operation': 'unknown', 'parameters': [], 'agent': 'math',
+                    'agents_needed': ['math'], 'description': str(e)}
+    
+    @staticmethod
+    def _normalize_plan(plan: Dict[str, Any]) -> Dict[str, Any]:
+        """Fill defaults and drop unknown agent names from an LLM plan."""
+        agent = plan.get('agent') or 'math'
+        agents_needed = plan.get('agents_needed') or [agent]
+        plan['agent'] = agent
+        plan['agents_needed'] = [a for a in agents_needed if a in ('math', 'data', 'text')] or [agent]
+        plan.setdefault('operation', 'unknown')
+        if not isinstance(plan.get('parameters'), list):
+            plan['parameters'] = []
+        return plan
+    
+    async def _plan_batch(self, queries: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Plan several queries in one LLM call; None marks items the batch could not plan."""
+        self._log(f"[🧭 BATCH PLANNING] {len(queries)} queries in one call")
+        
+        numbered = "\n".join(f"{i}. {q}" for i, q in enumerate(queries))
+        batch_prompt = f"""You are an expert at understanding data queries. Plan EACH numbered query below independently.
+
+Queries:
+{numbered}
+
+For every query determine the operation, numeric parameters (in order of appearance) and agent.
+
+DATA OPERATIONS:
+- count_records, filter_records, group_records, sort_records, aggregate_records
+
+MATH OPERATIONS:
+- add, subtract, multiply, divide, power, square_root, convert_seconds, average, median, max_value, min_value, sum_numbers
+
+TEXT OPERATIONS:
+- count_words, summarize_text, extract_keywords, classify_text
+
+Respond ONLY with a JSON object holding one plan per query, keyed by its index:
+{{
+  "plans": [
+    {{"index": 0, "intent": "math_or_data_or_text_or_multiple", "agents_needed": ["math_or_data_or_text"], "operation": "single_operation_name", "parameters": [numbers_only], "agent": "math_or_data_or_text"}}
+  ]
+}}"""
+        
+        plans: List[Optional[Dict[str, Any]]] = [None] * len(queries)
+        try:
+            response_text = await self._llm_complete(
+                'plan_batch',
+                [{"role": "user", "content": batch_prompt}],
+                temperature=0.3,
+                max_tokens=min(150 * len(queries) + 100, 4096),
+                json_mode=True
+            )
+            for item in json.loads(response_text).get('plans', []):
+                try:
+                    index = int(item.get('index'))
+                except (TypeError, ValueError):
+                    continue
+                if 0 <= index < len(queries) and item.get('operation'):
+                    plans[index] = self._normalize_plan(item)
+        
+        except Exception as e:
+            self._log(f"Batch planning failed: {e}", "ERROR")
+        
+        return plans
+    
+    async def _plan_legacy(self, query: str) -> Dict[str, Any]:
+        """Plan query with the legacy analyze + extract calls, optionally run concurrently."""
+        if self.legacy_concurrent:
+            (_, agents_needed), plan = await asyncio.gather(
+                self._analyze_query(query), self._extract_operation(query))
+        else:
+            _, agents_needed = await self._analyze_query(query)
+            plan = await self._extract_operation(query)
+        
+        plan['agents_needed'] = agents_needed
+        plan['intent'] = 'multiple' if len(agents_needed) > 1 else agents_needed[0]
+        return plan
+    
+    async def _extract_operation(self, query: str) -> Dict[str, Any]:
+        """Extract operation and parameters from query."""
+        self._log(f"[🔍 EXTRACTING OPERATION] From: {query}")
+        
+        extraction_prompt = f"""You are an expert at understanding data queries. Extract the OPERATION, AGENT TYPE, and NUMERIC PARAMETERS.
+
+User Query: {query}
+
+STEP 1: Identify the intent:
+- Is this about COUNTING records, filtering, grouping, sorting, or aggregating DATA?
+- Is this about MATH operations (add, divide, convert time)?
+- Is this about TEXT operations (counting words, summarizing)?
+
+STEP 2: Choose the correct OPERATION:
+
+DATA OPERATIONS:
+- count_records: How many records, total count, number of items
+- filter_records: Filter, select, find specific records
+- group_records: Group by, categorize
+- sort_records: Sort, order
+- aggregate_records: Sum, average, stats on data fields
+
+MATH OPERATIONS:
+- add, subtract, multiply, divide, power, square_root, convert_seconds, average, median, max_value, min_value, sum_numbers
+
+TEXT OPERATIONS:
+- count_words, summarize_text, extract_keywords, classify_text
+
+STEP 3: Respond ONLY with valid JSON (no extra text):
+{{
+  "operation": "single_operation_name",
+  "parameters": [numbers_only, not_text],
+  "agent": "math_or_data_or_text",
+  "description": "brief explanation"
+}}
+
+Examples:
+- "How many records?" → {{"operation": "count_records", "parameters": [], "agent": "data"}}
+- "Add 50 and 75" → {{"operation": "add", "parameters": [50, 75], "agent": "math"}}
+- "Convert 3600 seconds" → {{"operation": "convert_seconds", "parameters": [3600], "agent": "math"}}
+- "Count words in this text" → {{"operation": "count_words", "parameters": [], "agent": "text"}}"""
+        
+        try:
+            response_text = await self._llm_complete(
+                'extract',
+                [{"role": "user", "content": extraction_prompt}],
+                temperature=0.3,
+                max_tokens=300
+            )
+            extraction = json.loads(response_text)
+            
+            self._log(f"[✅ EXTRACTED] Operation: {extraction.get('operation')} | Agent: {extraction.get('agent')}")
+            return extraction
+        
+        except Exception as e:
+            self._log(f"Extraction failed: {e}", "ERROR")
+            return {'operation': 'unknown', 'parameters': [], 'agent': 'math', 'description': str(e)}
+    
+    async def _analyze_query(self, query: str) -> Tuple[str, List[str]]:
+        """Use LLM to analyze query and determine required agents."""
+        self._log(f"[🧠 LLM ANALYSIS] Analyzing query: {query}")
+        
+        analysis_prompt = f"""Analyze this query and determine which agents (math, data, text) are needed.
+        
+Query: {query}
+
+Respond with JSON:
+{{"agent": "math|data|text|multiple", "reason": "brief explanation"}}
+
+Only respond with valid JSON, nothing else."""
+        
+        try:
+            response_text = await self._llm_complete(
+                'analyze',
+                [{"role": "user", "content": analysis_prompt}],
+                temperature=0.3,
+                max_tokens=200
+            )
+            analysis = json.loads(response_text)
+            agent_type = analysis.get('agent', 'math')
+            
+            # Map agent types to list
+            if agent_type == 'math':
+                agents_needed = ['math']
+            elif agent_type == 'data':
+                agents_needed = ['data']
+            elif agent_type == 'text':
+                agents_needed = ['text']
+            elif agent_type == 'multiple':
+                agents_needed = ['math', 'data', 'text']
+            else:
+                agents_needed = ['math']
+            
+            self._log(f"[📊 QUERY INTENT] Agents needed: {', '.join(agents_needed)}")
+            return query, agents_needed
+        
+        except Exception as e:
+            self._log(f"LLM analysis failed: {e}", "ERROR")
+            return query, ['math']
+    
+    @staticmethod
+    def _is_compound(plan: Dict[str, Any]) -> bool:
+        """True when the plan says several agents (or steps) are needed."""
+        return plan.get('intent') == 'multiple' or len(set(plan.get('agents_needed') or [])) > 1
+    
+    async def _plan_dag(self, query: str) -> Optional[TaskGraph]:
+        """Ask the LLM to break a compound query into a dependency graph of tool calls."""
+        self._log(f"[🕸️ DAG PLANNING] From: {query}")
+        
+        dag_prompt = f"""Break this query into the smallest set of tool calls needed to answer it.
+
+User Query: {query}
+
+AGENTS AND OPERATIONS:
+- data: count_records, filter_records(field, value, operator: ==|>|<|>=|<=|in), group_records(field), sort_records(field, order),
+        aggregate_records(type: count|sum|avg, field). Every data operation accepts kwarg "records"
+        to work on the output of an earlier node instead of the whole dataset.
+- math: add, subtract, multiply, divide, power, square_root, convert_seconds, average, median,
+        max_value, min_value, sum_numbers (args are numbers or a list of numbers)
+- text: count_words, summarize_text, extract_keywords, classify_text (args[0] is the text)
+
+Refer to an earlier node's output with "$<id>" (whole result) or "$<id>.<field>" (that field from
+each returned record). A node must list every node it refers to in "depends_on". Nodes that do not
+depend on each other will run in parallel.
+
+Respond ONLY with a JSON object:
+{{
+  "nodes": [
+    {{"id": "n1", "agent": "data", "operation": "filter_records", "args": [], "kwargs": {{"field": "department", "value": "Engineering"}}, "depends_on": []}},
+    {{"id": "n2", "agent": "data", "operation": "count_records", "args": [], "kwargs": {{"records": "$n1"}}, "depends_on": ["n1"]}},
+    {{"id": "n3", "agent": "math", "operation": "average", "args": ["$n1.salary"], "kwargs": {{}}, "depends_on": ["n1"]}},
+    {{"id": "n4", "agent": "text", "operation": "summarize_text", "args": ["$n1"], "kwargs": {{}}, "depends_on": ["n1"]}}
+  ]
+}}"""
+        
+        try:
+            response_text = await self._llm_complete(
+                'dag_plan',
+                [{"role": "user", "content": dag_prompt}],
+                temperature=0.3,
+                max_tokens=600,
+                json_mode=True
+            )
+            graph = TaskGraph.from_plan(json.loads(response_text), max_nodes=self.dag_max_nodes)
+            
+            for node_id in graph.order:
+                node = graph.nodes[node_id]
+                deps = f" ← {', '.join(node.depends_on)}" if node.depends_on else ""
+                self._log(f"[🕸️ NODE {node_id}] {node.agent}.{node.operation}{deps}")
+            return graph
+        
+        except Exception as e:
+            self._log(f"DAG planning failed: {e}", "ERROR")
+            return None
+    
+    async def _call_node(self, node: TaskNode, args: List[Any], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one DAG node on its agent."""
+        if node.agent == 'math':
+            return await self.math_agent.aprocess(node.operation, *args, **kwargs)
+        if node.agent == 'data':
+            return await self.data_agent.aprocess(node.operation, *args, **kwargs)
+        text = text_argument(args[0]) if args else ""
+        return await self.text_agent.aprocess(node.operation, text, *args[1:], **kwargs)
+    
+    async def _run_dag(self, graph: TaskGraph, timings: Dict[str, float]) -> Dict[str, Any]:
+        """Execute the graph within the agent_response deadline and record its timings."""
+        try:
+            execution = await asyncio.wait_for(self.dag_executor.run(graph), timeout=self.agent_timeout)
+        except asyncio.TimeoutError:
+            self._log(f"Task graph exceeded {self.agent_timeout}s", "ERROR")
+            return {'dag': {'error': f"Task graph timed out after {self.agent_timeout}s"}}
+        
+        timings['dag_critical_path'] = execution['critical_path_ms']
+        timings['dag_sum_of_calls'] = execution['sum_of_calls_ms']
+        self._log(f"[🕸️ DAG DONE] wall: {execution['wall_ms']:.1f}ms | "
+                  f"critical path: {execution['critical_path_ms']:.1f}ms | "
+                  f"sum of calls: {execution['sum_of_calls_ms']:.1f}ms")
+        return execution['nodes']
+    
+    def _response_prompt(self, query: str, agent_results: Dict[str, Any], operation: str = "") -> str:
+        """Build the final-answer prompt from the agent results."""
+        results_summary = json.dumps(agent_results, indent=2)
+        
+        # For step-by-step operations, request detailed breakdown
+        if operation in ['convert_seconds', 'power', 'divide']:
+            return f"""Based on the query and agent results, provide a STEP-BY-STEP answer.
+
+Query: {query}
+Operation: {operation}
+
+Agent Results:
+{results_summary}
+
+IMPORTANT: Show EACH STEP clearly with calculations and results. Do not skip any steps.
+Format each step on a new line with clear explanations."""
+        
+        return f"""Based on the query and agent results, provide a clear answer.
+
+Query: {query}
+
+Agent Results:
+{results_summary}
+
+Provide a concise answer that directly answers the query."""
+    
+    async def _generate_response(self, query: str, agent_results: Dict[str, Any], operation: str = "") -> str:
+        """Use LLM to generate final response based on agent results."""
+        self._log("[✨ RESPONSE GENERATION] Generating final answer")
+        
+        response_prompt = self._response_prompt(query, agent_results, operation)
+        
+        try:
+            return await asyncio.wait_for(self._llm_complete(
+                'response',
+                [{"role": "user", "content": response_prompt}],
+                temperature=0.7,
+                max_tokens=800
+            ), timeout=self.response_timeout)
+        
+        except asyncio.TimeoutError:
+            self._log(f"Response generation exceeded {self.response_timeout}s", "ERROR")
+            return f"Unable to generate response: timed out after {self.response_timeout}s"
+        except Exception as e:
+            self._log(f"Response generation failed: {e}", "ERROR")
+            return f"Unable to generate response: {e}"
+    
+    async def _generate_response_stream(self, query: str, agent_results: Dict[str, Any],
+                                        operation: str = "") -> AsyncIterator[str]:
+        """Stream the final response from the LLM token by token, within the response timeout."""
+        self._log("[✨ RESPONSE GENERATION] Streaming final answer")
+        
+        response_prompt = self._response_prompt(query, agent_results, operation)
+        tokens = self._llm_stream(
+            'response',
+            [{"role": "user", "content": response_prompt}],
+            temperature=0.7,
+            max_tokens=800
+        )
+        deadline = asyncio.get_running_loop().time() + self.response_timeout
+        
+        try:
+            while True:
+                remaining = deadline - asyncio.get_running_loop().time()
+                try:
+                    token = await asyncio.wait_for(tokens.__anext__(), timeout=max(remaining, 0))
+                except StopAsyncIteration:
+                    break
+                yield token
+        
+        except asyncio.TimeoutError:
+            self._log(f"Response generation exceeded {self.response_timeout}s", "ERROR")
+            yield f"Unable to generate response: timed out after {self.response_timeout}s"
+        except Exception as e:
+            self._log(f"Response generation failed: {e}", "ERROR")
+            yield f"Unable to generate response: {e}"
+        finally:
+            await tokens.aclose()
+    
+    async def _plan(self, query: str, timings: Dict[str, float]) -> Dict[str, Any]:
+        """Resolve the query to a plan: fast path, then plan cache, then LLM planning."""
+        extraction = self._plan_locally(query, timings)
+        if extraction is None:
+            extraction = await self._plan_with_llm(query, timings)
+        return extraction
+    
+    async def _plan_with_llm(self, query: str, timings: Dict[str, float]) -> Dict[str, Any]:
+        """Plan the query: one structured LLM call, or the legacy analyze + extract pair."""
+        with self._timed('planning', timings):
+            if self.planning_mode == 'legacy':
+                extraction = await self._plan_legacy(query)
+            else:
+                extraction = await self._plan_query(query)
+        if self.plan_cache:
+            self.plan_cache.put(query, extraction)
+        return extraction
+    
+    def _plan_locally(self, query: str, timings: Dict[str, float]) -> Optional[Dict[str, Any]]:
+        """Plan from the fast-path router or the plan cache; None if the LLM is needed."""
+        # Try the rule-based fast path before paying for an LLM planning call
+        extraction = None
+        if self.router:
+            with self._timed('routing', timings):
+                extraction = self.router.route(query)
+            if extraction:
+                self._log(f"[⚡ FAST PATH] Operation: {extraction['operation']} | "
+                          f"Agent: {extraction['agent']} | Confidence: {extraction['confidence']}")
+        
+        if extraction is None and self.plan_cache:
+            with self._timed('plan_cache', timings):
+                extraction = self.plan_cache.get(query)
+            if extraction:
+                self._log(f"[♻️ PLAN CACHE] Operation: {extraction['operation']} | "
+                          f"Parameters: {extraction['parameters']}")
+        
+        return extraction
+    
+    async def _invoke_agent(self, query: str, operation: str, parameters: List[Any],
+                            primary_agent: str) -> Dict[str, Any]:
+        """Call the agent chosen by the plan, bounded by the agent_response deadline."""
+        try:
+            return await asyncio.wait_for(
+                self._call_agent(query, operation, parameters, primary_agent),
+                timeout=self.agent_timeout)
+        except asyncio.TimeoutError:
+            self._log(f"{primary_agent.title()} Agent exceeded {self.agent_timeout}s", "ERROR")
+            return {primary_agent: {'error': f"Agent timed out after {self.agent_timeout}s"}}
+    
+    async def _call_agent(self, query: str, operation: str, parameters: List[Any],
+                          primary_agent: str) -> Dict[str, Any]:
+        """Call the agent chosen by the plan with the extracted operation."""
+        agent_results = {}
+        
+        if primary_agent == 'math':
+            self._log(f"[🔧 INVOKING MATH AGENT with operation: {operation}]", "DEBUG")
+            # No per-query probe: while the circuit is open the MCP call fails fast
+            # and the agent answers from its local fallback
+            if self.breakers['math'].state != CircuitBreaker.CLOSED:
+                self._log(f"Math MCP server circuit is {self.breakers['math'].state}; using local fallback", "WARNING")
+            
+            # Call with actual extracted parameters
+            if isinstance(parameters, list) and len(parameters) > 0:
+                result = await self.math_agent.aprocess(operation, *parameters)
+            else:
+                result = await self.math_agent.aprocess(operation, query)
+            agent_results['math'] = result
+        
+        elif primary_agent == 'data':
+            self._log(f"[🔧 INVOKING DATA AGENT with operation: {operation}]", "DEBUG")
+            if self.data_agent.is_healthy():
+                # Data operations typically don't need parameters for count_records
+                result = await self.data_agent.aprocess(operation)
+                agent_results['data'] = result
+            else:
+                self._log("Data Agent not healthy", "WARNING")
+                agent_results['data'] = {'error': 'Data Agent unavailable'}
+        
+        elif primary_agent == 'text':
+            self._log(f"[🔧 INVOKING TEXT AGENT with operation: {operation}]", "DEBUG")
+            if self.text_agent.is_healthy():
+                # Text operations need the query content
+                result = await self.text_agent.aprocess(operation, query, *parameters if isinstance(parameters, list) else [])
+                agent_results['text'] = result
+            else:
+                self._log("Text Agent not healthy", "WARNING")
+                agent_results['text'] = {'error': 'Text Agent unavailable'}
+        
+        return agent_results
+    
+    async def _prepare(self, query: str, extraction: Optional[Dict[str, Any]] = None,
+                       timings: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """Plan the query (unless a plan is given) and run the agent; everything up to the final answer."""
+        log.info("\n%s\n📝 USER QUERY: %s\n%s", RULE, short(query), RULE)
+        
+        context = {'query': query, 'timings': timings or {}, 'start': time.perf_counter()}
+        timings = context['timings']
+        self.health_monitor.start()
+        
+        if extraction is None:
+            extraction = await self._plan(query, timings)
+        
+        # Compound query: plan and execute a DAG of tool calls across agents
+        if self.dag_enabled and self._is_compound(extraction):
+            with self._timed('dag_planning', timings):
+                graph = await self._plan_dag(query)
+            if graph is not None:
+                context['agents_needed'] = sorted({node.agent for node in graph.nodes.values()})
+                context['operation'] = 'multiple'
+                context['parameters'] = []
+                with self._timed('agent', timings):
+                    context['agent_results'] = await self._run_dag(graph, timings)
+                return context
+        
+        context['agents_needed'] = extraction.get('agents_needed', [extraction.get('agent', 'math')])
+        context['operation'] = operation = extraction.get('operation', 'unknown')
+        context['parameters'] = parameters = extraction.get('parameters', [])
+        
+        log.info("\n[🎯 OPERATION] Tool: %s\n[🎯 PARAMETERS] Values: %s", operation, short(parameters))
+        
+        # Use extracted agent as primary source
+        with self._timed('agent', timings):
+            context['agent_results'] = await self._invoke_agent(
+                query, operation, parameters, extraction.get('agent', 'math'))
+        
+        return context
+    
+    def _finish(self, context: Dict[str, Any], final_answer: str, echo: bool = True) -> Dict[str, Any]:
+        """Report timings and build the result dict."""
+        timings = context['timings']
+        elapsed = time.perf_counter() - context['start']
+        timings['total'] = round(elapsed * 1000, 2)
+        self.query_latency.observe(elapsed)
+        
+        if echo:
+            log.info("\n%s\n✅ FINAL ANSWER:\n%s\n%s\n", RULE, final_answer, RULE)
+        self._log("[⏱️ TIMINGS] " + " | ".join(f"{k}: {v:.1f}ms" for k, v in timings.items()))
+        
+        return {
+            'query': context['query'],
+            'agents_used': context['agents_needed'],
+            'agent_results': context['agent_results'],
+            'final_answer': final_answer,
+            'timings': timings
+        }
+    
+    def _render_local(self, context: Dict[str, Any]) -> Optional[str]:
+        """Render the answer from a template when the result is deterministic."""
+        if not self.renderer:
+            return None
+        return self.renderer.render(context['operation'], context['parameters'], context['agent_results'])
+    
+    def _timed_out(self, query: str, stage: str) -> Dict[str, Any]:
+        """Result dict for a query that missed its deadline."""
+        self._log(f"Query exceeded {self.query_timeout}s during {stage}", "ERROR")
+        return {
+            'query': query,
+            'agents_used': [],
+            'agent_results': {},
+            'final_answer': f"Query timed out after {self.query_timeout}s",
+            'error': 'timeout',
+            'timings': {}
+        }
+    
+    async def process_query(self, query: str) -> Dict[str, Any]:
+        """Process user query through multi-agent system, bounded by supervisor.timeout."""
+        try:
+            return await asyncio.wait_for(self._process_query(query), timeout=self.query_timeout)
+        except asyncio.TimeoutError:
+            return self._timed_out(query, 'processing')
+    
+    async def _process_query(self, query: str, extraction: Optional[Dict[str, Any]] = None,
+                             timings: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        context = await self._prepare(query, extraction, timings)
+        
+        # Generate final response
+        with self._timed('response', context['timings']):
+            final_answer = self._render_local(context)
+            if final_answer is None:
+                final_answer = await self._generate_response(
+                    query, context['agent_results'], context['operation'])
+        
+        return self._finish(context, final_answer)
+    
+    async def process_queries(self, queries: List[str],
+                              max_concurrency: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Process many queries; results come back in input order.
+        
+        Queries the fast path and plan cache cannot resolve are planned
+        together in batched LLM prompts; tool calls and answers then fan out
+        concurrently (at most max_concurrency at a time). A failing item gets
+        an 'error' entry without affecting the rest of the batch.
+        """
+        max_concurrency = max_concurrency or self.batch_concurrency
+        plans: List[Optional[Dict[str, Any]]] = [None] * len(queries)
+        timings: List[Dict[str, float]] = [{} for _ in queries]
+        
+        # Resolve what we can without the LLM
+        pending = []
+        for i, query in enumerate(queries):
+            try:
+                plans[i] = self._plan_locally(query, timings[i])
+            except Exception as e:
+                self._log(f"Local planning failed for item {i}: {e}", "ERROR")
+            if plans[i] is None:
+                pending.append(i)
+        
+        # One LLM call per chunk of unresolved queries, chunks planned concurrently
+        chunks = [pending[k:k + self.batch_prompt_size]
+                  for k in range(0, len(pending), self.batch_prompt_size)]
+        
+        async def plan_chunk(chunk: List[int]):
+            start = time.perf_counter()
+            chunk_plans = await self._plan_batch([queries[i] for i in chunk])
+            elapsed = round((time.perf_counter() - start) * 1000, 2)
+            for i, plan in zip(chunk, chunk_plans):
+                timings[i]['batch_planning'] = elapsed
+                if plan is not None:
+                    plans[i] = plan
+                    if self.plan_cache:
+                        self.plan_cache.put(queries[i], plan)
+        
+        await asyncio.gather(*(plan_chunk(chunk) for chunk in chunks))
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def run_item(i: int) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    # Items the batch prompt missed are planned individually
+                    if plans[i] is None:
+                        plans[i] = await self._plan_with_llm(queries[i], timings[i])
+                    return await asyncio.wait_for(
+                        self._process_query(queries[i], plans[i], timings[i]),
+                        timeout=self.query_timeout)
+                except asyncio.TimeoutError:
+                    return self._timed_out(queries[i], 'processing')
+                except Exception as e:
+                    self._log(f"Batch item {i} failed: {e}", "ERROR")
+                    return {
+                        'query': queries[i],
+                        'agents_used': [],
+                        'agent_results': {},
+                        'final_answer': f"Unable to process query: {e}",
+                        'error': str(e),
+                        'timings': timings[i]
+                    }
+        
+        return list(await asyncio.gather(*(run_item(i) for i in range(len(queries)))))
+    
+    def process_query_stream(self, query: str) -> AnswerStream:
+        """Process query and stream the final answer incrementally.
+        
+        Iterating the returned AnswerStream yields answer text as it arrives
+        from the LLM (templated answers are yielded in one piece). Once it is
+        exhausted, `stream.result` holds the same dict process_query returns,
+        with a 'first_token' timing added.
+        """
+        return AnswerStream(lambda stream: self._stream_query(query, stream))
+    
+    async def _stream_query(self, query: str, stream: AnswerStream) -> AsyncIterator[str]:
+        try:
+            context = await asyncio.wait_for(self._prepare(query), timeout=self.query_timeout)
+        except asyncio.TimeoutError:
+            stream.result = self._timed_out(query, 'planning')
+            yield stream.result['final_answer']
+            return
+        timings = context['timings']
+        
+        response_start = time.perf_counter()
+        local_answer = self._render_local(context)
+        parts = []
+        if local_answer is not None:
+            timings['first_token'] = round((time.perf_counter() - response_start) * 1000, 2)
+            parts.append(local_answer)
+            yield local_answer
+        else:
+            tokens = self._generate_response_stream(query, context['agent_results'], context['operation'])
+            try:
+                async for token in tokens:
+                    if not parts:
+                        timings['first_token'] = round((time.perf_counter() - response_start) * 1000, 2)
+                    parts.append(token)
+                    yield token
+            finally:
+                await tokens.aclose()
+        timings['response'] = round((time.perf_counter() - response_start) * 1000, 2)
+        
+        stream.result = self._finish(context, ''.join(parts).strip(), echo=False)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the supervisor's latency optimizations."""
+        return {
+            'router': self.router.stats() if self.router else None,
+            'plan_cache': self.plan_cache.stats() if self.plan_cache else None,
+            'renderer': self.renderer.stats() if self.renderer else None,
+            'health': self.health_monitor.stats(),
+            'connections': {
+                'math': self.math_agent.connection_stats(),
+                'data': self.data_agent.connection_stats(),
+                'text': self.text_agent.connection_stats(),
+            },
+        }
+    
+    async def health_check(self) -> Dict[str, bool]:
+        """Report agent health from the background monitor's cached probe results."""
+        self._log("[🏥 HEALTH CHECK]")
+        
+        # First call (before any probe has run) waits for one probe round
+        if not self.health_monitor.status:
+            await self.health_monitor.check_now()
+        self.health_monitor.start()
+        
+        # Data and Text agents can answer locally even when their server is down
+        status = {
+            'supervisor': True,
+            'math_agent': self.health_monitor.is_up('math'),
+            'data_agent': self.data_agent.is_healthy() or self.health_monitor.is_up('data'),
+            'text_agent': self.text_agent.is_healthy() or self.health_monitor.is_up('text'),
+        }
+        
+        for agent, healthy in status.items():
+            indicator = "✓" if healthy else "✗"
+            log.info("  %s %s: %s", indicator, agent, 'Healthy' if healthy else 'Unavailable')
+        
+        return status
+    
+    async def aclose(self):
+        """Stop the health monitor and close HTTP and LLM clients."""
+        await self.health_monitor.stop()
+        await asyncio.gather(
+            self.math_agent.aclose(),
+            self.data_agent.aclose(),
+            self.text_agent.aclose(),
+            self.llm.aclose(),
+        )
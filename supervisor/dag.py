@@ -0,0 +1,185 @@
+"""Task DAG - Plans compound queries as dependent tool calls and executes them in parallel."""
+import asyncio
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+AGENTS = ('math', 'data', 'text')
+
+class TaskNode:
+    """A single tool call in a task graph."""
+
+    def __init__(self, node_id: str, agent: str, operation: str, args: Optional[List[Any]] = None,
+                 kwargs: Optional[Dict[str, Any]] = None, depends_on: Optional[List[str]] = None):
+        self.id = node_id
+        self.agent = agent
+        self.operation = operation
+        self.args = args or []
+        self.kwargs = kwargs or {}
+        self.depends_on = depends_on or []
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'agent': self.agent,
+            'operation': self.operation,
+            'args': self.args,
+            'kwargs': self.kwargs,
+            'depends_on': self.depends_on
+        }
+
+class TaskGraph:
+    """Validated dependency DAG of tool calls."""
+
+    def __init__(self, nodes: List[TaskNode]):
+        self.nodes = {node.id: node for node in nodes}
+        if len(self.nodes) != len(nodes):
+            raise ValueError("Duplicate node ids in task graph")
+        self.order = self._topological_order()
+
+    @classmethod
+    def from_plan(cls, plan: Dict[str, Any], max_nodes: int = 8) -> "TaskGraph":
+        """Build a graph from the planner's {"nodes": [...]} JSON."""
+        raw_nodes = plan.get('nodes') or []
+        if not raw_nodes:
+            raise ValueError("Task graph has no nodes")
+        if len(raw_nodes) > max_nodes:
+            raise ValueError(f"Task graph has {len(raw_nodes)} nodes (max {max_nodes})")
+
+        nodes = []
+        for i, raw in enumerate(raw_nodes):
+            agent = raw.get('agent')
+            if agent not in AGENTS:
+                raise ValueError(f"Node {raw.get('id', i)} has unknown agent: {agent}")
+            if not raw.get('operation'):
+                raise ValueError(f"Node {raw.get('id', i)} has no operation")
+            nodes.append(TaskNode(
+                str(raw.get('id', f"n{i + 1}")),
+                agent,
+                raw['operation'],
+                raw.get('args') if isinstance(raw.get('args'), list) else [],
+                raw.get('kwargs') if isinstance(raw.get('kwargs'), dict) else {},
+                [str(d) for d in raw.get('depends_on') or []]
+            ))
+        return cls(nodes)
+
+    def _topological_order(self) -> List[str]:
+        """Kahn's algorithm; rejects unknown dependencies and cycles."""
+        indegree = {node_id: 0 for node_id in self.nodes}
+        for node in self.nodes.values():
+            for dep in node.depends_on:
+                if dep not in self.nodes:
+                    raise ValueError(f"Node {node.id} depends on unknown node {dep}")
+                indegree[node.id] += 1
+
+        ready = [node_id for node_id, degree in indegree.items() if degree == 0]
+        order = []
+        while ready:
+            node_id = ready.pop(0)
+            order.append(node_id)
+            for other in self.nodes.values():
+                if node_id in other.depends_on:
+                    indegree[other.id] -= 1
+                    if indegree[other.id] == 0:
+                        ready.append(other.id)
+
+        if len(order) != len(self.nodes):
+            raise ValueError("Task graph contains a cycle")
+        return order
+
+    def critical_path_ms(self, durations: Dict[str, float]) -> float:
+        """Longest dependency chain through the graph, weighted by node duration."""
+        finish: Dict[str, float] = {}
+        for node_id in self.order:
+            node = self.nodes[node_id]
+            start = max((finish[d] for d in node.depends_on), default=0.0)
+            finish[node_id] = start + durations.get(node_id, 0.0)
+        return round(max(finish.values(), default=0.0), 2)
+
+def resolve_references(value: Any, outputs: Dict[str, Any]) -> Any:
+    """Replace "$node" / "$node.field" strings with upstream outputs.
+
+    "$n1" is the whole result of n1; "$n1.salary" takes the field from a dict
+    result, or from every record when n1 returned a list of records.
+    """
+    if isinstance(value, list):
+        return [resolve_references(v, outputs) for v in value]
+    if isinstance(value, dict):
+        return {k: resolve_references(v, outputs) for k, v in value.items()}
+    if not (isinstance(value, str) and value.startswith('$')):
+        return value
+
+    node_id, _, field = value[1:].partition('.')
+    if node_id not in outputs:
+        return value
+
+    result = outputs[node_id]
+    if not field:
+        return result
+    if isinstance(result, dict):
+        return result.get(field)
+    if isinstance(result, list):
+        return [r.get(field) for r in result if isinstance(r, dict) and field in r]
+    return None
+
+class DAGExecutor:
+    """Runs each node as soon as its dependencies finish; independent nodes run in parallel."""
+
+    def __init__(self, call: Callable[[TaskNode, List[Any], Dict[str, Any]], Awaitable[Dict[str, Any]]]):
+        self.call = call
+
+    async def run(self, graph: TaskGraph) -> Dict[str, Any]:
+        """Execute the graph; returns per-node results plus wall time and critical path."""
+        results: Dict[str, Dict[str, Any]] = {}
+        outputs: Dict[str, Any] = {}
+        durations: Dict[str, float] = {}
+        done = {node_id: asyncio.Event() for node_id in graph.nodes}
+
+        async def run_node(node: TaskNode):
+            try:
+                for dep in node.depends_on:
+                    await done[dep].wait()
+
+                failed = [d for d in node.depends_on if 'error' in results[d]]
+                if failed:
+                    results[node.id] = {'agent': node.agent, 'operation': node.operation,
+                                        'error': f"Skipped: dependency {', '.join(failed)} failed"}
+                    return
+
+                args = resolve_references(node.args, outputs)
+                kwargs = resolve_references(node.kwargs, outputs)
+
+                start = time.perf_counter()
+                try:
+                    result = await self.call(node, args, kwargs)
+                except Exception as e:
+                    result = {'error': str(e)}
+                durations[node.id] = round((time.perf_counter() - start) * 1000, 2)
+
+                entry = {'agent': node.agent, 'operation': node.operation,
+                         'elapsed_ms': durations[node.id]}
+                if isinstance(result, dict) and 'result' in result:
+                    entry['result'] = outputs[node.id] = result['result']
+                else:
+                    error = result.get('error') if isinstance(result, dict) else None
+                    entry['error'] = error or 'No result'
+                results[node.id] = entry
+            except Exception as e:
+                results[node.id] = {'agent': node.agent, 'operation': node.operation, 'error': str(e)}
+            finally:
+                done[node.id].set()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(run_node(graph.nodes[node_id]) for node_id in graph.order))
+        wall_ms = round((time.perf_counter() - start) * 1000, 2)
+
+        return {
+            'nodes': {node_id: results[node_id] for node_id in graph.order},
+            'wall_ms': wall_ms,
+            'critical_path_ms': graph.critical_path_ms(durations),
+            'sum_of_calls_ms': round(sum(durations.values()), 2)
+        }
+
+def text_argument(value: Any) -> str:
+    """Text operations take a string; serialize upstream structured results."""
+    return value if isinstance(value, str) else json.dumps(value)
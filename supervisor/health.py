@@ -0,0 +1,180 @@
+"""Health monitor - Background MCP server probes and per-agent circuit breakers."""
+import asyncio
+import time
+from typing import Any, Dict, Optional
+from src.log import get_logger
+
+log = get_logger('supervisor.health')
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker around an agent's MCP calls.
+
+    closed:    calls go through; `failure_threshold` consecutive failures open it.
+    open:      calls fail fast until `reset_timeout` seconds have passed.
+    half_open: one trial call is let through; success closes, failure re-opens.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 10):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._trial_started = 0.0
+
+        self.rejected = 0
+        self.trips = 0
+
+    def allow(self) -> bool:
+        """Whether a call may go to the MCP server right now."""
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._trial_in_flight = False
+
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            self._trial_started = time.monotonic()
+            return True
+
+        self.rejected += 1
+        return False
+
+    def record(self, success: bool):
+        """Feed the outcome of a call (or probe) into the breaker."""
+        if success:
+            self.failures = 0
+            self.state = self.CLOSED
+            self._trial_in_flight = False
+            return
+
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.trip()
+
+    def trip(self):
+        """Open the circuit now."""
+        if self.state != self.OPEN:
+            self.trips += 1
+            log.warning("[⚡ CIRCUIT] %s: open", self.name)
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+    def release(self):
+        """A call let through by allow() has ended; if it was the half-open trial and
+        recorded no outcome (e.g. it was cancelled by a deadline), let another call try."""
+        if self.state == self.HALF_OPEN:
+            self._trial_in_flight = False
+
+    def probe_succeeded(self):
+        """A healthy probe lets an open circuit try a real call straight away.
+
+        It also frees a half-open trial that has not reported back within `reset_timeout`.
+        """
+        stale_trial = (self.state == self.HALF_OPEN and self._trial_in_flight
+                       and time.monotonic() - self._trial_started >= self.reset_timeout)
+        if self.state == self.OPEN or stale_trial:
+            self.state = self.HALF_OPEN
+            self._trial_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'state': self.state,
+            'consecutive_failures': self.failures,
+            'trips': self.trips,
+            'rejected_calls': self.rejected
+        }
+
+class HealthMonitor:
+    """Probes each agent's MCP server on an interval and caches the result."""
+
+    def __init__(self, agents: Dict[str, Any], breakers: Dict[str, CircuitBreaker],
+                 interval: float = 5, probe_timeout: float = 1):
+        self.agents = agents
+        self.breakers = breakers
+        self.interval = interval
+        self.probe_timeout = probe_timeout
+
+        self.status: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start the probe loop on the running event loop (no-op if already running)."""
+        if not self.running:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await self.check_now()
+            await asyncio.sleep(self.interval)
+
+    async def _probe(self, name: str, agent: Any):
+        start = time.perf_counter()
+        try:
+            healthy = await asyncio.wait_for(agent.aprobe(), timeout=self.probe_timeout)
+            error = None if healthy else 'unhealthy response'
+        except asyncio.TimeoutError:
+            healthy, error = False, f"no response within {self.probe_timeout}s"
+        except Exception as e:
+            healthy, error = False, str(e) or type(e).__name__
+
+        previous = self.status.get(name, {}).get('healthy')
+        self.status[name] = {
+            'healthy': healthy,
+            'latency_ms': round((time.perf_counter() - start) * 1000, 2),
+            'checked_at': time.time(),
+            'error': error
+        }
+
+        breaker = self.breakers.get(name)
+        if breaker is not None:
+            if healthy:
+                breaker.probe_succeeded()
+            else:
+                breaker.trip()
+
+        if previous is not None and previous != healthy:
+            log.warning("[🏥 HEALTH] %s MCP server is now %s", name, 'healthy' if healthy else 'unavailable')
+
+    async def check_now(self):
+        """Probe every MCP server once, concurrently."""
+        await asyncio.gather(*(self._probe(name, agent) for name, agent in self.agents.items()))
+
+    def is_up(self, name: str) -> bool:
+        """Last probe result for the agent's MCP server (False if never probed)."""
+        return self.status.get(name, {}).get('healthy', False)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            name: {
+                'healthy': self.is_up(name),
+                'latency_ms': self.status.get(name, {}).get('latency_ms'),
+                'age_seconds': round(now - self.status[name]['checked_at'], 1) if name in self.status else None,
+                'error': self.status.get(name, {}).get('error'),
+                'circuit': self.breakers[name].stats() if name in self.breakers else None
+            }
+            for name in self.agents
+        }
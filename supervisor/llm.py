@@ -0,0 +1,178 @@
+"""LLM clients - Pluggable chat completion backends for the supervisor (Groq or a local stub)."""
+import abc
+import asyncio
+import os
+import time
+import re
+from collections import deque
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+Messages = List[Dict[str, str]]
+
+class LLMClient(abc.ABC):
+    """Chat completion interface used by the supervisor; subclasses implement complete()."""
+
+    @abc.abstractmethod
+    def complete(self, messages: Messages, temperature: float = 0.7, max_tokens: int = 800,
+                 json_mode: bool = False) -> str:
+        """Return the full completion text."""
+
+    def stream(self, messages: Messages, temperature: float = 0.7,
+               max_tokens: int = 800) -> Iterator[str]:
+        """Yield completion text incrementally as it is generated."""
+        yield self.complete(messages, temperature=temperature, max_tokens=max_tokens)
+
+    async def acomplete(self, messages: Messages, temperature: float = 0.7, max_tokens: int = 800,
+                        json_mode: bool = False) -> str:
+        """Async completion; runs the blocking client in the default executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, lambda: self.complete(messages, temperature, max_tokens, json_mode))
+
+    async def astream(self, messages: Messages, temperature: float = 0.7,
+                      max_tokens: int = 800) -> AsyncIterator[str]:
+        """Async streaming; falls back to a single chunk from acomplete."""
+        yield await self.acomplete(messages, temperature=temperature, max_tokens=max_tokens)
+
+    async def aclose(self):
+        """Release async resources."""
+
+class GroqLLMClient(LLMClient):
+    """Groq chat completions."""
+
+    def __init__(self, model: str = 'llama-3.1-8b-instant', api_key: Optional[str] = None):
+        from groq import AsyncGroq, Groq
+
+        self.model = model
+        self.api_key = api_key or os.environ.get('GROQ_API_KEY')
+        self.client = Groq(api_key=self.api_key)
+        self._async_client_class = AsyncGroq
+        self._async_client = None
+
+    @property
+    def async_client(self):
+        """AsyncGroq client, created on first use inside the running event loop."""
+        if self._async_client is None:
+            self._async_client = self._async_client_class(api_key=self.api_key)
+        return self._async_client
+
+    @staticmethod
+    def _options(json_mode: bool) -> Dict[str, Any]:
+        return {'response_format': {"type": "json_object"}} if json_mode else {}
+
+    def complete(self, messages: Messages, temperature: float = 0.7, max_tokens: int = 800,
+                 json_mode: bool = False) -> str:
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **self._options(json_mode)
+        )
+        return response.choices[0].message.content.strip()
+
+    def stream(self, messages: Messages, temperature: float = 0.7,
+               max_tokens: int = 800) -> Iterator[str]:
+        chunks = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True
+        )
+        for chunk in chunks:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    async def acomplete(self, messages: Messages, temperature: float = 0.7, max_tokens: int = 800,
+                        json_mode: bool = False) -> str:
+        response = await self.async_client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **self._options(json_mode)
+        )
+        return response.choices[0].message.content.strip()
+
+    async def astream(self, messages: Messages, temperature: float = 0.7,
+                      max_tokens: int = 800) -> AsyncIterator[str]:
+        chunks = await self.async_client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True
+        )
+        async for chunk in chunks:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+
+class StubLLMClient(LLMClient):
+    """Offline LLM that replays scripted responses with simulated token latency."""
+
+    TOKEN_PATTERN = re.compile(r"\S+\s*|\s+")
+
+    def __init__(self, responses: Optional[List[str]] = None, default_response: str = "Stub answer.",
+                 first_token_delay: float = 0.0, token_delay: float = 0.0):
+        self.responses = deque(responses or [])
+        self.default_response = default_response
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.calls: List[Messages] = []
+
+    def _next_response(self, messages: Messages) -> str:
+        self.calls.append(messages)
+        return self.responses.popleft() if self.responses else self.default_response
+
+    def complete(self, messages: Messages, temperature: float = 0.7, max_tokens: int = 800,
+                 json_mode: bool = False) -> str:
+        text = self._next_response(messages)
+        tokens = self.TOKEN_PATTERN.findall(text)
+        time.sleep(self.first_token_delay + self.token_delay * max(len(tokens) - 1, 0))
+        return text.strip()
+
+    def stream(self, messages: Messages, temperature: float = 0.7,
+               max_tokens: int = 800) -> Iterator[str]:
+        text = self._next_response(messages)
+        for i, token in enumerate(self.TOKEN_PATTERN.findall(text)):
+            time.sleep(self.first_token_delay if i == 0 else self.token_delay)
+            yield token
+
+    async def acomplete(self, messages: Messages, temperature: float = 0.7, max_tokens: int = 800,
+                        json_mode: bool = False) -> str:
+        text = self._next_response(messages)
+        tokens = self.TOKEN_PATTERN.findall(text)
+        await asyncio.sleep(self.first_token_delay + self.token_delay * max(len(tokens) - 1, 0))
+        return text.strip()
+
+    async def astream(self, messages: Messages, temperature: float = 0.7,
+                      max_tokens: int = 800) -> AsyncIterator[str]:
+        text = self._next_response(messages)
+        for i, token in enumerate(self.TOKEN_PATTERN.findall(text)):
+            await asyncio.sleep(self.first_token_delay if i == 0 else self.token_delay)
+            yield token
+
+def create_llm_client(config: Dict[str, Any]) -> LLMClient:
+    """Build the LLM client selected by the `llm.provider` config key."""
+    llm_config = config.get('llm', {}) or {}
+    provider = llm_config.get('provider', 'groq')
+    model = config.get('supervisor', {}).get('model', 'llama-3.1-8b-instant')
+
+    if provider == 'stub':
+        stub = llm_config.get('stub', {}) or {}
+        return StubLLMClient(
+            responses=stub.get('responses'),
+            default_response=stub.get('default_response', "Stub answer."),
+            first_token_delay=stub.get('first_token_delay', 0.0),
+            token_delay=stub.get('token_delay', 0.0)
+        )
+    if provider == 'groq':
+        return GroqLLMClient(model=model)
+
+    raise ValueError(f"Unknown LLM provider: {provider}")
@@ -0,0 +1,193 @@
+"""Plan cache - Reuses LLM planning results for queries that differ only in their numbers."""
+import atexit
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from src.log import get_logger
+from supervisor.router import NUMBER_PATTERN, parse_number
+
+log = get_logger('supervisor.plan_cache')
+
+# Plan fields that do not depend on the concrete numbers in the query
+PLAN_FIELDS = ['intent', 'agents_needed', 'operation', 'agent', 'description']
+
+class PlanCache:
+    """Size-bounded LRU cache of query plans with TTL eviction and optional disk persistence."""
+
+    def __init__(self, max_size: int = 512, ttl_seconds: float = 3600,
+                 persist_path: Optional[str] = None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.persist_path = persist_path or None
+
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty = False
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        if self.persist_path:
+            self._load()
+            atexit.register(self.flush)
+
+    @staticmethod
+    def make_template(query: str) -> Tuple[str, List[Any]]:
+        """Normalize query to a template with numeric literals lifted out."""
+        numbers = []
+
+        def lift(match):
+            number = parse_number(match.group(0))
+            if number is None:
+                return match.group(0)  # ambiguous literal stays part of the template
+            numbers.append(number)
+            return '<num>'
+
+        template = NUMBER_PATTERN.sub(lift, query.lower())
+        template = ' '.join(template.split()).rstrip('?.! ')
+        return template, numbers
+
+    @staticmethod
+    def _slots(parameters: List[Any], numbers: List[Any]) -> Optional[List[int]]:
+        """Map each plan parameter to the index of the query literal it came from."""
+        slots, used = [], set()
+        for param in parameters:
+            try:
+                value = float(param)
+            except (TypeError, ValueError):
+                return None
+            index = next((i for i, n in enumerate(numbers) if i not in used and float(n) == value), None)
+            if index is None:
+                return None  # parameter was not a literal in the query; plan is not reusable
+            used.add(index)
+            slots.append(index)
+        return slots
+
+    def _expired(self, entry: Dict[str, Any], now: float) -> bool:
+        return bool(self.ttl_seconds) and now - entry['created'] > self.ttl_seconds
+
+    def get(self, query: str) -> Optional[Dict[str, Any]]:
+        """Return the cached plan bound to this query's numbers, or None on miss."""
+        template, numbers = self.make_template(query)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(template)
+            if entry is not None and self._expired(entry, now):
+                del self._entries[template]
+                self.expirations += 1
+                self._dirty = True
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(template)
+            entry['hits'] += 1
+            self.hits += 1
+            plan = {k: entry['plan'][k] for k in PLAN_FIELDS if k in entry['plan']}
+
+        plan['parameters'] = [numbers[i] for i in entry['slots']]
+        plan['source'] = 'plan_cache'
+        return plan
+
+    def put(self, query: str, plan: Dict[str, Any]) -> bool:
+        """Cache a plan if its parameters can be re-bound from the query template."""
+        if plan.get('operation', 'unknown') == 'unknown':
+            return False
+
+        template, numbers = self.make_template(query)
+        parameters = plan.get('parameters') or []
+        slots = self._slots(parameters if isinstance(parameters, list) else [], numbers)
+        if slots is None:
+            return False
+
+        with self._lock:
+            self._entries[template] = {
+                'plan': {k: plan[k] for k in PLAN_FIELDS if k in plan},
+                'slots': slots,
+                'created': time.time(),
+                'hits': 0
+            }
+            self._entries.move_to_end(template)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            self._dirty = True
+        return True
+
+    def clear(self):
+        """Drop all cached plans."""
+        with self._lock:
+            self._entries.clear()
+            self._dirty = True
+
+    def _load(self):
+        """Load persisted entries, skipping any that have already expired."""
+        try:
+            with open(self.persist_path, 'r') as f:
+                stored = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            log.warning("Warning: Could not load plan cache from %s: %s", self.persist_path, e)
+            return
+
+        now = time.time()
+        for template, entry in stored.get('entries', []):
+            if not self._expired(entry, now):
+                self._entries[template] = entry
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def flush(self):
+        """Write entries to the on-disk store (atomic replace)."""
+        if not self.persist_path or not self._dirty:
+            return
+
+        with self._lock:
+            payload = {'entries': list(self._entries.items())}
+            self._dirty = False
+
+        try:
+            directory = os.path.dirname(self.persist_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.persist_path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, self.persist_path)
+        except Exception as e:
+            log.warning("Warning: Could not persist plan cache to %s: %s", self.persist_path, e)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit ratio and per-entry age."""
+        now = time.time()
+        with self._lock:
+            entries = [
+                {
+                    'template': template,
+                    'operation': entry['plan'].get('operation'),
+                    'age_seconds': round(now - entry['created'], 1),
+                    'hits': entry['hits']
+                }
+                for template, entry in self._entries.items()
+            ]
+
+        lookups = self.hits + self.misses
+        return {
+            'size': len(entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'entries': entries
+        }
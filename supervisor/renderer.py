@@ -0,0 +1,247 @@
+"""Response renderer - Produces final answers locally for deterministic agent results."""
+from typing import Any, Callable, Dict, List, Optional
+
+def fmt(value: Any) -> str:
+    """Format a number without float noise (20.0 -> 20, 0.333333333 -> 0.333333)."""
+    if isinstance(value, bool):
+        return str(value)
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        if value.is_integer():
+            return str(int(value))
+        return f"{value:.6f}".rstrip('0').rstrip('.')
+    return str(value)
+
+def join_values(values: List[Any]) -> str:
+    """Join values as "a, b and c"."""
+    items = [fmt(v) for v in values]
+    if len(items) <= 1:
+        return ''.join(items)
+    return f"{', '.join(items[:-1])} and {items[-1]}"
+
+class ResponseRenderer:
+    """Per-operation answer templates; returns None when the LLM should write the answer."""
+
+    def __init__(self):
+        self.templates: Dict[str, Callable[[List[Any], Any, Dict[str, Any]], Optional[str]]] = {
+            # Math operations
+            'add': self._add,
+            'subtract': self._subtract,
+            'multiply': self._multiply,
+            'divide': self._divide,
+            'average': self._average,
+            'median': self._median,
+            'sum_numbers': self._add,
+            'max_value': self._max_value,
+            'min_value': self._min_value,
+            'power': self._power,
+            'square_root': self._square_root,
+            'convert_seconds': self._convert_seconds,
+            # Data operations
+            'count_records': self._count_records,
+            'aggregate_records': self._aggregate,
+            'aggregate': self._aggregate,
+            # Text operations
+            'count_words': self._count_words,
+            'word_count': self._count_words,
+            'summarize_text': self._summarize,
+            'summarize': self._summarize,
+            'extract_keywords': self._keywords,
+            'extract_entities': self._keywords,
+            'classify_text': self._classify,
+            'classify': self._classify,
+        }
+        self.rendered = 0
+        self.fallbacks = 0
+
+    def render(self, operation: str, parameters: List[Any],
+               agent_results: Dict[str, Any]) -> Optional[str]:
+        """Render the final answer for a single deterministic result, else None."""
+        answer = self._render(operation, parameters, agent_results)
+        if answer is None:
+            self.fallbacks += 1
+        else:
+            self.rendered += 1
+        return answer
+
+    def _render(self, operation: str, parameters: List[Any],
+                agent_results: Dict[str, Any]) -> Optional[str]:
+        # Several agent outputs need the LLM to combine them
+        if len(agent_results) != 1:
+            return None
+
+        result = next(iter(agent_results.values()))
+        if not isinstance(result, dict):
+            return None
+
+        if 'error' in result:
+            return f"I couldn't complete the {operation.replace('_', ' ')} operation: {result['error']}"
+
+        template = self.templates.get(operation)
+        if template is None or 'result' not in result:
+            return None
+
+        params = parameters if isinstance(parameters, list) else []
+        try:
+            return template(params, result['result'], result)
+        except (TypeError, ValueError, KeyError, IndexError):
+            return None
+
+    # Math ---------------------------------------------------------------
+
+    @staticmethod
+    def _add(params, value, result):
+        if params:
+            return f"The sum of {join_values(params)} is {fmt(value)}."
+        return f"The sum is {fmt(value)}."
+
+    @staticmethod
+    def _subtract(params, value, result):
+        if len(params) >= 2:
+            return f"{fmt(params[0])} - {fmt(params[1])} = {fmt(value)}"
+        return f"The difference is {fmt(value)}."
+
+    @staticmethod
+    def _multiply(params, value, result):
+        if params:
+            return f"The product of {join_values(params)} is {fmt(value)}."
+        return f"The product is {fmt(value)}."
+
+    @staticmethod
+    def _divide(params, value, result):
+        if len(params) < 2:
+            return f"The quotient is {fmt(value)}."
+        a, b = params[0], params[1]
+        return "\n".join([
+            f"Step 1: Divide {fmt(a)} by {fmt(b)}",
+            f"{fmt(a)} / {fmt(b)} = {fmt(value)}",
+            "",
+            f"Answer: {fmt(a)} divided by {fmt(b)} is {fmt(value)}."
+        ])
+
+    @staticmethod
+    def _average(params, value, result):
+        if params:
+            return "\n".join([
+                f"Step 1: Add the numbers: {' + '.join(fmt(p) for p in params)} = {fmt(sum(params))}",
+                f"Step 2: Divide by the count: {fmt(sum(params))} / {len(params)} = {fmt(value)}",
+                "",
+                f"Answer: The average of {join_values(params)} is {fmt(value)}."
+            ])
+        return f"The average is {fmt(value)}."
+
+    @staticmethod
+    def _median(params, value, result):
+        if params:
+            return f"The median of {join_values(params)} is {fmt(value)}."
+        return f"The median is {fmt(value)}."
+
+    @staticmethod
+    def _max_value(params, value, result):
+        if params:
+            return f"The maximum of {join_values(params)} is {fmt(value)}."
+        return f"The maximum is {fmt(value)}."
+
+    @staticmethod
+    def _min_value(params, value, result):
+        if params:
+            return f"The minimum of {join_values(params)} is {fmt(value)}."
+        return f"The minimum is {fmt(value)}."
+
+    @staticmethod
+    def _power(params, value, result):
+        if len(params) < 2:
+            return f"The result is {fmt(value)}."
+        base, exponent = params[0], params[1]
+        steps = []
+        if isinstance(exponent, int) and 1 < exponent <= 10:
+            steps.append(f"Step 1: Multiply {fmt(base)} by itself {exponent} times")
+            steps.append(f"{' × '.join([fmt(base)] * exponent)} = {fmt(value)}")
+        else:
+            steps.append(f"Step 1: Raise {fmt(base)} to the power of {fmt(exponent)}")
+            steps.append(f"{fmt(base)}^{fmt(exponent)} = {fmt(value)}")
+        steps += ["", f"Answer: {fmt(base)} to the power of {fmt(exponent)} is {fmt(value)}."]
+        return "\n".join(steps)
+
+    @staticmethod
+    def _square_root(params, value, result):
+        if params:
+            return f"The square root of {fmt(params[0])} is {fmt(value)}."
+        return f"The square root is {fmt(value)}."
+
+    @staticmethod
+    def _convert_seconds(params, value, result):
+        # Server wraps the whole breakdown in 'result'; the local fallback returns it flat
+        details = value if isinstance(value, dict) else result
+        text = details.get('result', value)
+        steps = [step for step in details.get('steps', []) if step.strip()]
+        total = details.get('total_seconds', params[0] if params else None)
+
+        answer = f"Answer: {fmt(total)} seconds is {text}." if total is not None else f"Answer: {text}."
+        return "\n".join(steps + ["", answer]) if steps else answer
+
+    # Data ---------------------------------------------------------------
+
+    @staticmethod
+    def _count_records(params, value, result):
+        if not isinstance(value, (int, float)):
+            return None
+        return f"There are {fmt(value)} records in the dataset."
+
+    # Names of aggregate types in an answer ("The average salary is ...")
+    AGGREGATE_NAMES = {'sum': 'total', 'avg': 'average', 'average': 'average',
+                       'max': 'maximum', 'min': 'minimum', 'count': 'count'}
+
+    @classmethod
+    def _aggregate(cls, params, value, result):
+        # The agent returns the aggregate type and field it was called with; without them
+        # the answer could not say what was aggregated, so the LLM writes it
+        name = cls.AGGREGATE_NAMES.get(result.get('type'))
+        field = result.get('field')
+        if not isinstance(value, (int, float)) or name is None:
+            return None
+        if name == 'count':
+            if field:
+                return f"There are {fmt(value)} {str(field).replace('_', ' ')} values."
+            return f"There are {fmt(value)} records in the dataset."
+        if not field:
+            return None
+        return f"The {name} {str(field).replace('_', ' ')} is {fmt(value)}."
+
+    # Text ---------------------------------------------------------------
+
+    @staticmethod
+    def _count_words(params, value, result):
+        if isinstance(value, dict):
+            return (f"The text contains {value['word_count']} words "
+                    f"({value['character_count']} characters, {value['unique_words']} unique words).")
+        return f"The text contains {fmt(value)} words."
+
+    @staticmethod
+    def _summarize(params, value, result):
+        if not isinstance(value, str):
+            return None
+        return f"Summary: {value}" if value else "The text is too short to summarize."
+
+    @staticmethod
+    def _keywords(params, value, result):
+        if not isinstance(value, list):
+            return None
+        return f"Keywords: {', '.join(str(v) for v in value)}" if value else "No keywords found."
+
+    @staticmethod
+    def _classify(params, value, result):
+        if isinstance(value, dict):
+            return (f"The text sentiment is {value['sentiment']} "
+                    f"(confidence {fmt(round(value['confidence'], 2))}).")
+        return f"The text is classified as {value}."
+
+    def stats(self) -> Dict[str, Any]:
+        """How many answers skipped the response LLM call."""
+        total = self.rendered + self.fallbacks
+        return {
+            'rendered': self.rendered,
+            'llm_fallbacks': self.fallbacks,
+            'local_ratio': round(self.rendered / total, 3) if total else 0.0
+        }
@@ -0,0 +1,195 @@
+"""Fast-path router - Resolves obvious queries to a tool call without an LLM round trip."""
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# A run of digits joined by "." and "," (plus an exponent) is matched whole, so
+# "1,000", "1.5e3" and ".5" are not split; parse_number() rejects runs that are
+# not one number, such as "1,2,3". A leading minus only counts as a sign when it
+# does not follow a word character ("10-5" stays two numbers).
+NUMBER_PATTERN = re.compile(r"(?<![\w.])-?\.?\d+(?:[.,]\d+)*(?:e[+-]?\d+)?|\.?\d+(?:[.,]\d+)*(?:e[+-]?\d+)?")
+VALID_NUMBER = re.compile(r"-?(?:(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?|\.\d+)(?:e[+-]?\d+)?")
+
+# Numbers are matched before words so "3.5" is not split
+TOKEN_PATTERN = re.compile(NUMBER_PATTERN.pattern + r"|[a-z]+(?:_[a-z]+)*")
+
+# Words that suggest more than one step; such queries are left to the LLM planner.
+COMPOUND_MARKERS = ['then', 'also', 'after that', 'afterwards', 'followed by']
+
+# operation: (agent, trigger phrases, arity)
+# arity: 'list' = two or more numbers, int = exact count of numbers, None = numbers ignored
+OPERATION_RULES: Dict[str, Tuple[str, List[str], Any]] = {
+    'add': ('math', ['add', 'plus', 'addition'], 'list'),
+    'subtract': ('math', ['subtract', 'minus', 'difference between', 'take away'], 2),
+    'multiply': ('math', ['multiply', 'multiplied', 'times', 'product of'], 'list'),
+    'divide': ('math', ['divide', 'divided by', 'quotient'], 2),
+    'average': ('math', ['average', 'mean', 'avg'], 'list'),
+    'median': ('math', ['median'], 'list'),
+    'sum_numbers': ('math', ['sum', 'sum of', 'total of'], 'list'),
+    'max_value': ('math', ['max', 'maximum', 'largest', 'biggest', 'highest'], 'list'),
+    'min_value': ('math', ['min', 'minimum', 'smallest', 'lowest'], 'list'),
+    'power': ('math', ['power', 'to the power of', 'raised to', 'exponent'], 2),
+    'square_root': ('math', ['square root', 'sqrt'], 1),
+    'convert_seconds': ('math', ['convert seconds', 'seconds to', 'seconds into', 'seconds in'], 1),
+    'count_records': ('data', ['how many records', 'count records', 'count the records',
+                               'number of records', 'total records', 'record count',
+                               'how many employees', 'count employees', 'number of employees'], 0),
+    'count_words': ('text', ['count words', 'count the words', 'word count', 'how many words',
+                             'number of words'], None),
+    'summarize_text': ('text', ['summarize', 'summarise', 'summary of'], None),
+    'extract_keywords': ('text', ['extract keywords', 'keywords'], None),
+    'classify_text': ('text', ['classify'], None),
+}
+
+def parse_number(token: str) -> Optional[float]:
+    """Value of a NUMBER_PATTERN match ("1,000" -> 1000, "1.5e3" -> 1500.0), or None if ambiguous."""
+    if not VALID_NUMBER.fullmatch(token):
+        return None
+    token = token.replace(',', '')
+    return float(token) if '.' in token or 'e' in token else int(token)
+
+class FastPathRouter:
+    """Rule and pattern-based router that bypasses LLM planning for unambiguous queries."""
+
+    def __init__(self, agents_config: Dict[str, Any], capabilities: Dict[str, List[str]],
+                 confidence_threshold: float = 0.75, planning_calls: int = 1):
+        self.confidence_threshold = confidence_threshold
+        self.planning_calls = planning_calls
+
+        # Agent-level keywords from supervisor_config.yaml (agents.<name>_agent.keywords)
+        self.agent_keywords = {
+            name.replace('_agent', ''): [k.lower() for k in (cfg or {}).get('keywords', [])]
+            for name, cfg in (agents_config or {}).items()
+        }
+
+        # Only route to operations the sub-agents actually advertise
+        self.rules = {}
+        for operation, (agent, phrases, arity) in OPERATION_RULES.items():
+            if operation not in capabilities.get(agent, []):
+                continue
+            triggers = set(phrases) | {operation, operation.replace('_', ' ')}
+            self.rules[operation] = (agent, sorted(triggers, key=len, reverse=True), arity)
+
+        self.hits = 0
+        self.misses = 0
+        self.total_route_ms = 0.0
+
+    @staticmethod
+    def tokenize(query: str) -> Tuple[List[str], List[float]]:
+        """Split query into word tokens and numeric literals (in order of appearance).
+
+        A literal that is not clearly one number (e.g. "1,2,3") is None.
+        """
+        words, numbers = [], []
+        for token in TOKEN_PATTERN.findall(query.lower()):
+            if token[0].isdigit() or token[0] in '-.':
+                numbers.append(parse_number(token))
+            else:
+                words.append(token)
+        return words, numbers
+
+    @staticmethod
+    def _match(phrase: str, text: str) -> bool:
+        """Whole-word phrase match against the space-joined word tokens."""
+        return f" {phrase} " in text
+
+    def _trigger(self, operation: str, text: str) -> Optional[str]:
+        """Longest trigger phrase of `operation` present in the query, if any."""
+        return next((t for t in self.rules[operation][1] if self._match(t, text)), None)
+
+    def _score(self, operation: str, matched: str, numbers: List[float],
+               keyword_hits: Dict[str, int]) -> float:
+        """Confidence that the query is a single call to `operation`."""
+        agent, _, arity = self.rules[operation]
+
+        if arity == 'list' and len(numbers) < 2:
+            return 0.0
+        if isinstance(arity, int) and len(numbers) != arity:
+            return 0.0
+
+        score = 0.5
+        if arity is not None:
+            score += 0.3  # parameters fully determined by the literals in the query
+        else:
+            score += 0.25
+        own_hits = keyword_hits.get(agent, 0)
+        if ' ' in matched or '_' in matched or matched == operation:
+            score += 0.1  # specific phrase or exact operation name
+            own_hits += 1
+        if keyword_hits.get(agent):
+            score += 0.1
+
+        # Another agent's configured keywords pull the query elsewhere
+        if any(hits > own_hits for a, hits in keyword_hits.items() if a != agent):
+            score -= 0.2
+
+        return min(score, 1.0)
+
+    def route(self, query: str) -> Optional[Dict[str, Any]]:
+        """Return a plan for the query, or None when the LLM should decide."""
+        start = time.perf_counter()
+        plan = self._route(query)
+        self.total_route_ms += (time.perf_counter() - start) * 1000
+
+        if plan:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return plan
+
+    def _route(self, query: str) -> Optional[Dict[str, Any]]:
+        words, numbers = self.tokenize(query)
+        if None in numbers:
+            return None  # leave ambiguous literals to the LLM
+        text = f" {' '.join(words)} "
+
+        if any(self._match(marker, text) for marker in COMPOUND_MARKERS):
+            return None
+
+        keyword_hits = {
+            agent: sum(1 for k in keywords if self._match(k, text))
+            for agent, keywords in self.agent_keywords.items()
+        }
+
+        triggered = {op: t for op in self.rules for t in [self._trigger(op, text)] if t}
+        if not triggered:
+            return None
+
+        # Triggers for several operations mean a compound or unclear request
+        if len(triggered) > 1:
+            return None
+
+        operation, matched = next(iter(triggered.items()))
+        best_score = self._score(operation, matched, numbers, keyword_hits)
+        if best_score < self.confidence_threshold:
+            return None
+
+        agent, _, arity = self.rules[operation]
+        parameters = list(numbers) if arity is not None else []
+
+        # "subtract 5 from 10" means 10 - 5
+        if operation == 'subtract' and self._match('from', text):
+            parameters.reverse()
+
+        return {
+            'intent': agent,
+            'agents_needed': [agent],
+            'operation': operation,
+            'parameters': parameters,
+            'agent': agent,
+            'description': f"fast-path match for {operation}",
+            'confidence': round(best_score, 2),
+            'source': 'fast_path'
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit-rate and latency counters."""
+        total = self.hits + self.misses
+        return {
+            'queries': total,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0.0,
+            'llm_calls_avoided': self.hits * self.planning_calls,
+            'avg_route_ms': round(self.total_route_ms / total, 3) if total else 0.0
+        }
@@ -0,0 +1,115 @@
+"""Supervisor HTTP service - Serves queries from one shared SupervisorAgent behind a worker pool."""
+import threading
+from typing import Optional
+from src.http_pool import JSONRequestHandler, PooledHTTPServer
+from src.log import get_logger, short
+from src.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from supervisor.supervisor_agent import SupervisorAgent
+
+log = get_logger('supervisor.server')
+
+class SupervisorHandler(JSONRequestHandler):
+    """HTTP handler for supervisor queries."""
+
+    def do_POST(self):
+        """Handle POST requests."""
+        service = self.server.service
+        try:
+            request = self.read_json()
+            if not isinstance(request, dict):
+                raise ValueError("Request body must be a JSON object")
+        except ValueError as e:
+            self.send_json(400, {'error': f"Invalid request: {e}"})
+            return
+
+        try:
+            if self.path == '/query':
+                query = request.get('query')
+                if not isinstance(query, str) or not query.strip():
+                    self.send_json(400, {'error': "Field 'query' must be a non-empty string"})
+                    return
+                self.send_json(200, service.supervisor.process_query(query.strip()))
+
+            elif self.path == '/query_batch':
+                queries = request.get('queries')
+                if not isinstance(queries, list) or not all(isinstance(q, str) for q in queries):
+                    self.send_json(400, {'error': "Field 'queries' must be a list of strings"})
+                    return
+                if len(queries) > service.max_batch:
+                    self.send_json(413, {'error': f"Batch exceeds {service.max_batch} queries"})
+                    return
+                max_concurrency = request.get('max_concurrency')
+                if max_concurrency is not None:
+                    if type(max_concurrency) is not int or max_concurrency < 1:
+                        self.send_json(400, {'error': "Field 'max_concurrency' must be a positive integer"})
+                        return
+                    # A client may lower the batch's concurrency, not raise it past the configured cap
+                    max_concurrency = min(max_concurrency, service.supervisor.agent.batch_concurrency)
+                results = service.supervisor.process_queries(queries, max_concurrency)
+                self.send_json(200, {'results': results})
+
+            else:
+                self.send_json(404, {'error': f"Unknown endpoint: {self.path}"})
+
+        except Exception as e:
+            log.error("  [❌ SUPERVISOR ERROR] %s: %s", self.path, short(str(e)))
+            self.send_json(500, {'error': str(e)})
+
+    def do_GET(self):
+        """Handle GET requests."""
+        service = self.server.service
+        if self.path == '/health':
+            status = 'draining' if self.server.draining else 'healthy'
+            self.send_json(503 if self.server.draining else 200,
+                           {'status': status, 'service': 'supervisor'})
+
+        elif self.path == '/stats':
+            self.send_json(200, {'server': self.server.stats(), 'supervisor': service.supervisor.stats()})
+
+        elif self.path == '/metrics':
+            self.send_body(200, service.supervisor.metrics.render(), METRICS_CONTENT_TYPE)
+
+        else:
+            self.send_json(404, {'error': f"Unknown endpoint: {self.path}"})
+
+class SupervisorServer:
+    """Long-running supervisor service: POST /query and /query_batch over HTTP."""
+
+    def __init__(self, supervisor: Optional[SupervisorAgent] = None,
+                 config_path: str = "config/supervisor_config.yaml"):
+        # Agents, HTTP clients and the LLM client are created once and shared by all requests
+        self.supervisor = supervisor or SupervisorAgent(config_path)
+
+        server_config = self.supervisor.config.get('server', {}) or {}
+        self.host = server_config.get('host', 'localhost')
+        self.port = server_config.get('port', 8080)
+        self.workers = server_config.get('workers', 16)
+        self.queue_size = server_config.get('queue_size', 64)
+        self.drain_timeout = server_config.get('drain_timeout', 30)
+        self.max_batch = server_config.get('max_batch', 100)
+        self.keepalive_timeout = server_config.get('keepalive_timeout', 5)
+
+        self.server = None
+        self.thread = None
+
+    def start(self):
+        """Start the server."""
+        self.server = PooledHTTPServer((self.host, self.port), SupervisorHandler,
+                                       workers=self.workers, queue_size=self.queue_size,
+                                       keepalive_timeout=self.keepalive_timeout)
+        self.server.service = self
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        log.info("[SUPERVISOR] Serving on http://%s:%s (%s workers, queue %s)",
+                 self.host, self.port, self.workers, self.queue_size)
+
+    def stop(self):
+        """Drain in-flight requests, then close the shared supervisor."""
+        if not self.server:
+            return
+        log.info("[SUPERVISOR] Draining (up to %ss)...", self.drain_timeout)
+        if not self.server.drain(self.drain_timeout):
+            log.warning("[SUPERVISOR] Drain timed out; abandoning remaining requests")
+        self.supervisor.close()
+        self.server = None
+        log.info("[SUPERVISOR] Stopped")
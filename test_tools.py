@@ -1,4 +1,8 @@
 """Test script to demonstrate different math tool calls with step-by-step results."""
+from mcp_servers.data_server import DataOperations
+from src.columnar import ColumnarTable, Unvectorizable
+from src.config import Config
+from src.serialization import available_formats
 from sub_agents.math_agent import MathAgent
 
 agent = MathAgent()
@@ -45,6 +49,38 @@ if 'steps' in result:
     if 'breakdown' in result:
         print(f'[MATH AGENT] 📊 BREAKDOWN: {result["breakdown"]}')
 
+# Test 9: Integers beyond 64 bits must stay exact on every wire format and transport
+print('\n▶️ TEST 9: POWER beyond 64 bits (every format and transport)')
+urls = ['http://localhost:8000', 'inproc://math']
+math_socket = (Config().get('mcp_servers.unix_sockets', {}) or {}).get('math')
+if math_socket:
+    urls.append(f'unix://{math_socket}')
+for url in urls:
+    for wire_format in available_formats():
+        big_agent = MathAgent(url, formats=[wire_format])
+        for base, exponent in [(10, 30), (3, 50)]:
+            for _ in range(2):  # the first call negotiates the format
+                value = big_agent.call_mcp('power', base, exponent).get('result')
+                assert type(value) is int and value == base ** exponent, (url, wire_format, value)
+        print(f'             {url} ({wire_format}): 10^30 and 3^50 exact')
+
+# Test 10: Vectorized filters must match the record-by-record loop where float64 would round
+print('\n▶️ TEST 10: FILTER near the float64 limit (columns vs. loop)')
+cases = [
+    ([{'x': 2 ** 53}] * 300 + [{'x': 0.5}], '==', 2 ** 53 + 1),   # number column, int beyond 2**53
+    ([{'x': 2 ** 53}] * 300 + [{'x': 0.5}], 'in', [2 ** 53 + 1]),
+    ([{'x': 2 ** 62 + 1}] * 300, '>', float(2 ** 62)),            # int64 column, float value
+    ([{'x': 2 ** 62 + 1}] * 300, 'in', [float(2 ** 62)]),
+]
+for records, operator, value in cases:
+    expected = list(DataOperations.filter_records(records, 'x', operator, value))
+    try:
+        found = ColumnarTable(records).filter('x', operator, value)
+    except Unvectorizable:
+        found = expected  # the DataAgent scans instead
+    assert found == expected, (operator, value, len(found), len(expected))
+    print(f'             x {operator} {value!r}: {len(expected)} rows, as the loop')
+
 print('\n' + '=' * 70)
 print('✅ All Math Agent tool calls completed!')
 print('=' * 70)